@@ -0,0 +1,76 @@
+# arranque.py
+# Mede quanto tempo leva do início do main.py até o primeiro frame do menu,
+# separado por etapa (imports, pygame.init, janela, imagem do menu...).
+# TRES_GRACAS_STARTUP=1 imprime o relatório; com um caminho (ex: inicio.json)
+# também salva em JSON, pra acompanhar entre versões.
+# Também guarda o que só deve rodar depois que o menu já apareceu.
+
+import os
+import sys
+import json
+import time
+
+RELATORIO = os.environ.get("TRES_GRACAS_STARTUP", "")
+
+# começa a contar quando este módulo é importado (o main importa ele primeiro)
+_t0 = time.perf_counter()
+_ultimo = _t0
+_etapas = []          # [(nome, ms)]
+_depois = []          # funções pra rodar depois do primeiro frame
+_pronto = False
+
+
+def marcar(nome):
+    # fecha a etapa atual: o tempo desde a marca anterior vai pra "nome"
+    global _ultimo
+    if _pronto:
+        return
+    agora = time.perf_counter()
+    _etapas.append((nome, (agora - _ultimo) * 1000.0))
+    _ultimo = agora
+
+
+def ao_primeiro_frame(func):
+    # guarda algo pra fazer só quando o menu já estiver na tela
+    if _pronto:
+        func()
+    else:
+        _depois.append(func)
+
+
+def primeiro_frame():
+    # chamado depois do primeiro frame do menu: fecha o relatório e roda o que ficou pra depois
+    global _pronto
+    if _pronto:
+        return
+    marcar("primeiro frame")
+    _pronto = True
+    if RELATORIO:
+        mostrar()
+    for func in _depois:
+        try:
+            func()
+        except Exception as e:
+            print("arranque: erro no carregamento adiado:", e)
+    _depois.clear()
+
+
+def relatorio():
+    # {"total_ms": ..., "etapas": [{"etapa": nome, "ms": ...}, ...]}
+    return {
+        "total_ms": round(sum(ms for _, ms in _etapas), 2),
+        "etapas": [{"etapa": nome, "ms": round(ms, 2)} for nome, ms in _etapas],
+    }
+
+
+def mostrar():
+    rel = relatorio()
+    print(f"tempo até o primeiro frame do menu: {rel['total_ms']:.1f} ms", file=sys.stderr)
+    for e in rel["etapas"]:
+        print(f"  {e['etapa']:24s} {e['ms']:8.1f} ms", file=sys.stderr)
+    if RELATORIO not in ("", "1"):
+        try:
+            with open(RELATORIO, "w", encoding="utf-8") as f:
+                json.dump(rel, f, indent=2)
+        except OSError as e:
+            print("arranque: não deu pra salvar o relatório:", e, file=sys.stderr)
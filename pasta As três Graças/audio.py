@@ -0,0 +1,221 @@
+# audio.py
+# Todo o som do jogo passa por aqui: efeitos e músicas são pedidos pelo nome
+# ("alarme", "clicar", "fase2"...), cada arquivo é decodificado uma vez só
+# (no cache do recursos) e os efeitos tocam num conjunto fixo de canais.
+# Os canais reservados ficam pros sons importantes (alarme, cronômetro, fim de jogo),
+# então um monte de clique no menu nunca corta o alarme.
+# Se não tiver placa de som (ou o mixer não abrir), tudo vira "não faz nada".
+
+import os
+import pygame
+
+import recursos
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ----- CANAIS -----
+CANAIS = 8          # total de canais de efeito
+RESERVADOS = 3      # os primeiros ficam só pros sons de prioridade ALTA
+
+# prioridades (quem pode roubar o canal de quem quando está tudo ocupado)
+BAIXA = 0           # interface (hover/clique)
+MEDIA = 1           # efeitos de jogo
+ALTA = 2            # alarme, cronômetro, fim de jogo
+
+# nome -> (arquivo em assets/, volume, prioridade)
+SONS = {
+    "clicar": ("clicar.mp3", 1.0, BAIXA),
+    "sabotagem": ("sabotagem.mp3", 0.6, MEDIA),
+    "cronometro": ("cronometro.mp3", 0.18, ALTA),
+    "alarme": ("alarme.mp3", 0.6, ALTA),
+    "game_over": ("game_over_som.mp3", 0.75, ALTA),
+    "vitoria": ("vitoria_som.mp3", 0.85, ALTA),
+}
+
+# nome -> (arquivo em assets/, volume)
+MUSICAS = {
+    "menu": ("tela_inicio_som.mp3", 0.45),
+    "fase2": ("som_fase2.mp3", 0.5),
+    "fase3": ("fase3_som.mp3", 0.5),
+}
+
+_configurado = False   # já separou os canais neste mixer
+_falhou = False        # o mixer não abriu: não fica tentando de novo a cada som
+_tocando = {}          # índice do canal -> (nome, prioridade)
+_sem_arquivo = set()   # nomes cujo arquivo não existe/não abre
+_musica_atual = None
+
+
+def _caminho(arquivo):
+    return os.path.join(BASE_DIR, "assets", arquivo)
+
+
+def iniciar():
+    # abre o mixer (uma vez só) e separa os canais; False se não tem som
+    global _configurado, _falhou
+    if pygame.mixer.get_init() is None:
+        if _falhou:
+            return False
+        try:
+            pygame.mixer.init()
+        except Exception:
+            _falhou = True
+            return False
+        _configurado = False
+    if not _configurado:
+        pygame.mixer.set_num_channels(CANAIS)
+        pygame.mixer.set_reserved(RESERVADOS)
+        _tocando.clear()
+        _configurado = True
+    return True
+
+
+def _som(nome):
+    # Sound decodificado (o recursos guarda; a fase que pedir de novo pega o mesmo)
+    if nome in _sem_arquivo or nome not in SONS:
+        return None
+    try:
+        return recursos.som(_caminho(SONS[nome][0]))
+    except Exception:
+        _sem_arquivo.add(nome)
+        return None
+
+
+def carregar(*nomes):
+    # decodifica agora (pra não travar no primeiro play)
+    if iniciar():
+        for nome in nomes:
+            _som(nome)
+
+
+def preload_assets(*nomes):
+    # itens pro recursos.precarregar (efeitos e músicas pelo nome)
+    itens = []
+    for nome in nomes:
+        if nome in SONS:
+            itens.append(("som", _caminho(SONS[nome][0])))
+        elif nome in MUSICAS:
+            itens.append(("musica", _caminho(MUSICAS[nome][0])))
+    return itens
+
+
+def _canal(prioridade):
+    # canal livre; os reservados só pra prioridade ALTA
+    # se tudo estiver ocupado, rouba o do som menos importante (se for menos que este)
+    faixa = range(CANAIS) if prioridade >= ALTA else range(RESERVADOS, CANAIS)
+    pior = None
+    for i in faixa:
+        ch = pygame.mixer.Channel(i)
+        if not ch.get_busy():
+            _tocando.pop(i, None)
+            return i, ch
+        p = _tocando.get(i, (None, BAIXA))[1]
+        if pior is None or p < pior[1]:
+            pior = (i, p)
+    if pior is not None and pior[1] < prioridade:
+        ch = pygame.mixer.Channel(pior[0])
+        ch.stop()
+        return pior[0], ch
+    return None, None
+
+
+def _canais_de(nome):
+    for i, (n, _) in list(_tocando.items()):
+        ch = pygame.mixer.Channel(i)
+        if n == nome and ch.get_busy():
+            yield ch
+
+
+def tocar(nome, loops=0, volume=None):
+    # toca um efeito pelo nome; devolve o Channel (ou None se não tocou)
+    if not iniciar():
+        return None
+    snd = _som(nome)
+    if snd is None:
+        return None
+    _, vol, prioridade = SONS[nome]
+    try:
+        i, ch = _canal(prioridade)
+        if ch is None:
+            return None
+        ch.play(snd, loops=loops)
+        ch.set_volume(vol if volume is None else volume)
+        _tocando[i] = (nome, prioridade)
+        return ch
+    except Exception:
+        return None
+
+
+def tocando(nome):
+    if pygame.mixer.get_init() is None:
+        return False
+    return any(True for _ in _canais_de(nome))
+
+
+def volume(nome, v):
+    # muda o volume de quem está tocando esse som agora (ex: cronômetro subindo)
+    if pygame.mixer.get_init() is None:
+        return
+    for ch in _canais_de(nome):
+        ch.set_volume(max(0.0, min(1.0, v)))
+
+
+def parar(nome=None):
+    # para um efeito (ou todos, sem nome)
+    if pygame.mixer.get_init() is None:
+        return
+    for i, (n, _) in list(_tocando.items()):
+        if nome is None or n == nome:
+            pygame.mixer.Channel(i).stop()
+            del _tocando[i]
+
+
+def fade(nome, ms):
+    # abaixa até sumir em "ms" milissegundos
+    if pygame.mixer.get_init() is None:
+        return
+    for ch in _canais_de(nome):
+        ch.fadeout(int(ms))
+
+
+# ----- MÚSICA (tocada em streaming pelo mixer.music) -----
+def musica(nome, loops=-1):
+    # toca a música do nome (se já for ela, não recomeça)
+    global _musica_atual
+    if nome not in MUSICAS or not iniciar():
+        return False
+    if _musica_atual == nome and pygame.mixer.music.get_busy():
+        return True
+    arquivo, vol = MUSICAS[nome]
+    path = _caminho(arquivo)
+    if not os.path.exists(path):
+        return False
+    try:
+        pygame.mixer.music.load(recursos.musica(path), "mp3")
+        pygame.mixer.music.set_volume(vol)
+        pygame.mixer.music.play(loops)
+        _musica_atual = nome
+        return True
+    except Exception:
+        _musica_atual = None
+        return False
+
+
+def parar_musica(fade_ms=0):
+    global _musica_atual
+    _musica_atual = None
+    if pygame.mixer.get_init() is None:
+        return
+    try:
+        if fade_ms:
+            pygame.mixer.music.fadeout(int(fade_ms))
+        else:
+            pygame.mixer.music.stop()
+    except Exception:
+        pass
+
+
+def parar_tudo():
+    # fim de fase: efeitos e música
+    parar()
+    parar_musica()
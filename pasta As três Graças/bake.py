@@ -0,0 +1,76 @@
+# bake.py
+# "Assa" as imagens do jogo num arquivo só (assets/pacote.bin): cada sprite, câmera,
+# painel, caixa do timer e fundo já recortado e escalado do jeito que as fases usam,
+# em pixels crus + um índice. Aí o jogo abre o pacote com mmap e monta as Surfaces
+# direto (recursos.py), sem decodificar PNG nem recortar nada na hora.
+# Se algum PNG mudar depois, só as imagens dele voltam a ser lidas do PNG (até assar de novo).
+#
+# uso: python bake.py [--frames 900] [--saida assets/pacote.bin]
+
+import os
+import sys
+import time
+import argparse
+
+# sem janela e sem som (precisa vir antes de importar o pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import recursos
+import niveis
+import bench
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WIDTH, HEIGHT = bench.WIDTH, bench.HEIGHT
+
+
+def _telas():
+    # as telas do main (menu, tutorial e fundos de fim), com os mesmos parâmetros que ele usa
+    import main
+    for nome in ["menu_inicial.png", "Presa_video.png", "vitoria.png"]:
+        try:
+            recursos.imagem(main.asset_path("assets", nome), alpha=False, size=(WIDTH, HEIGHT), smooth=False)
+        except Exception as e:
+            print("  sem", nome, "-", e)
+    for i in range(1, 5):
+        try:
+            recursos.imagem(main.asset_path("assets", f"tuto{i}.png"), size=(WIDTH, HEIGHT), smooth=False)
+        except Exception as e:
+            print(f"  sem tuto{i}.png -", e)
+
+
+def assar(saida, frames):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.SysFont("consolas", 20)
+
+    recursos.preparar_pacote()
+    # sem o fundo pronto do cache dos níveis, senão as fases nem pedem o piso/cofre
+    niveis._USAR_CACHE = False
+    inicio = time.perf_counter()
+    _telas()
+    # joga um pouco de cada fase: passa por tudo que ela carrega e pelos tamanhos
+    # que o draw pede (câmeras, caixa do timer, guardas em cada direção...)
+    for nome in ("fase1", "fase2", "fase3"):
+        print("jogando", nome, "...")
+        bench.rodar_fase(nome, frames, font)
+
+    info = recursos.gravar_pacote(saida)
+    print(f"{info['imagens']} imagens, {info['bytes'] / (1024 * 1024):.1f} MB em {saida} "
+          f"({time.perf_counter() - inicio:.1f}s)")
+    return info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="assa as imagens do jogo num pacote só")
+    parser.add_argument("--frames", type=int, default=900, help="frames jogados em cada fase")
+    parser.add_argument("--saida", default=recursos.PACOTE)
+    args = parser.parse_args(argv)
+    assar(args.saida, args.frames)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
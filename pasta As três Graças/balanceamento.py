@@ -0,0 +1,258 @@
+# balanceamento.py
+# Roda um monte de partidas sem janela (as mesmas do simulacao.py) pra cada combinação
+# de valores das constantes de jogo, em paralelo (um processo por núcleo), e junta tudo
+# num CSV: quantas vezes o player foi visto, quantas ele passou e em quanto tempo.
+# Serve pra acertar CAM_FOV_ANGLE, GUARD_SPEED, STEAL_TIME... sem jogar na mão.
+#
+# uso:
+#   python balanceamento.py --fases fase2,fase3 --partidas 200 \
+#       --param fase2.CAM_FOV_ANGLE=60,70,80 --param fase3.GUARD_SPEED=75,90,110 \
+#       [--politica aleatoria|parado|roteiro.json] [--processos 4] [--saida balanceamento.csv]
+#
+# Cada --param é fase.NOME=valor,valor,...; as combinações são todas as de cada fase.
+# NOME pode ser uma constante do módulo da fase (CAM_FOV_DIST, FOV_ANGLE, STEAL_TIME,
+# TIME_LIMIT...) ou um atributo do estado (ex: fase1.level_timer). GUARD_SPEED mexe na
+# velocidade dos guardas do nível (que vem do JSON), mantendo a proporção entre eles.
+# A partida i usa a mesma seed em todas as combinações, então a diferença entre duas
+# linhas do CSV é só o parâmetro.
+# O roteiro é um JSON com [[até_quando, "right+space"], ...] (segura cada entrada até o tempo dela).
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import simulacao   # (primeiro: deixa o SDL sem janela e sem som antes do pygame)
+import entrada
+import fase1
+import fase2
+import fase3
+
+MODULOS = {"fase1": fase1, "fase2": fase2, "fase3": fase3}
+
+# o que conta como "passou" em cada fase
+VITORIAS = {"fase1": {"NEXT"}, "fase2": {"CLEAN"}, "fase3": {"WIN"}}
+
+
+# ----- "FOI VISTO" -----
+# (state, resultado do passo) -> True se o player foi visto nesse passo
+def _visto_fase2(state, result):
+    return result == "RECORDED"
+
+
+def _visto_fase3(state, result):
+    return state.alarm
+
+
+VISTO = {"fase2": _visto_fase2, "fase3": _visto_fase3}
+
+
+# ----- PARÂMETROS QUE NÃO SÃO SÓ TROCAR A CONSTANTE -----
+def _velocidade_guardas(state, valor, padrao):
+    # os guardas do nível têm velocidade própria (JSON): escala todos junto
+    vel = state.guardas.col["velocidade"]
+    for i in range(len(vel)):
+        vel[i] *= valor / padrao
+
+
+# (fase, NOME) -> ajuste(state, valor, valor padrão da constante), depois de criar o estado
+AJUSTES = {("fase3", "GUARD_SPEED"): _velocidade_guardas}
+
+
+def _politica(nome, seed, troca):
+    if nome == "parado":
+        return simulacao.parado
+    if nome == "aleatoria":
+        return simulacao.aleatoria(seed=seed, troca=troca)
+    with open(nome, encoding="utf-8") as f:
+        passos = json.load(f)
+    return simulacao.roteiro([
+        (ate, entrada.Entrada(**{b: True for b in botoes.split("+") if b}))
+        for ate, botoes in passos
+    ])
+
+
+# ----- UM LOTE DE PARTIDAS (roda dentro de um processo do pool) -----
+def rodar_lote(tarefa):
+    # tarefa: (fase, params [(nome, valor)], seeds, política, troca, max_tempo)
+    # devolve [(resultado, tempo, foi visto)] na ordem das seeds
+    fase, params, seeds, politica, troca, max_tempo = tarefa
+    modulo = MODULOS[fase]
+    novo_estado, step = simulacao.FASES[fase]
+    visto = VISTO.get(fase)
+    dt = simulacao.DT
+
+    # troca as constantes do módulo (e desfaz no fim: o processo roda outras tarefas depois)
+    antigos = {nome: getattr(modulo, nome) for nome, _ in params if hasattr(modulo, nome)}
+    for nome, valor in params:
+        if nome in antigos and (fase, nome) not in AJUSTES:
+            setattr(modulo, nome, valor)
+    try:
+        saida = []
+        for seed in seeds:
+            state = novo_estado(seed=seed) if fase == "fase1" else novo_estado()
+            for nome, valor in params:
+                if (fase, nome) in AJUSTES:
+                    AJUSTES[(fase, nome)](state, valor, antigos[nome])
+                elif nome not in antigos:
+                    setattr(state, nome, valor)
+
+            pol = _politica(politica, seed, troca)
+            result, t, foi_visto = None, 0.0, False
+            while t < max_tempo:
+                result = step(state, pol(state, t), dt)
+                t += dt
+                if visto is not None and not foi_visto:
+                    foi_visto = bool(visto(state, result))
+                if result:
+                    break
+            saida.append((result, t, foi_visto))
+        return saida
+    finally:
+        for nome, valor in antigos.items():
+            setattr(modulo, nome, valor)
+
+
+# ----- COMBINAÇÕES -----
+def _ler_params(lista, fases):
+    # ["fase2.CAM_FOV_ANGLE=60,70"] -> {fase: [(nome, [valores])]}
+    por_fase = {fase: [] for fase in fases}
+    for item in lista:
+        chave, _, valores = item.partition("=")
+        fase, _, nome = chave.partition(".")
+        if fase not in por_fase or not nome or not valores:
+            raise ValueError(f"--param inválido: {item!r} (use fase.NOME=v1,v2 com a fase em --fases)")
+        por_fase[fase].append((nome, [float(v) for v in valores.split(",")]))
+    return por_fase
+
+
+def _conferir_nomes(por_fase):
+    # nome que não é constante do módulo nem atributo do estado: erro logo, antes de rodar
+    for fase, params in por_fase.items():
+        modulo = MODULOS[fase]
+        state = None
+        for nome, _ in params:
+            if hasattr(modulo, nome):
+                continue
+            if state is None:
+                novo_estado = simulacao.FASES[fase][0]
+                state = novo_estado(seed=0) if fase == "fase1" else novo_estado()
+            if not hasattr(state, nome):
+                raise ValueError(f"{fase} não tem {nome} (nem no módulo nem no estado)")
+
+
+def combinacoes(por_fase):
+    # [(fase, [(nome, valor), ...])]: todas as combinações de cada fase (uma só, sem --param)
+    saida = []
+    for fase, params in por_fase.items():
+        nomes = [nome for nome, _ in params]
+        for valores in itertools.product(*[v for _, v in params]):
+            saida.append((fase, list(zip(nomes, valores))))
+    return saida
+
+
+# ----- RESUMO -----
+def resumir(fase, resultados):
+    # resultados: [(resultado, tempo, foi visto)] -> linha do CSV (sem os parâmetros)
+    n = len(resultados)
+    contagem = Counter(str(r) for r, _, _ in resultados)
+    vistos = sum(1 for _, _, v in resultados if v)
+    tempos_vitoria = [t for r, t, _ in resultados if r in VITORIAS[fase]]
+    return {
+        "partidas": n,
+        "vistos": vistos if fase in VISTO else "",
+        "taxa_deteccao": round(vistos / n, 4) if fase in VISTO and n else "",
+        "vitorias": len(tempos_vitoria),
+        "taxa_vitoria": round(len(tempos_vitoria) / n, 4) if n else "",
+        "tempo_medio": round(sum(t for _, t, _ in resultados) / n, 3) if n else "",
+        "tempo_medio_vitoria": round(sum(tempos_vitoria) / len(tempos_vitoria), 3) if tempos_vitoria else "",
+        "resultados": contagem,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="balanceamento: muitas partidas sem janela por combinação de parâmetros")
+    parser.add_argument("--fases", default="fase2,fase3")
+    parser.add_argument("--partidas", type=int, default=100, help="partidas por combinação")
+    parser.add_argument("--param", action="append", default=[], metavar="FASE.NOME=V1,V2",
+                        help="valores a testar (pode repetir)")
+    parser.add_argument("--politica", default="aleatoria", help="aleatoria, parado ou um roteiro .json")
+    parser.add_argument("--troca", type=float, default=0.5, help="(aleatoria) troca de tecla a cada tantos segundos")
+    parser.add_argument("--max-tempo", type=float, default=simulacao.MAX_TEMPO)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--saida", default="balanceamento.csv")
+    args = parser.parse_args(argv)
+
+    fases = [f for f in args.fases.split(",") if f]
+    desconhecidas = [f for f in fases if f not in simulacao.FASES]
+    if desconhecidas:
+        parser.error(f"fase desconhecida: {', '.join(desconhecidas)} (use {', '.join(simulacao.FASES)})")
+    try:
+        por_fase = _ler_params(args.param, fases)
+        _conferir_nomes(por_fase)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.politica not in ("aleatoria", "parado") and not os.path.exists(args.politica):
+        parser.error(f"política desconhecida (nem arquivo de roteiro): {args.politica}")
+
+    combos = combinacoes(por_fase)
+    processos = max(1, args.processos)
+
+    # cada combinação vira uns pedaços de partidas, pra dividir bem entre os processos
+    pedaco = max(1, min(25, args.partidas // max(1, (4 * processos) // max(1, len(combos)))))
+    tarefas, donos = [], []
+    for k, (fase, params) in enumerate(combos):
+        for ini in range(0, args.partidas, pedaco):
+            seeds = list(range(ini, min(args.partidas, ini + pedaco)))
+            tarefas.append((fase, params, seeds, args.politica, args.troca, args.max_tempo))
+            donos.append(k)
+
+    print(f"{len(combos)} combinação(ões) x {args.partidas} partidas = {len(combos) * args.partidas} partidas "
+          f"em {processos} processo(s)")
+    inicio = time.perf_counter()
+    resultados = [[] for _ in combos]
+    if processos == 1:
+        lotes = map(rodar_lote, tarefas)
+    else:
+        pool = ProcessPoolExecutor(max_workers=processos)
+        lotes = pool.map(rodar_lote, tarefas)
+    try:
+        for k, lote in zip(donos, lotes):
+            resultados[k].extend(lote)
+    finally:
+        if processos > 1:
+            pool.shutdown()
+    gasto = time.perf_counter() - inicio
+
+    # uma linha por combinação; colunas de parâmetro e de resultado são a união de todas
+    linhas = [(fase, params, resumir(fase, res)) for (fase, params), res in zip(combos, resultados)]
+    nomes = list(dict.fromkeys(f"{fase}.{nome}" for fase, params in combos for nome, _ in params))
+    tipos = sorted({r for _, _, resumo in linhas for r in resumo["resultados"]})
+    campos = ["partidas", "vistos", "taxa_deteccao", "vitorias", "taxa_vitoria", "tempo_medio", "tempo_medio_vitoria"]
+    with open(args.saida, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["fase"] + nomes + campos + [f"resultado_{r}" for r in tipos])
+        for fase, params, resumo in linhas:
+            valores = {f"{fase}.{nome}": v for nome, v in params}
+            w.writerow([fase] + [valores.get(n, "") for n in nomes] + [resumo[c] for c in campos]
+                       + [resumo["resultados"].get(r, 0) for r in tipos])
+
+    total = len(combos) * args.partidas
+    print(f"pronto em {gasto:.1f}s ({total / gasto:.1f} partidas/s)")
+    for fase, params, resumo in linhas:
+        desc = ", ".join(f"{nome}={v:g}" for nome, v in params) or "padrão"
+        deteccao = f"visto {100.0 * resumo['taxa_deteccao']:5.1f}%  " if resumo["taxa_deteccao"] != "" else ""
+        vit = resumo["tempo_medio_vitoria"]
+        print(f"  {fase} {desc}: {deteccao}passou {100.0 * resumo['taxa_vitoria']:5.1f}%"
+              + (f" (em {vit:.1f}s)" if vit != "" else ""))
+    print("salvo em", args.saida)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
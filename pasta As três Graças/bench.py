@@ -0,0 +1,279 @@
+# bench.py
+# Mede quanto custa cada frame das três fases (update e draw separados),
+# rodando com entradas programadas e sem janela de verdade (SDL dummy).
+# Mostra p50/p95/p99, memória alocada por frame e quantos blits vão pra tela,
+# e salva tudo num JSON pra comparar entre commits.
+#
+# uso: python bench.py [--frames 600] [--fases fase1,fase2,fase3] [--saida bench.json] [--comparar antigo.json]
+
+import os
+import sys
+import math
+import json
+import time
+import argparse
+import subprocess
+import tracemalloc
+
+# sem janela e sem som (precisa vir antes de importar o pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import entrada
+import simulacao
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WIDTH, HEIGHT = 1024, 640
+FPS = 60
+
+
+class _Fim(Exception):
+    # já deu o número de frames pedido: sai de dentro do run()
+    pass
+
+
+class _TelaContada(pygame.Surface):
+    # "tela" que conta quantos blits recebe (as fases só desenham por blit/draw nela)
+    blits = 0
+
+    def blit(self, *args, **kwargs):
+        self.blits += 1
+        return super().blit(*args, **kwargs)
+
+
+class _Medidor:
+    # junta os números de cada frame: tempo de update, tempo de draw, blits e memória
+    def __init__(self, frames, tela, memoria=False):
+        self.frames = frames
+        self.tela = tela
+        self.memoria = memoria
+        self.update_ms = []
+        self.draw_ms = []
+        self.blits = []
+        self.alloc_kb = []
+        self._inicio = None
+        self._update = 0.0
+        self._mem0 = 0
+
+    def comecar(self):
+        self._update = 0.0
+        self.tela.blits = 0
+        if self.memoria:
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._inicio = time.perf_counter()
+
+    def terminar(self):
+        # fecha o frame atual (se tiver um aberto); o que não é update conta como draw
+        if self._inicio is None:
+            return
+        total = time.perf_counter() - self._inicio
+        if self.memoria:
+            self.alloc_kb.append((tracemalloc.get_traced_memory()[1] - self._mem0) / 1024.0)
+        else:
+            self.update_ms.append(self._update * 1000.0)
+            self.draw_ms.append((total - self._update) * 1000.0)
+            self.blits.append(self.tela.blits)
+        self._inicio = None
+
+    def descartar(self):
+        # frame que não chegou ao fim (a fase acabou no meio dele)
+        self._inicio = None
+
+    def contados(self):
+        return len(self.alloc_kb) if self.memoria else len(self.update_ms)
+
+    def medir_update(self, step):
+        # embrulha o step da fase pra somar o tempo gasto nele
+        def medido(*args):
+            t0 = time.perf_counter()
+            try:
+                return step(*args)
+            finally:
+                self._update += time.perf_counter() - t0
+        return medido
+
+
+class _Relogio:
+    # substitui o pygame.time.Clock dentro do run(): dt fixo e cada tick fecha um frame
+    def __init__(self, medidor):
+        self.medidor = medidor
+
+    def tick(self, fps=0):
+        self.medidor.terminar()
+        if self.medidor.contados() >= self.medidor.frames:
+            raise _Fim()
+        self.medidor.comecar()
+        return 1000.0 / FPS
+
+    def get_fps(self):
+        return float(FPS)
+
+
+def _entradas(seed=0):
+    # as mesmas "teclas" em todo benchmark (troca de direção a cada meio segundo)
+    politica = simulacao.aleatoria(seed=seed)
+    passo = {"t": 0.0}
+
+    def do_teclado():
+        ent = politica(None, passo["t"])
+        passo["t"] += 1.0 / FPS
+        return ent
+    return do_teclado
+
+
+def _bench_fase1(medidor, font):
+    # igual ao loop da fase 1 no main: update(dt do frame) e depois draw()
+    from fase1 import Fase1
+    teclado_original = entrada.Entrada.do_teclado
+    entrada.Entrada.do_teclado = staticmethod(_entradas())
+    fase = None
+    try:
+        while medidor.contados() < medidor.frames:
+            if fase is None:
+                fase = Fase1(medidor.tela, font)
+            medidor.comecar()
+            t0 = time.perf_counter()
+            result = fase.update(1.0 / FPS)
+            medidor._update += time.perf_counter() - t0
+            fase.draw()
+            medidor.terminar()
+            if result:
+                fase = None
+    finally:
+        entrada.Entrada.do_teclado = teclado_original
+        try:
+            pygame.mixer.stop()
+        except Exception:
+            pass
+
+
+def _bench_run(modulo, medidor, font):
+    # roda o run() de verdade; o step é embrulhado pra separar update de draw
+    step_original = modulo.step
+    teclado_original = entrada.Entrada.do_teclado
+    fim_original = getattr(modulo, "show_end_screen_local", None)
+
+    modulo.step = medidor.medir_update(step_original)
+    entrada.Entrada.do_teclado = staticmethod(_entradas())
+    if fim_original:
+        # a tela de fim espera tecla pra sempre; aqui só volta e recomeça a fase
+        modulo.show_end_screen_local = lambda *a, **k: None
+    try:
+        while medidor.contados() < medidor.frames:
+            try:
+                modulo.run(medidor.tela, _Relogio(medidor), font, BASE_DIR)
+            except _Fim:
+                break
+            medidor.descartar()
+    finally:
+        modulo.step = step_original
+        entrada.Entrada.do_teclado = teclado_original
+        if fim_original:
+            modulo.show_end_screen_local = fim_original
+        try:
+            pygame.mixer.stop()
+            pygame.mixer.music.stop()
+        except Exception:
+            pass
+
+
+def rodar_fase(nome, frames, font, memoria=False):
+    # roda "frames" frames da fase com as entradas programadas (o bake.py também usa,
+    # pra passar por tudo que a fase carrega e escala)
+    tela = _TelaContada((WIDTH, HEIGHT))
+    medidor = _Medidor(frames, tela, memoria)
+    if nome == "fase1":
+        _bench_fase1(medidor, font)
+    else:
+        _bench_run(__import__(nome), medidor, font)
+    return medidor
+
+
+def percentis(valores):
+    # p50/p95/p99 (rank mais próximo) + média e máximo
+    if not valores:
+        return {}
+    v = sorted(valores)
+    def p(q):
+        return v[max(0, math.ceil(q / 100.0 * len(v)) - 1)]
+    return {
+        "p50": round(p(50), 4),
+        "p95": round(p(95), 4),
+        "p99": round(p(99), 4),
+        "media": round(sum(v) / len(v), 4),
+        "max": round(v[-1], 4),
+    }
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def medir(fases, frames):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.SysFont("consolas", 20)
+
+    resultado = {"commit": _commit(), "frames": frames, "fases": {}}
+    for nome in fases:
+        # primeiro só tempo (tracemalloc deixa tudo mais lento), depois só memória
+        tempo = rodar_fase(nome, frames, font)
+        tracemalloc.start()
+        try:
+            mem = rodar_fase(nome, frames, font, memoria=True)
+        finally:
+            tracemalloc.stop()
+        resultado["fases"][nome] = {
+            "update_ms": percentis(tempo.update_ms),
+            "draw_ms": percentis(tempo.draw_ms),
+            "blits": percentis(tempo.blits),
+            "alloc_kb": percentis(mem.alloc_kb),
+        }
+    return resultado
+
+
+def mostrar(resultado, antigo=None):
+    print(f"commit {resultado['commit']}  ({resultado['frames']} frames por fase)")
+    for nome, dados in resultado["fases"].items():
+        print(nome)
+        for chave in ("update_ms", "draw_ms", "blits", "alloc_kb"):
+            d = dados[chave]
+            linha = f"  {chave:10s} p50 {d['p50']:9.3f}  p95 {d['p95']:9.3f}  p99 {d['p99']:9.3f}"
+            velho = (antigo or {}).get("fases", {}).get(nome, {}).get(chave)
+            if velho and velho.get("p50"):
+                linha += f"   (p50 {100.0 * (d['p50'] / velho['p50'] - 1):+.1f}% vs {antigo.get('commit')})"
+            print(linha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark por frame das fases")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--fases", default="fase1,fase2,fase3")
+    parser.add_argument("--saida", default="bench.json")
+    parser.add_argument("--comparar", default=None, help="JSON de um benchmark antigo")
+    args = parser.parse_args(argv)
+
+    resultado = medir([f.strip() for f in args.fases.split(",") if f.strip()], args.frames)
+
+    antigo = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            antigo = json.load(f)
+    mostrar(resultado, antigo)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+    print("salvo em", args.saida)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
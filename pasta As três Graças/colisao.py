@@ -0,0 +1,129 @@
+# colisao.py
+# Grade uniforme sobre as paredes (que são estáticas): em vez de testar o player
+# ou um raio de visão contra TODAS as paredes, só testa as que estão nas células perto.
+# O niveis.py guarda a grade já montada no cache do nível (celulas/caixas), pra não refazer.
+
+import math
+
+CELL_SIZE = 64   # tamanho da célula da grade (px)
+CELL_PAD = 6     # cada parede também entra nas células a até 6 px dela (cobre a margem da visão
+                 # e a da reta dos guardas, navegacao.MARGEM_RETA)
+LOS_MARGIN = 2   # margem da linha de visão (o visao.py usa esta)
+
+
+def caixa_visao(w, margin=LOS_MARGIN):
+    # a parede engordada pela margem da visão, já como (left, top, right, bottom)
+    return (w.left - margin, w.top - margin, w.right + margin, w.bottom + margin)
+
+
+class GradeParedes:
+    def __init__(self, walls, cell=CELL_SIZE, cells=None, caixas=None):
+        # monta a grade uma vez por nível (ou quando a lista de paredes muda)
+        # cells/caixas: a grade já montada antes (cache do nível), aí só reaproveita
+        self.walls = list(walls)
+        self.cell = cell
+        # caixas da linha de visão, na mesma ordem das paredes
+        self.caixas = caixas if caixas is not None else [caixa_visao(w) for w in self.walls]
+        if cells is not None:
+            self.cells = cells
+            return
+        self.cells = {}  # (cx, cy) -> índices das paredes naquela célula
+        for i, w in enumerate(self.walls):
+            r = w.inflate(CELL_PAD*2, CELL_PAD*2)
+            for cx in range(r.left // cell, (r.right - 1) // cell + 1):
+                for cy in range(r.top // cell, (r.bottom - 1) // cell + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    # a grade continua funcionando como lista (desenho, "for w in walls" etc.)
+    def __iter__(self):
+        return iter(self.walls)
+
+    def __len__(self):
+        return len(self.walls)
+
+    def __getitem__(self, i):
+        return self.walls[i]
+
+    def _lista(self, idx):
+        # devolve as paredes na ordem original (resultado não depende da ordem das células)
+        return [self.walls[i] for i in sorted(idx)]
+
+    def perto(self, rect, margin=8):
+        # paredes nas células que o rect (com uma folguinha) ocupa
+        c = self.cell
+        r = rect.inflate(margin*2, margin*2)
+        idx = set()
+        for cx in range(r.left // c, (r.right - 1) // c + 1):
+            for cy in range(r.top // c, (r.bottom - 1) // c + 1):
+                ids = self.cells.get((cx, cy))
+                if ids:
+                    idx.update(ids)
+        return self._lista(idx)
+
+    def no_segmento(self, start, end):
+        # paredes nas células que o segmento atravessa (percorre a grade tipo DDA)
+        return self._lista(self._idx_segmento(start, end))
+
+    def caixas_no_segmento(self, start, end):
+        # igual ao no_segmento, mas cada parede vem junto com a caixa da visão já pronta
+        return [(self.walls[i], self.caixas[i]) for i in sorted(self._idx_segmento(start, end))]
+
+    def _idx_segmento(self, start, end):
+        c = self.cell
+        x0, y0 = start
+        x1, y1 = end
+        cx, cy = int(x0 // c), int(y0 // c)
+        ex, ey = int(x1 // c), int(y1 // c)
+        dx, dy = x1 - x0, y1 - y0
+
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx != 0:
+            t_max_x = ((cx + (1 if dx > 0 else 0)) * c - x0) / dx
+            t_delta_x = c / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            t_max_y = ((cy + (1 if dy > 0 else 0)) * c - y0) / dy
+            t_delta_y = c / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        idx = set()
+        ids = self.cells.get((cx, cy))
+        if ids:
+            idx.update(ids)
+        for _ in range(abs(ex - cx) + abs(ey - cy)):
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            ids = self.cells.get((cx, cy))
+            if ids:
+                idx.update(ids)
+        return idx
+
+
+def perto(walls, rect):
+    # aceita tanto a grade quanto uma lista simples de paredes
+    busca = getattr(walls, "perto", None)
+    return busca(rect) if busca else walls
+
+
+def no_segmento(walls, start, end):
+    # idem, pra linha de visão
+    busca = getattr(walls, "no_segmento", None)
+    return busca(start, end) if busca else walls
+
+
+def caixas_no_segmento(walls, start, end, margin=LOS_MARGIN):
+    # (parede, caixa da visão) perto do segmento; a grade já tem as caixas prontas
+    # (margem maior que o CELL_PAD: a grade pode não ter a parede nas células do
+    # segmento, então testa todas)
+    busca = getattr(walls, "caixas_no_segmento", None)
+    if busca and margin == LOS_MARGIN:
+        return busca(start, end)
+    perto = no_segmento(walls, start, end) if margin <= CELL_PAD else walls
+    return [(w, caixa_visao(w, margin)) for w in perto]
@@ -0,0 +1,101 @@
+# entidades.py
+# Guardas (fase 3) e câmeras (fase 2) guardados "por coluna": cada número de uma
+# entidade (posição, direção, ângulo, velocidade, timers...) mora numa array contígua
+# com um valor por entidade, em vez de espalhado em atributos e Vector2 de cada objeto.
+# O Guard e a Camera viram só uma alça (tabela + índice, com __slots__) e os atributos
+# deles leem/escrevem direto na coluna. Assim a patrulha, a varredura e os timers de
+# animação andam pra todas as entidades de uma vez num passo só: com numpy (se tiver
+# e se tiver entidade suficiente) a conta é feita na coluna inteira, senão um loop
+# simples sobre as arrays, com exatamente a mesma conta.
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOTE_MINIMO = 32    # com menos que isso, o custo fixo de cada operação numpy perde pro loop
+
+NADA = math.nan     # valor "None" nas colunas opcionais (ex: câmera sem limite de varredura)
+
+
+class Tabela:
+    def __init__(self, **campos):
+        # campos: nome da coluna -> valor padrão de uma entidade nova
+        self.padrao = campos
+        self.col = {nome: array("d") for nome in campos}
+        self.n = 0
+        self._vistas = {}   # nome -> visão numpy da coluna (refeitas se a tabela crescer)
+
+    def __len__(self):
+        return self.n
+
+    def novo(self, **valores):
+        # acrescenta uma entidade; devolve o índice dela nas colunas
+        # (solta as visões numpy antes: array não cresce com uma visão aberta)
+        self._vistas.clear()
+        for nome, col in self.col.items():
+            col.append(valores.get(nome, self.padrao[nome]))
+        self.n += 1
+        return self.n - 1
+
+    def em_lote(self, minimo=LOTE_MINIMO):
+        # vale fazer a conta com numpy em vez do loop? (conta com mais passos: minimo maior)
+        return np is not None and self.n >= minimo
+
+    def vetores(self, *nomes):
+        # visões numpy das colunas (sem copiar: escrever nelas escreve na tabela)
+        # ficam guardadas até a tabela crescer; não guarde elas fora do passo
+        vistas = self._vistas
+        for nome in nomes:
+            if nome not in vistas:
+                vistas[nome] = np.frombuffer(self.col[nome], dtype=np.float64)
+        return [vistas[nome] for nome in nomes]
+
+
+# ----- ATRIBUTOS DAS ALÇAS -----
+# (a classe da alça tem __slots__ = ("_t", "_i", ...) e declara os atributos com estes)
+def coluna(nome, tipo=float):
+    # atributo guardado na coluna "nome" (tipo: como devolver, ex: int/bool)
+    def ler(self):
+        return tipo(self._t.col[nome][self._i])
+
+    def escrever(self, v):
+        self._t.col[nome][self._i] = v
+    return property(ler, escrever)
+
+
+def opcional(nome):
+    # igual a coluna(), mas None vira NADA (e volta None)
+    def ler(self):
+        v = self._t.col[nome][self._i]
+        return None if math.isnan(v) else v
+
+    def escrever(self, v):
+        self._t.col[nome][self._i] = NADA if v is None else v
+    return property(ler, escrever)
+
+
+def par(nome_x, nome_y, fazer):
+    # atributo de dois números (fazer: o que montar com eles, ex: pygame.Vector2)
+    def ler(self):
+        return fazer(self._t.col[nome_x][self._i], self._t.col[nome_y][self._i])
+
+    def escrever(self, v):
+        self._t.col[nome_x][self._i] = v[0]
+        self._t.col[nome_y][self._i] = v[1]
+    return property(ler, escrever)
+
+
+def rotulo(nome, valores):
+    # atributo de texto entre poucas opções, guardado como o índice em "valores"
+    indice = {v: i for i, v in enumerate(valores)}
+
+    def ler(self):
+        return valores[int(self._t.col[nome][self._i])]
+
+    def escrever(self, v):
+        self._t.col[nome][self._i] = indice[v]
+    return property(ler, escrever)
@@ -0,0 +1,93 @@
+# entrada.py
+# O que o jogador está apertando num frame, separado do teclado de verdade.
+# As fases recebem uma Entrada em vez de chamar pygame.key.get_pressed() direto,
+# aí dá pra rodar a lógica sem janela com entradas "falsas" (simulação, testes).
+
+import pygame
+
+# ordem dos bits na máscara (os dígitos 0-9 vêm depois desses)
+BOTOES = ("left", "right", "up", "down", "space", "e", "enter", "esc", "backspace")
+DIGITOS = "0123456789"
+
+# teclas de cada botão (setas e WASD andam igual nas três fases)
+_TECLAS = {
+    "left": (pygame.K_LEFT, pygame.K_a),
+    "right": (pygame.K_RIGHT, pygame.K_d),
+    "up": (pygame.K_UP, pygame.K_w),
+    "down": (pygame.K_DOWN, pygame.K_s),
+    "space": (pygame.K_SPACE,),
+    "e": (pygame.K_e,),
+    "enter": (pygame.K_RETURN,),
+    "esc": (pygame.K_ESCAPE,),
+    "backspace": (pygame.K_BACKSPACE,),
+}
+_TECLAS_DIGITO = {
+    ch: (getattr(pygame, f"K_{ch}"), getattr(pygame, f"K_KP{ch}")) for ch in DIGITOS
+}
+
+
+class Entrada:
+    __slots__ = BOTOES + ("digitos",)
+
+    def __init__(self, left=False, right=False, up=False, down=False, space=False,
+                 e=False, enter=False, esc=False, backspace=False, digitos=""):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.space = space
+        self.e = e
+        self.enter = enter
+        self.esc = esc
+        self.backspace = backspace
+        self.digitos = frozenset(digitos)  # dígitos apertados agora ("0".."9")
+
+    @classmethod
+    def do_teclado(cls):
+        # lê o estado atual do teclado (é o que as fases usam jogando de verdade)
+        keys = pygame.key.get_pressed()
+        ent = cls()
+        for nome, teclas in _TECLAS.items():
+            setattr(ent, nome, any(keys[k] for k in teclas))
+        ent.digitos = frozenset(ch for ch, teclas in _TECLAS_DIGITO.items() if any(keys[k] for k in teclas))
+        return ent
+
+    def direcao(self):
+        # (dx, dy) sem normalizar, igual as fases faziam com as teclas
+        dx = (1 if self.right else 0) - (1 if self.left else 0)
+        dy = (1 if self.down else 0) - (1 if self.up else 0)
+        return dx, dy
+
+    def mascara(self):
+        # tudo num int só (9 botões + 10 dígitos = 19 bits)
+        m = 0
+        for i, nome in enumerate(BOTOES):
+            if getattr(self, nome):
+                m |= 1 << i
+        for i, ch in enumerate(DIGITOS):
+            if ch in self.digitos:
+                m |= 1 << (len(BOTOES) + i)
+        return m
+
+    @classmethod
+    def da_mascara(cls, m):
+        # o contrário de mascara()
+        ent = cls()
+        for i, nome in enumerate(BOTOES):
+            setattr(ent, nome, bool(m & (1 << i)))
+        ent.digitos = frozenset(ch for i, ch in enumerate(DIGITOS) if m & (1 << (len(BOTOES) + i)))
+        return ent
+
+    def __eq__(self, other):
+        return isinstance(other, Entrada) and self.mascara() == other.mascara()
+
+    def __hash__(self):
+        return self.mascara()
+
+    def __repr__(self):
+        apertados = [n for n in BOTOES if getattr(self, n)] + sorted(self.digitos)
+        return f"Entrada({', '.join(apertados)})"
+
+
+# nada apertado
+NADA = Entrada()
@@ -3,6 +3,14 @@ import math
 import random
 import os 
 
+import audio
+import entrada
+import niveis
+import perfil
+import recursos
+import replay
+import tempo
+
 # Cores usadas na fase (pra ficar fácil reaproveitar e mudar depois)
 WHITE = (240,240,240)
 ALARM_COLOR = (220,20,20)
@@ -12,48 +20,52 @@ PAPER_COLOR = (238, 229, 190)
 WALL_COLOR = (25,25,25)
 
 class Fase1:
-    def __init__(self, screen, font):
+    def __init__(self, screen, font, headless=False, seed=None):
         # referência pra desenhar na tela e escrever texto
+        # headless = só a lógica (simulação sem janela): não carrega imagem nem som
+        # seed = mesma senha e mesmo esconderijo (replay); None sorteia
         self.screen = screen
         self.font = font
+        self.headless = headless
+        self.rng = random.Random(seed)
         self.width, self.height = screen.get_size()
 
-        # tenta carregar o piso (tile) pra repetir na tela toda
-        try:
-            module_dir = os.path.dirname(os.path.abspath(__file__))
-            floor_path = os.path.join(module_dir, "assets", "piso_madeira.png")
-            img = pygame.image.load(floor_path).convert()
-
-            # deixa o tile menor (aqui dá pra mudar o tamanho do piso)
-            self.floor_tile = pygame.transform.smoothscale(img, (74, 74))
-        except Exception:
-            self.floor_tile = None
-
-        # overlay escuro em cima do piso, pra dar um clima mais “fechado”
-        self.floor_overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        self.floor_overlay.fill((0, 0, 0, 100))
+        # paredes, esconderijos e cofre vêm do niveis/fase1.json
+        self.nivel = niveis.carregar("fase1", (self.width, self.height))
 
-        # tenta carregar a imagem da “caixa do timer”
-        try:
-            module_dir = os.path.dirname(os.path.abspath(__file__))
-            timer_path = os.path.join(module_dir, "assets", "timer_box.png")
-            self.timer_box = pygame.image.load(timer_path).convert_alpha()
-        except Exception:
-            self.timer_box = None
+        # piso e cofre só são lidos se o fundo tiver que ser montado (ver _montar_fundo)
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        self.floor_path = os.path.join(module_dir, "assets", "piso_madeira.png")
+        self.cofre_path = os.path.join(module_dir, "assets", "cofre.png")
+        self.timer_box = None
+        if not headless:
+            # tenta carregar a imagem da “caixa do timer”
+            try:
+                timer_path = os.path.join(module_dir, "assets", "timer_box.png")
+                self.timer_box = recursos.imagem(timer_path)
+            except Exception:
+                self.timer_box = None
 
 
         # ---------------- JOGADOR (posição e colisão) ----------------
-        self.player_rect = pygame.Rect(50, 50, 64, 96)  # onde desenha o player
+        self.player_rect = pygame.Rect(*self.nivel.ponto("jogador"), 64, 96)  # onde desenha o player
         self.hitbox = self.player_rect.inflate(-30, -30)  # hitbox menor pra colisão ficar mais “justa”
         self.hitbox.midbottom = self.player_rect.midbottom
+        # posição da hitbox em float (o Rect arredonda, e em passos pequenos isso mudaria a velocidade)
+        self.hit_fx, self.hit_fy = float(self.hitbox.x), float(self.hitbox.y)
+        self.prev_player_center = None  # centro no passo anterior (pra interpolar o desenho)
         self.facing_left = False
         self.facing = "down"
 
         # ---------------- SPRITES DO JOGADOR ----------------
         # tenta carregar sprites (se falhar, o jogo usa retângulo)
+        # já vêm recortados (sem a transparência em volta) e saem do cache global
         self._images_ok = False
         try:
-            module_dir = os.path.dirname(os.path.abspath(__file__))
+            # sem janela não tem sprite: cai direto no fallback do retângulo
+            if headless:
+                raise RuntimeError("headless")
+
             player_dir = os.path.join(module_dir, "assets", "player")
             idle_path = os.path.join(player_dir, "idle.png")
             walk_paths = [os.path.join(player_dir, f"walk_{i}.png") for i in range(4)]
@@ -69,7 +81,7 @@ class Fase1:
             for d, fn in dir_files.items():
                 p = os.path.join(player_dir, fn)
                 if os.path.exists(p):
-                    self.player_dir[d] = pygame.image.load(p).convert_alpha()
+                    self.player_dir[d] = recursos.imagem(p, trim=True)
 
             # sprites idle por direção
             self.player_idle_dir = {}
@@ -82,7 +94,7 @@ class Fase1:
             for d, fn in idle_files.items():
                 p = os.path.join(player_dir, fn)
                 if os.path.exists(p):
-                    self.player_idle_dir[d] = pygame.image.load(p).convert_alpha()
+                    self.player_idle_dir[d] = recursos.imagem(p, trim=True)
 
             # sprites de caminhada por direção (3 frames)
             self.player_walk_dir = {}
@@ -91,13 +103,13 @@ class Fase1:
                 for i in range(3):
                     p = os.path.join(player_dir, f"walk_{i}{d}.png")
                     if os.path.exists(p):
-                        frames.append(pygame.image.load(p).convert_alpha())
+                        frames.append(recursos.imagem(p, trim=True))
                 if frames:
                     self.player_walk_dir[d] = frames
 
             # tenta pegar um idle geral
             if os.path.exists(idle_path):
-                self.player_idle = pygame.image.load(idle_path).convert_alpha()
+                self.player_idle = recursos.imagem(idle_path, trim=True)
             else:
                 # fallback: pega idle down, ou walk down, senão dá erro
                 if "down" in self.player_idle_dir:
@@ -111,7 +123,7 @@ class Fase1:
             self.player_walk = []
             for p in walk_paths:
                 if os.path.exists(p):
-                    self.player_walk.append(pygame.image.load(p).convert_alpha())
+                    self.player_walk.append(recursos.imagem(p, trim=True))
 
             # se não tiver walk, usa o idle como walk pra não quebrar
             if len(self.player_walk) >= 1:
@@ -120,21 +132,6 @@ class Fase1:
                 self._images_ok = True
                 self.player_walk = [self.player_idle]
 
-            # corta transparência em volta (pra sprite ficar “encaixada” melhor)
-            for k in list(self.player_dir.keys()):
-                self.player_dir[k] = self._trim_sprite(self.player_dir[k])
-
-            for k in list(self.player_idle_dir.keys()):
-                self.player_idle_dir[k] = self._trim_sprite(self.player_idle_dir[k])
-
-            for k in list(self.player_walk_dir.keys()):
-                self.player_walk_dir[k] = [self._trim_sprite(s) for s in self.player_walk_dir[k]]
-
-            if self.player_idle is not None:
-                self.player_idle = self._trim_sprite(self.player_idle)
-
-            self.player_walk = [self._trim_sprite(s) for s in self.player_walk]
-
             # calcula um “tamanho base” dos sprites pra fazer scale proporcional
             all_sprites = []
             all_sprites += list(self.player_dir.values())
@@ -153,6 +150,10 @@ class Fase1:
                 self.base_w = 1
                 self.base_h = 1
 
+            # pré-escala todos os frames (e as versões espelhadas) uma vez só
+            scale = min(self.player_rect.width / self.base_w, self.player_rect.height / self.base_h)
+            self.player_atlas = recursos.atlas(all_sprites, scale)
+
         except Exception:
             # se qualquer coisa der errado, desativa sprites e usa retângulo
             self._images_ok = False
@@ -161,6 +162,7 @@ class Fase1:
             self.player_dir = {}
             self.player_idle_dir = {}
             self.player_walk_dir = {}
+            self.player_atlas = {}
             self.base_w = 1
             self.base_h = 1
 
@@ -174,38 +176,20 @@ class Fase1:
 
         # ---------------- PAPEL (onde pode estar escondido) ----------------
         # lista de lugares possíveis pra procurar o papel
-        self.hiding_spots = [
-            pygame.Rect(120, 120, 40, 24),
-            pygame.Rect(220, 160, 40, 24),
-            pygame.Rect(260, 320, 40, 24),
-            pygame.Rect(180, 520, 40, 24),
-            pygame.Rect(420, 140, 40, 24),
-            pygame.Rect(520, 180, 40, 24),
-            pygame.Rect(460, 320, 40, 24),
-            pygame.Rect(620, 520, 40, 24),
-            pygame.Rect(820, 140, 40, 24),
-            pygame.Rect(880, 360, 40, 24),
-        ]
+        self.hiding_spots = self.nivel.rects("esconderijos")
 
         # escolhe aleatório onde o papel vai estar
-        self.hiding_spot = random.choice(self.hiding_spots)
+        self.hiding_spot = self.rng.choice(self.hiding_spots)
         self.paper_rect = pygame.Rect(self.hiding_spot.x, self.hiding_spot.y, 85, 50)
         self.paper_hidden = True         # ainda não achou
         self.paper_opened = False        # abriu (mostra senha)
-        self.code = str(random.randint(1000, 9999))  # senha aleatória
+        self.code = str(self.rng.randint(1000, 9999))  # senha aleatória
         self.has_seen_code = False       # só pode digitar depois de ver a senha
 
         # ---------------- COFRE ----------------
-        # cofre fica no canto inferior direito
-        self.safe_rect = pygame.Rect(self.width - 16 - 140, self.height - 16 - 140, 140, 140)
-
-        # tenta carregar imagem do cofre
-        try:
-            module_dir = os.path.dirname(os.path.abspath(__file__))
-            cofre_path = os.path.join(module_dir, "assets", "cofre.png")
-            self.cofre_img = pygame.image.load(cofre_path).convert_alpha() if os.path.exists(cofre_path) else None
-        except Exception:
-            self.cofre_img = None
+        # cofre fica no canto inferior direito (e a área em volta onde dá pra usar ele)
+        self.safe_rect = self.nivel.rect("cofre")
+        self.safe_area = self.nivel.gatilho("cofre")
 
         # ---------------- TEMPO / INTERAÇÃO COM COFRE ----------------
         self.level_timer = 45.0               # tempo total da fase
@@ -221,150 +205,127 @@ class Fase1:
 
         # ---------------- PAREDES (colisão) ----------------
         # são retângulos que formam o labirinto / sala
-        self.walls = [
-            # bordas
-            pygame.Rect(0, 0, self.width, 16),
-            pygame.Rect(0, self.height-16, self.width, 16),
-            pygame.Rect(0, 0, 16, self.height),
-            pygame.Rect(self.width-16, 0, 16, self.height),
-
-            # parede vertical principal (porta MUITO larga)
-            pygame.Rect(340, 16, 20, 210),
-            pygame.Rect(320, 420, 20, self.height-16-420),
-
-            # parede horizontal superior (porta larga no centro)
-            pygame.Rect(340, 220, 220, 20),
-            pygame.Rect(720, 220, (self.width-16) - 720, 20),
-
-            # parede vertical direita (porta muito larga)
-            pygame.Rect(740, 240, 20, 140),
-            pygame.Rect(740, 560, 20, (self.height-16) - 560),
-
-            # parede horizontal inferior (deixa corredor largo — sem “dente”)
-            pygame.Rect(340, 420, 260, 20),
-        ]
+        self.walls = self.nivel.paredes()
 
         # remove esconderijos que encostam em paredes (pra não ficar impossível)
         self.hiding_spots = [r for r in self.hiding_spots if not any(r.colliderect(w) for w in self.walls)]
         if len(self.hiding_spots) == 0:
             self.hiding_spots = [pygame.Rect(120, 120, 40, 24)]
-        self.hiding_spot = random.choice(self.hiding_spots)
+        self.hiding_spot = self.rng.choice(self.hiding_spots)
+
+        # grade sobre as paredes: a colisão só testa as paredes perto do player
+        # (já vem montada do cache do nível)
+        self.wall_grid = self.nivel.grade()
+
+        # fundo estático montado uma vez (piso com overlay escuro, paredes, cofre...)
+        # e guardado no cache do nível: da próxima vez só lê os pixels prontos
+        self.sujos = []
+        self.background = None
+        if not headless:
+            self.background = self.nivel.fundo(
+                self._montar_fundo,
+                # (o próprio fase1.py e o recursos.py: mudou cor/desenho, refaz o fundo)
+                arquivos=(self.floor_path, self.cofre_path, __file__, recursos.__file__),
+                extra=f"COFRE {self.font.get_height()}")
 
         # guarda teclas numéricas anteriores pra evitar repetir quando segura a tecla
         self._prev_num_keys = set()
 
+        # a lógica anda em passos fixos (tempo.SIM_HZ por segundo), separada do FPS do desenho
+        self.passo = tempo.PassoFixo()
+
         # ---------------- SOM DO CRONÔMETRO ----------------
-        self.timer_sound = None
         self.timer_channel = None  
         self.timer_base_volume = 0.18
         self.timer_max_volume = 1.0
         self._initial_level_timer = self.level_timer
 
-        try:
-            module_dir = os.path.dirname(os.path.abspath(__file__))
-            cron_path = os.path.join(module_dir, "assets", "cronometro.mp3")
-
-            # só toca se o mixer estiver ativo e o arquivo existir
-            if os.path.exists(cron_path) and pygame.mixer.get_init():
-                try:
-                    self.timer_sound = pygame.mixer.Sound(cron_path)
-                    self.timer_sound.set_volume(self.timer_base_volume)
-                    self.timer_channel = self.timer_sound.play(loops=-1)
-                except Exception as e:
-                    print("Fase1: erro ao carregar/tocar cronometro:", e)
-                    self.timer_sound = None
-                    self.timer_channel = None
-
-        except Exception as e:
-            print("Fase1: erro ao configurar timer_sound:", e)
-            self.timer_sound = None
+        # só toca jogando de verdade (None se não tiver som ou arquivo)
+        if not headless:
+            self.timer_channel = audio.tocar("cronometro", loops=-1, volume=self.timer_base_volume)
         # ----------------------------------------------------
 
-    def _trim_sprite(self, surf):
-        # recorta área transparente em volta do sprite (melhora o scale/posicionamento)
-        try:
-            mask = pygame.mask.from_surface(surf)
-            rects = mask.get_bounding_rects()
-            if not rects:
-                return surf
-            r = rects[0].copy()
-            for rr in rects[1:]:
-                r.union_ip(rr)
-            return surf.subsurface(r).copy()
-        except Exception:
-            return surf
-
     def draw_text(self, txt, x, y, color=WHITE):
-        # helper simples pra renderizar texto
-        surf = self.font.render(txt, True, color)
-        self.screen.blit(surf, (x, y))
-
-    def _handle_numeric_input(self):
-        # lê teclado pra digitar números, backspace, enter e esc
-        keys = pygame.key.get_pressed()
-
-        num_keys = {
-            pygame.K_0: "0", pygame.K_1: "1", pygame.K_2: "2", pygame.K_3: "3", pygame.K_4: "4",
-            pygame.K_5: "5", pygame.K_6: "6", pygame.K_7: "7", pygame.K_8: "8", pygame.K_9: "9",
-            pygame.K_KP0: "0", pygame.K_KP1: "1", pygame.K_KP2: "2", pygame.K_KP3: "3", pygame.K_KP4: "4",
-            pygame.K_KP5: "5", pygame.K_KP6: "6", pygame.K_KP7: "7", pygame.K_KP8: "8", pygame.K_KP9: "9",
-        }
+        # helper simples pra renderizar texto (o render fica no cache de textos)
+        surf = recursos.texto(self.font, txt, color)
+        self.sujos.append(self.screen.blit(surf, (x, y)))
 
+    def _handle_numeric_input(self, inputs):
+        # digitar números, backspace, enter e esc (a partir da entrada do frame)
         enter_pressed = False
         esc_pressed = False
 
         # adiciona número só quando a tecla “acabou de ser pressionada”
-        for k, ch in num_keys.items():
-            if keys[k] and (k not in self._prev_num_keys):
+        for ch in sorted(inputs.digitos):
+            if ch not in self._prev_num_keys:
                 if len(self.typed_code) < self.max_code_len:
                     self.typed_code += ch
 
         # backspace apaga um caractere
-        if keys[pygame.K_BACKSPACE] and (pygame.K_BACKSPACE not in self._prev_num_keys):
+        if inputs.backspace and ("backspace" not in self._prev_num_keys):
             if self.typed_code:
                 self.typed_code = self.typed_code[:-1]
 
         # enter confirma e esc cancela
-        if keys[pygame.K_RETURN] and (pygame.K_RETURN not in self._prev_num_keys):
+        if inputs.enter and ("enter" not in self._prev_num_keys):
             enter_pressed = True
-        if keys[pygame.K_ESCAPE] and (pygame.K_ESCAPE not in self._prev_num_keys):
+        if inputs.esc and ("esc" not in self._prev_num_keys):
             esc_pressed = True
 
         # atualiza o conjunto de teclas que estão pressionadas agora
-        interested = set(list(num_keys.keys()) + [
-            pygame.K_BACKSPACE, pygame.K_RETURN, pygame.K_ESCAPE
-        ])
-        self._prev_num_keys = {k for k in interested if keys[k]}
+        self._prev_num_keys = set(inputs.digitos)
+        for nome in ("backspace", "enter", "esc"):
+            if getattr(inputs, nome):
+                self._prev_num_keys.add(nome)
 
         return enter_pressed, esc_pressed
 
     def update(self, dt):
-        # diminui o tempo da fase
-        self.level_timer -= dt
+        # jogando de verdade: lê o teclado, roda a lógica e cuida do som
+        # o dt do frame vira passos fixos (um frame lento não faz atravessar parede)
+        inputs = entrada.Entrada.do_teclado()
+        perfil.marcar("entrada")
+        result = None
+        for _ in range(self.passo.avancar(dt)):
+            replay.anotar("fase1", inputs)
+            # (na fase 1 o movimento do player é quase toda a lógica)
+            with perfil.secao("player"):
+                result = self.step(inputs, self.passo.dt)
+            if result:
+                replay.fim("fase1", result)
+                break
 
         # aumenta o volume do som do cronômetro conforme o tempo vai acabando
-        if self.timer_sound and self._initial_level_timer > 0:
+        if self.timer_channel and self._initial_level_timer > 0:
             progress = max(0.0, min(1.0, (self._initial_level_timer - self.level_timer) / self._initial_level_timer))
             eased = (math.exp(4.2 * progress) - 1.0) / (math.exp(4.2) - 1.0)
             volume = self.timer_base_volume + (self.timer_max_volume - self.timer_base_volume) * eased
-            self.timer_sound.set_volume(max(0.0, min(1.0, volume)))
+            audio.volume("cronometro", volume)
+
+        # acabou a fase (perdeu ou passou): para o cronômetro
+        if result and self.timer_channel:
+            audio.parar("cronometro")
+        perfil.marcar("logica")
+        return result
+
+    def step(self, inputs, dt):
+        # só a lógica da fase: não lê teclado, não desenha e não toca som
+        # (dá pra rodar sem janela, com entradas programadas)
+        self.prev_player_center = self.player_rect.center
+
+        # diminui o tempo da fase
+        self.level_timer -= dt
 
         # se o tempo acabou, perde a fase
         if self.level_timer <= 0:
-            if self.timer_channel:
-                self.timer_channel.stop()
             return "LOSE_TIME"
 
-        keys = pygame.key.get_pressed()
         dx = dy = 0
         speed = 220
 
         # enquanto está digitando, trava o movimento
         if not self.entering_code:
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= 1
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += 1
-            if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= 1
-            if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += 1
+            dx, dy = inputs.direcao()
 
         # atualiza direção do personagem (pra escolher sprite certo)
         if dx != 0 or dy != 0:
@@ -385,9 +346,14 @@ class Fase1:
         if dx or dy:
             mag = math.hypot(dx, dy)
             if mag != 0:
+                # se alguém mexeu na hitbox por fora, a posição float segue ela
+                if self.hitbox.x != round(self.hit_fx): self.hit_fx = float(self.hitbox.x)
+                if self.hitbox.y != round(self.hit_fy): self.hit_fy = float(self.hitbox.y)
+
                 # move no eixo X e resolve colisão com paredes e cofre
-                self.hitbox.x += (dx/mag) * speed * dt
-                for w in self.walls:
+                self.hit_fx += (dx/mag) * speed * dt
+                self.hitbox.x = round(self.hit_fx)
+                for w in self.wall_grid.perto(self.hitbox):
                     if self.hitbox.colliderect(w):
                         if dx > 0: self.hitbox.right = w.left
                         if dx < 0: self.hitbox.left = w.right
@@ -397,10 +363,12 @@ class Fase1:
                         self.hitbox.right = self.safe_rect.left
                     elif dx < 0:
                         self.hitbox.left = self.safe_rect.right
+                if self.hitbox.x != round(self.hit_fx): self.hit_fx = float(self.hitbox.x)
 
                 # move no eixo Y e resolve colisão com paredes e cofre
-                self.hitbox.y += (dy/mag) * speed * dt
-                for w in self.walls:
+                self.hit_fy += (dy/mag) * speed * dt
+                self.hitbox.y = round(self.hit_fy)
+                for w in self.wall_grid.perto(self.hitbox):
                     if self.hitbox.colliderect(w):
                         if dy > 0: self.hitbox.bottom = w.top
                         if dy < 0: self.hitbox.top = w.bottom
@@ -410,6 +378,7 @@ class Fase1:
                         self.hitbox.bottom = self.safe_rect.top
                     elif dy < 0:
                         self.hitbox.top = self.safe_rect.bottom
+                if self.hitbox.y != round(self.hit_fy): self.hit_fy = float(self.hitbox.y)
 
                 # atualiza onde desenha o player a partir da hitbox
                 self.player_rect.midbottom = self.hitbox.midbottom
@@ -418,21 +387,21 @@ class Fase1:
 
         # se encostar no lugar certo e apertar SPACE, revela o papel e a senha
         if self.player_rect.colliderect(self.hiding_spot.inflate(20, 20)):
-            if keys[pygame.K_SPACE]:
+            if inputs.space:
                 self.paper_rect.center = self.hiding_spot.center
                 self.paper_hidden = False
                 self.paper_opened = True
                 self.has_seen_code = True
 
         # perto do cofre, SPACE abre o modo de digitar (só se já viu a senha)
-        if self.player_rect.colliderect(self.safe_rect.inflate(28, 28)):
-            if not self.entering_code and keys[pygame.K_SPACE] and self.has_seen_code:
+        if self.player_rect.colliderect(self.safe_area):
+            if not self.entering_code and inputs.space and self.has_seen_code:
                 self.entering_code = True
                 self.typed_code = ""
 
         # enquanto digitando: pega teclas e decide enter/esc
         if self.entering_code and not self.safe_processing:
-            enter_pressed, esc_pressed = self._handle_numeric_input()
+            enter_pressed, esc_pressed = self._handle_numeric_input(inputs)
             if esc_pressed:
                 self.entering_code = False
             if enter_pressed:
@@ -446,8 +415,6 @@ class Fase1:
                 self.safe_processing = False
                 if self.typed_code == self.code:
                     # acertou: passa de fase
-                    if self.timer_channel:
-                        self.timer_channel.stop()
                     return "NEXT"
                 else:
                     # errou: limpa input e tira tempo como punição
@@ -475,24 +442,50 @@ class Fase1:
         # se não aconteceu nada especial, continua na fase
         return None
 
-    def draw(self):
-        # desenha o piso (tile repetido) ou cor sólida se não tiver imagem
-        if self.floor_tile:
-            tw, th = self.floor_tile.get_width(), self.floor_tile.get_height()
-            for y in range(0, self.height, th):
-                for x in range(0, self.width, tw):
-                    self.screen.blit(self.floor_tile, (x, y))
-            self.screen.blit(self.floor_overlay, (0, 0))
-        else:
-            self.screen.fill((20,20,25))
+    def _montar_fundo(self):
+        # junta tudo que não muda (piso + overlay, paredes, esconderijos e o cofre)
+        # numa Surface opaca só; o draw faz um blit dela e desenha o resto por cima
+        # (só roda sem o fundo no cache do nível, então piso e cofre são lidos aqui)
 
-        # desenha as paredes
-        for w in self.walls:
-            pygame.draw.rect(self.screen, WALL_COLOR, w)
+        # tenta carregar o piso (tile) pra repetir na tela toda
+        # (deixa o tile menor: aqui dá pra mudar o tamanho do piso)
+        try:
+            floor_tile = recursos.imagem(self.floor_path, alpha=False, size=(74, 74))
+        except Exception:
+            floor_tile = None
 
-        # desenha os lugares onde pode ter papel (mesmo que o papel não esteja em todos)
+        # tenta carregar imagem do cofre
+        try:
+            cofre_img = recursos.imagem(self.cofre_path) if os.path.exists(self.cofre_path) else None
+        except Exception:
+            cofre_img = None
+
+        base = recursos.piso((self.width, self.height), floor_tile, (20,20,25))
+        bg = recursos.fundo(base, self.walls, WALL_COLOR)
+
+        # os lugares onde pode ter papel (mesmo que o papel não esteja em todos)
         for spot in self.hiding_spots:
-            pygame.draw.rect(self.screen, PAPER_COLOR, spot)
+            pygame.draw.rect(bg, PAPER_COLOR, spot)
+
+        # cofre com imagem (se tiver), senão retângulo
+        if cofre_img:
+            try:
+                bg.blit(recursos.escalado(cofre_img, self.safe_rect.size), self.safe_rect.topleft)
+            except Exception:
+                pygame.draw.rect(bg, SAFE_COLOR, self.safe_rect)
+        else:
+            pygame.draw.rect(bg, SAFE_COLOR, self.safe_rect)
+
+        bg.blit(recursos.texto(self.font, "COFRE", WHITE), (self.safe_rect.x-5, self.safe_rect.y-25))
+        return bg
+
+    def draw(self):
+        # devolve as áreas desenhadas por cima do fundo (pro modo de retângulos sujos)
+        self.sujos = []
+
+        # fundo estático (piso, paredes, esconderijos, cofre) pré-desenhado
+        self.screen.blit(self.background, (0, 0))
+        perfil.marcar("piso")
 
         # se o papel ainda está escondido, mostra dica quando encosta num spot
         if self.paper_hidden:
@@ -508,28 +501,16 @@ class Fase1:
 
         # se achou o papel, desenha ele e escreve a senha em cima
         if not self.paper_hidden:
-            pygame.draw.rect(self.screen, PAPER_COLOR, self.paper_rect)
+            self.sujos.append(pygame.draw.rect(self.screen, PAPER_COLOR, self.paper_rect))
             if self.paper_opened:
                 self.draw_text("SENHA:", self.paper_rect.x + 6, self.paper_rect.y + 6, (0,0,0))
                 self.draw_text(self.code, self.paper_rect.x + 6, self.paper_rect.y + 24, (0,0,0))
 
-        # desenha o cofre com imagem (se tiver), senão retângulo
-        if getattr(self, "cofre_img", None):
-            try:
-                cofre_scaled = pygame.transform.scale(
-                    self.cofre_img,
-                    (self.safe_rect.width, self.safe_rect.height)
-                )
-                self.screen.blit(cofre_scaled, self.safe_rect.topleft)
-            except Exception:
-                pygame.draw.rect(self.screen, SAFE_COLOR, self.safe_rect)
-        else:
-            pygame.draw.rect(self.screen, SAFE_COLOR, self.safe_rect)
-
-        self.draw_text("COFRE", self.safe_rect.x-5, self.safe_rect.y-25)
-
         # ---------------- DESENHO DO JOGADOR ----------------
         # se tiver sprites, usa sprites; senão desenha um retângulo simples
+        # (desenha entre a posição do passo anterior e a atual, conforme o que sobrou do passo)
+        player_rect = self.player_rect.copy()
+        player_rect.center = tempo.interpolar(self.prev_player_center, self.player_rect.center, self.passo.alpha)
         if self._images_ok and (self.player_idle is not None):
             if self.player_moving:
                 frames = self.player_walk_dir.get(self.facing)
@@ -542,29 +523,23 @@ class Fase1:
             else:
                 sprite = self.player_idle_dir.get(self.facing, self.player_dir.get(self.facing, self.player_idle))
 
-            # escala mantendo proporção
-            w, h = sprite.get_size()
-            scale = min(self.player_rect.width / self.base_w, self.player_rect.height / self.base_h)
-            new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-
-            try:
-                sprite_scaled = pygame.transform.smoothscale(sprite, new_size)
-            except Exception:
-                sprite_scaled = pygame.transform.scale(sprite, new_size)
+            # sprite já vem escalado (mantendo proporção) do atlas
+            sprite_scaled, sprite_flipped = self.player_atlas[sprite]
 
             # flip quando está virado pra esquerda (pra alguns casos de sprite)
             if self.facing_left and (self.facing not in self.player_dir) and (self.facing not in self.player_idle_dir):
-                sprite_scaled = pygame.transform.flip(sprite_scaled, True, False)
+                sprite_scaled = sprite_flipped
 
-            x = self.player_rect.centerx - sprite_scaled.get_width() // 2
-            y = self.player_rect.centery - sprite_scaled.get_height() // 2
-            self.screen.blit(sprite_scaled, (x, y))
+            x = player_rect.centerx - sprite_scaled.get_width() // 2
+            y = player_rect.centery - sprite_scaled.get_height() // 2
+            self.sujos.append(self.screen.blit(sprite_scaled, (x, y)))
         else:
-            pygame.draw.rect(self.screen, (200,60,80), self.player_rect)
+            self.sujos.append(pygame.draw.rect(self.screen, (200,60,80), player_rect))
+        perfil.marcar("sprites")
         # -----------------------------------------------------
 
         # dicas perto do cofre
-        if self.player_rect.colliderect(self.safe_rect.inflate(28,28)):
+        if self.player_rect.colliderect(self.safe_area):
             if not self.has_seen_code:
                 self.draw_text("Procure um papel escondido para ver a senha", 20, self.height-60, HINT_COLOR)
             elif not self.entering_code:
@@ -576,20 +551,20 @@ class Fase1:
         # barra de progresso quando está “abrindo” o cofre
         if self.safe_processing:
             prog = (self.safe_timer / self.safe_open_requirement) * 200
-            pygame.draw.rect(self.screen, WHITE, (self.width//2-100, self.height-80, 200, 15), 2)
+            self.sujos.append(pygame.draw.rect(self.screen, WHITE, (self.width//2-100, self.height-80, 200, 15), 2))
             pygame.draw.rect(self.screen, PAPER_COLOR, (self.width//2-100, self.height-80, prog, 15))
 
         # desenha o timer na caixa (se existir), senão desenha o número simples
         if self.timer_box:
             box_w, box_h = 120, 110  
-            box = pygame.transform.smoothscale(self.timer_box, (box_w, box_h))
+            box = recursos.escalado(self.timer_box, (box_w, box_h))
             x = self.width - 16 - box_w - 12
             y = 16
 
-            self.screen.blit(box, (x, y))
+            self.sujos.append(self.screen.blit(box, (x, y)))
 
-            tempo_font = pygame.font.SysFont("consolas", 30, bold=True)
-            tempo_txt = tempo_font.render(f"{int(self.level_timer)}", True, (255,255,255))
+            tempo_font = recursos.fonte("consolas", 30, bold=True)
+            tempo_txt = recursos.texto(tempo_font, f"{int(self.level_timer)}", (255,255,255))
             self.screen.blit(
                 tempo_txt,
                 (x + box_w//2 - tempo_txt.get_width()//2,
@@ -597,3 +572,29 @@ class Fase1:
             )
         else:
             self.draw_text(f"{int(self.level_timer)}", self.width//2 - 40, 30, ALARM_COLOR)
+        perfil.marcar("hud")
+
+        return self.sujos
+
+
+# ----- PRÉ-CARREGAMENTO -----
+def preload_assets(base_dir=None):
+    # arquivos que a fase 1 usa (o main manda ler em segundo plano antes dela começar)
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    assets = os.path.join(base_dir, "assets")
+    return [
+        ("imagem", os.path.join(assets, "piso_madeira.png")),
+        ("imagem", os.path.join(assets, "timer_box.png")),
+        ("imagem", os.path.join(assets, "cofre.png")),
+    ] + audio.preload_assets("cronometro") + recursos.pngs(os.path.join(assets, "player"))
+
+
+# ----- SIMULAÇÃO (sem janela) -----
+def novo_estado(size=(1024, 640), seed=None):
+    # Fase1 só com a lógica: não precisa de display nem de mixer
+    return Fase1(pygame.Surface(size), None, headless=True, seed=seed)
+
+
+def step(state, inputs, dt):
+    # mesma assinatura das outras fases (state aqui é a própria Fase1)
+    return state.step(inputs, dt)
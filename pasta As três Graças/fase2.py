@@ -7,6 +7,23 @@ import sys
 import math
 import os
 
+try:
+    import numpy as np   # só pra varrer muitas câmeras de uma vez (opcional)
+except ImportError:
+    np = None
+
+import audio
+import colisao
+import entidades
+import entrada
+import niveis
+import perfil
+import recursos
+import replay
+import tela
+import tempo
+import visao
+
 # ----- CONFIG -----
 WIDTH, HEIGHT = 1024, 640
 FPS = 60
@@ -25,62 +42,31 @@ HINT_COLOR = (180,180,255)
 PLAYER_SPEED = 200
 TIME_LIMIT = 35.0          # tempo total da fase
 SABOTAGE_TIME = 0.5        # quanto tempo segurando SPACE pra sabotar
+SHOW_SABOTAGE_MSG = 0.9    # quanto tempo a mensagem de sabotagem fica na tela
 CAM_FOV_ANGLE = 70         # abertura do “cone de visão” da câmera
 CAM_FOV_DIST = 260         # alcance do cone
 
-# ----- SONS / ASSETS -----
-def _load_sounds(base_dir=None):
-    # carrega sons (alarme e som de sabotagem)
-    alarm_s = None
-    sabotage_s = None
-    try:
-        # monta caminhos dependendo se veio base_dir (pra rodar pelo main)
-        if base_dir:
-            alarm_path = os.path.join(base_dir, "assets", "alarme.mp3")
-            sabotage_path = os.path.join(base_dir, "assets", "sabotagem.mp3")
-        else:
-            alarm_path = "assets/alarme.mp3"
-            sabotage_path = "assets/sabotagem.mp3"
-
-        # garante mixer inicializado
-        if pygame.mixer.get_init() is None:
-            try:
-                pygame.mixer.init()
-            except Exception:
-                pass
-
-        # carrega alarme
-        if os.path.exists(alarm_path):
-            alarm_s = pygame.mixer.Sound(alarm_path)
-            alarm_s.set_volume(0.6)
-
-        # carrega sabotagem
-        if os.path.exists(sabotage_path):
-            sabotage_s = pygame.mixer.Sound(sabotage_path)
-            sabotage_s.set_volume(0.6)
-
-    except Exception:
-        alarm_s = None
-        sabotage_s = None
+# mapa de visibilidade por câmera (visao.MapaVisibilidade): a detecção vira consulta
+# numa tabela; TRES_GRACAS_MAPAS=0 volta pro teste completo em todo passo
+USAR_MAPAS = os.environ.get("TRES_GRACAS_MAPAS", "1") != "0"
+FOLGA_VIGIA = 1e-6         # (s) a câmera "acorda" um tiquinho antes da conta, por arredondamento
 
-    return alarm_s, sabotage_s
+# ----- SONS / ASSETS -----
+# (os sons tocam pelo audio.py, pelo nome: "alarme", "sabotagem" e a música "fase2")
 
-def _trim_sprite(surf):
-    # recorta a área transparente do sprite (pra ajudar no scale)
-    try:
-        mask = pygame.mask.from_surface(surf)
-        rects = mask.get_bounding_rects()
-        if not rects:
-            return surf
-        r = rects[0].copy()
-        for rr in rects[1:]:
-            r.union_ip(rr)
-        return surf.subsurface(r).copy()
-    except Exception:
-        return surf
+def preload_assets(base_dir=None):
+    # arquivos que a fase usa (o main manda ler em segundo plano enquanto a fase 1 roda)
+    assets = os.path.join(base_dir or "", "assets")
+    return [
+        ("imagem", os.path.join(assets, "camera.png")),
+        ("imagem", os.path.join(assets, "piso_madeira.png")),
+        ("imagem", os.path.join(assets, "timer_box.png")),
+        ("imagem", os.path.join(assets, "painel.png")),
+    ] + audio.preload_assets("alarme", "sabotagem", "fase2") + recursos.pngs(os.path.join(assets, "player"))
 
 def _load_player_sprites(base_dir=None):
     # carrega sprites do player (idle / walk / por direção)
+    # vêm do cache global já recortados, então só a primeira fase paga o custo
     idle = None
     walk = []
     ok = False
@@ -94,13 +80,13 @@ def _load_player_sprites(base_dir=None):
 
         # idle geral
         if os.path.exists(idle_path):
-            idle = pygame.image.load(idle_path).convert_alpha()
+            idle = recursos.imagem(idle_path, trim=True)
 
         # walk geral (fallback)
         for i in range(3):
             p = os.path.join(player_dir, f"walk_{i}.png")
             if os.path.exists(p):
-                walk.append(pygame.image.load(p).convert_alpha())
+                walk.append(recursos.imagem(p, trim=True))
 
         # idle por direção
         idle_files = {
@@ -112,7 +98,7 @@ def _load_player_sprites(base_dir=None):
         for d, fn in idle_files.items():
             p = os.path.join(player_dir, fn)
             if os.path.exists(p):
-                idle_dir[d] = pygame.image.load(p).convert_alpha()
+                idle_dir[d] = recursos.imagem(p, trim=True)
 
         # walk por direção (3 frames)
         for d in ["down","up","left","right"]:
@@ -120,7 +106,7 @@ def _load_player_sprites(base_dir=None):
             for i in range(3):
                 p = os.path.join(player_dir, f"walk_{i}{d}.png")
                 if os.path.exists(p):
-                    frames.append(pygame.image.load(p).convert_alpha())
+                    frames.append(recursos.imagem(p, trim=True))
             if frames:
                 walk_dir[d] = frames
 
@@ -133,17 +119,6 @@ def _load_player_sprites(base_dir=None):
             walk = walk or [idle]  # se não tiver walk, usa idle como walk
             ok = True
 
-        # recorta transparência
-        if idle is not None:
-            idle = _trim_sprite(idle)
-        walk = [_trim_sprite(s) for s in walk]
-
-        for k in list(idle_dir.keys()):
-            idle_dir[k] = _trim_sprite(idle_dir[k])
-
-        for k in list(walk_dir.keys()):
-            walk_dir[k] = [_trim_sprite(s) for s in walk_dir[k]]
-
         # pega tamanho base pra escala proporcional
         all_sprites = []
         if idle is not None:
@@ -170,6 +145,10 @@ class Player:
         self.hitbox = self.rect.inflate(-30, -40)
         self.hitbox.midbottom = self.rect.midbottom
 
+        # posição da hitbox em float (o Rect arredonda, e em passos pequenos isso mudaria a velocidade)
+        self.fx, self.fy = float(self.hitbox.x), float(self.hitbox.y)
+        self.prev_center = None  # centro no passo anterior (pra interpolar o desenho)
+
         self.speed = PLAYER_SPEED
 
         # dados de sprite (podem ficar vazios e desenhar retângulo)
@@ -180,6 +159,7 @@ class Player:
         self.walk_dir = {}
         self.base_w = 1
         self.base_h = 1
+        self.atlas = {}  # sprite -> (escalado, espelhado), montado uma vez por bake_sprites()
 
         # animação e estado
         self.frame = 0
@@ -190,14 +170,10 @@ class Player:
         self.facing = "down"
         self._prev_facing = self.facing
 
-    def update(self, dt, walls):
-        # controla movimento pelo teclado
-        keys = pygame.key.get_pressed()
-        dx = dy = 0
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]: dx -= 1
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]: dx += 1
-        if keys[pygame.K_w] or keys[pygame.K_UP]: dy -= 1
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]: dy += 1
+    def update(self, dt, walls, inputs):
+        # controla movimento pela entrada do frame (teclado ou simulação)
+        self.prev_center = self.rect.center
+        dx, dy = inputs.direcao()
 
         # normaliza pra diagonal não ser mais rápida
         if dx or dy:
@@ -222,28 +198,48 @@ class Player:
 
         self.moving = bool(dx or dy)
 
-        # move no eixo X e resolve colisão
-        self.hitbox.x += dx * self.speed * dt
+        # se alguém mexeu na hitbox por fora, a posição float segue ela
+        if self.hitbox.x != round(self.fx): self.fx = float(self.hitbox.x)
+        if self.hitbox.y != round(self.fy): self.fy = float(self.hitbox.y)
+
+        # move no eixo X e resolve colisão (se bateu, a float vai pra onde parou)
+        self.fx += dx * self.speed * dt
+        self.hitbox.x = round(self.fx)
         self._collide(walls, dx, 0)
+        if self.hitbox.x != round(self.fx): self.fx = float(self.hitbox.x)
 
         # move no eixo Y e resolve colisão
-        self.hitbox.y += dy * self.speed * dt
+        self.fy += dy * self.speed * dt
+        self.hitbox.y = round(self.fy)
         self._collide(walls, 0, dy)
+        if self.hitbox.y != round(self.fy): self.fy = float(self.hitbox.y)
 
         # atualiza o rect visual baseado na hitbox
         self.rect.midbottom = self.hitbox.midbottom
 
+    def bake_sprites(self):
+        # pré-escala todos os frames (e as versões espelhadas) pro tamanho do rect
+        scale = min(self.rect.width / self.base_w, self.rect.height / self.base_h)
+        sprites = [self.idle] + list(self.walk) + list(self.idle_dir.values())
+        for frames in self.walk_dir.values():
+            sprites += list(frames)
+        self.atlas = recursos.atlas(sprites, scale)
+
     def _collide(self, walls, dx, dy):
         # colisão simples: se encostar numa parede, empurra pra fora
-        for w in walls:
+        # (só as paredes perto, se walls for uma GradeParedes)
+        for w in colisao.perto(walls, self.hitbox):
             if self.hitbox.colliderect(w):
                 if dx > 0: self.hitbox.right = w.left
                 if dx < 0: self.hitbox.left = w.right
                 if dy > 0: self.hitbox.bottom = w.top
                 if dy < 0: self.hitbox.top = w.bottom
 
-    def draw(self, surf):
+    def draw(self, surf, alpha=1.0):
         # se tiver sprites, desenha sprite; senão desenha retângulo
+        # (alpha = quanto já andou do próximo passo: desenha entre a posição anterior e a atual)
+        rect = self.rect.copy()
+        rect.center = tempo.interpolar(self.prev_center, self.rect.center, alpha)
         if self.images_ok and self.idle:
             if self.moving:
                 frames = self.walk_dir.get(self.facing)
@@ -254,57 +250,81 @@ class Player:
             else:
                 sprite = self.idle_dir.get(self.facing, self.idle)
 
-            # escala proporcional pra caber no rect do player
-            w, h = sprite.get_size()
-            scale = min(self.rect.width / self.base_w, self.rect.height / self.base_h)
-            new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-
-            try:
-                sprite_scaled = pygame.transform.smoothscale(sprite, new_size)
-            except Exception:
-                sprite_scaled = pygame.transform.scale(sprite, new_size)
+            # sprite já vem escalado do atlas (se faltar, monta o atlas de novo)
+            if sprite not in self.atlas:
+                self.bake_sprites()
+            sprite_scaled, sprite_flipped = self.atlas[sprite]
 
             # flip caso esteja indo pra esquerda e não tenha sprite por direção
             if self.facing_left and (self.facing not in self.walk_dir) and (self.facing not in self.idle_dir):
-                sprite_scaled = pygame.transform.flip(sprite_scaled, True, False)
+                sprite_scaled = sprite_flipped
 
-            x = self.rect.centerx - sprite_scaled.get_width() // 2
-            y = self.rect.centery - sprite_scaled.get_height() // 2
-            surf.blit(sprite_scaled, (x, y))
+            x = rect.centerx - sprite_scaled.get_width() // 2
+            y = rect.centery - sprite_scaled.get_height() // 2
+            return surf.blit(sprite_scaled, (x, y))
         else:
-            pygame.draw.rect(surf, PLAYER_COLOR, self.rect)
+            return pygame.draw.rect(surf, PLAYER_COLOR, rect)
+
+
+def tabela_cameras():
+    # colunas das câmeras (entidades.Tabela): uma linha por câmera
+    # (cobre_lo/cobre_hi: faixa de ângulos em que ela vê a célula do player, pra janelas_de_cobertura)
+    return entidades.Tabela(x=0.0, y=0.0, angulo=0.0, angulo_antes=0.0,
+                            min=entidades.NADA, max=entidades.NADA,
+                            velocidade=0.0, sentido=1.0, varre=0.0,
+                            cobre_lo=-math.inf, cobre_hi=math.inf)
 
 
 class Camera:
-    def __init__(self, x, y, angle, min_angle=None, max_angle=None, sweep_speed=0):
-        # posição central da câmera
-        self.pos = pygame.Vector2(x,y)
-        self.angle = float(angle)
+    # alça pra uma linha da tabela de câmeras (os números moram nas colunas)
+    __slots__ = ("_t", "_i", "rect", "sprite", "mapa")
+
+    pos = entidades.par("x", "y", pygame.Vector2)               # posição central da câmera
+    angle = entidades.coluna("angulo")
+    prev_angle = entidades.coluna("angulo_antes")               # ângulo no passo anterior (pra interpolar o cone)
+    min_angle = entidades.opcional("min")
+    max_angle = entidades.opcional("max")
+    sweep_speed = entidades.coluna("velocidade")
+    sweep_dir = entidades.coluna("sentido", int)                # 1 aumenta ângulo, -1 diminui ângulo
+
+    def __init__(self, x, y, angle, min_angle=None, max_angle=None, sweep_speed=0, tabela=None):
+        # sem tabela, a câmera ganha uma só pra ela
+        self._t = tabela if tabela is not None else tabela_cameras()
+
+        # configurações de varredura (se tiver min/max); "varre" já diz se ela se mexe
+        varre = min_angle is not None and max_angle is not None and sweep_speed != 0
+        self._i = self._t.novo(
+            x=x, y=y, angulo=float(angle), angulo_antes=float(angle),
+            min=float(min_angle) if min_angle is not None else entidades.NADA,
+            max=float(max_angle) if max_angle is not None else entidades.NADA,
+            velocidade=float(sweep_speed), sentido=1.0, varre=1.0 if varre else 0.0,
+        )
 
         # retângulo visual da câmera
         self.rect = pygame.Rect(x-10,y-10,20,20)
 
-        # configurações de varredura (se tiver min/max)
-        self.min_angle = float(min_angle) if min_angle is not None else None
-        self.max_angle = float(max_angle) if max_angle is not None else None
-        self.sweep_speed = float(sweep_speed)
-        self.sweep_dir = 1  # 1 aumenta ângulo, -1 diminui ângulo
-
         self.sprite = None
+        self.mapa = None  # visao.MapaVisibilidade (se montado pro nível)
+
+    def faixa(self):
+        # menor e maior ângulo pra onde essa câmera pode olhar
+        if self._t.col["varre"][self._i]:
+            return min(self.min_angle, self.angle), max(self.max_angle, self.angle)
+        return self.angle, self.angle
 
     def update(self, dt):
-        # se tiver varredura, muda o ângulo e inverte quando bater nos limites
-        if self.min_angle is not None and self.max_angle is not None and self.sweep_speed != 0:
-            self.angle += self.sweep_dir * self.sweep_speed * dt
-            if self.angle > self.max_angle:
-                self.angle = self.max_angle
-                self.sweep_dir = -1
-            elif self.angle < self.min_angle:
-                self.angle = self.min_angle
-                self.sweep_dir = 1
+        # só esta câmera (a fase usa varrer_cameras, todas de uma vez)
+        varrer_cameras(self._t, dt, (self._i,))
 
     def can_see(self, player_rect, walls):
         # checa se o player está dentro do cone e sem parede bloqueando
+        # com o mapa: a célula do player já diz se dá pra ver e se parede atrapalha
+        estado = visao.CONFERIR
+        if self.mapa is not None:
+            estado = self.mapa.consultar(player_rect.centerx, player_rect.centery, self.angle)
+            if estado == visao.NUNCA:
+                return False
+
         start = self.pos
         target = pygame.Vector2(player_rect.center)
         vec = target - start
@@ -321,62 +341,145 @@ class Camera:
         if abs(diff) > CAM_FOV_ANGLE/2:
             return False
 
-        # “raycast” simples: caminha ponto a ponto e vê se bate em parede
-        steps = max(6, int(dist // 8))
-        for i in range(1, steps+1):
-            p = start + vec * (i/steps)
-            r = pygame.Rect(p.x-2, p.y-2, 4, 4)
-            for w in walls:
-                if r.colliderect(w):
-                    return False
-        return True
+        # linha de visão exata (segmento x retângulo) contra as paredes
+        # (só onde o mapa não sabe dizer)
+        if estado == visao.LIVRE:
+            return True
+        return visao.linha_livre(start, target, walls)
 
     def draw(self, surf):
         # desenha sprite da câmera (ou retângulo)
         if self.sprite:
-            try:
-                img = pygame.transform.smoothscale(self.sprite, self.rect.size)
-            except Exception:
-                img = pygame.transform.scale(self.sprite, self.rect.size)
-            surf.blit(img, self.rect.topleft)
+            return surf.blit(recursos.escalado(self.sprite, self.rect.size), self.rect.topleft)
         else:
-            pygame.draw.rect(surf, CAM_COLOR, self.rect)
-
-        # desenha o cone de visão como um triângulo transparente
-        a1 = math.radians(self.angle - CAM_FOV_ANGLE/2)
-        a2 = math.radians(self.angle + CAM_FOV_ANGLE/2)
-        p1 = self.pos + pygame.Vector2(math.cos(a1), math.sin(a1)) * CAM_FOV_DIST
-        p2 = self.pos + pygame.Vector2(math.cos(a2), math.sin(a2)) * CAM_FOV_DIST
-        s = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        pygame.draw.polygon(s, (80,80,200,40), [self.pos, p1, p2])
-        surf.blit(s, (0,0))
+            return pygame.draw.rect(surf, CAM_COLOR, self.rect)
+
+    def draw_cone(self, cones, alpha=1.0):
+        # desenha o cone de visão (triângulo transparente) na camada compartilhada
+        angle = self.prev_angle + (self.angle - self.prev_angle) * alpha
+        cones.add_cone(self.pos, angle, CAM_FOV_ANGLE, CAM_FOV_DIST, (80,80,200,40))
+
+
+def varrer_cameras(tabela, dt, quais=None):
+    # varredura de todas as câmeras da tabela (ou só as "quais"): muda o ângulo das que
+    # varrem e inverte o sentido quando bate nos limites
+    col = tabela.col
+    if quais is None and tabela.em_lote():
+        ang, antes, lo, hi, vel, sentido, varre = tabela.vetores(
+            "angulo", "angulo_antes", "min", "max", "velocidade", "sentido", "varre")
+        antes[:] = ang
+        m = varre != 0
+        np.add(ang, sentido * vel * dt, out=ang, where=m)
+        acima = m & (ang > hi)
+        abaixo = m & ~acima & (ang < lo)
+        np.copyto(ang, hi, where=acima)
+        np.copyto(sentido, -1.0, where=acima)
+        np.copyto(ang, lo, where=abaixo)
+        np.copyto(sentido, 1.0, where=abaixo)
+        return
+
+    ang, antes, lo, hi = col["angulo"], col["angulo_antes"], col["min"], col["max"]
+    vel, sentido, varre = col["velocidade"], col["sentido"], col["varre"]
+    for i in (range(tabela.n) if quais is None else quais):
+        antes[i] = ang[i]
+        if varre[i]:
+            ang[i] += sentido[i] * vel[i] * dt
+            if ang[i] > hi[i]:
+                ang[i] = hi[i]
+                sentido[i] = -1.0
+            elif ang[i] < lo[i]:
+                ang[i] = lo[i]
+                sentido[i] = 1.0
+
+def _janela(a, s, v, varre, m, M, lo, hi):
+    # (entra, sai) de uma câmera: daqui a quantos segundos o ângulo "a" (sentido s,
+    # velocidade v, indo e voltando entre m e M) entra em [lo, hi], e quando sai de novo
+    if not varre:
+        return (0.0, math.inf) if lo <= a <= hi else (math.inf, math.inf)
+    a = min(max(a, m), M)          # fora da faixa: o primeiro passo já prende no limite
+    L, H = max(lo, m), min(hi, M)  # a parte da faixa que a varredura alcança
+    if L > H:
+        return math.inf, math.inf
+    if L <= m and H >= M:
+        return 0.0, math.inf       # a varredura inteira fica dentro
+
+    # até entrar: direto, ou até o limite e voltando
+    if s > 0:
+        if a < L:
+            entra, e, d = L - a, L, 1
+        elif a > H:
+            entra, e, d = (M - a) + (M - H), H, -1
+        else:
+            entra, e, d = 0.0, a, 1
+    else:
+        if a > H:
+            entra, e, d = a - H, H, -1
+        elif a < L:
+            entra, e, d = (a - m) + (L - m), L, 1
+        else:
+            entra, e, d = 0.0, a, -1
+
+    # quanto fica dentro: atravessa a faixa, ou vai até o limite (dentro dela) e volta
+    if d > 0:
+        dentro = (H - e) if H < M else (M - e) + (M - L)
+    else:
+        dentro = (e - L) if L > m else (e - m) + (H - m)
+    return entra / v, (entra + dentro) / v
+
+
+def janelas_de_cobertura(tabela, quais=None):
+    # pra cada câmera da tabela (ou só as "quais"): daqui a quanto tempo (s) a varredura põe
+    # o ângulo dentro de [cobre_lo, cobre_hi] (0 se já está, inf se nunca) e quando ele sai.
+    # É a conta exata da varredura contínua; a do varrer_cameras (que fica um passo parada
+    # no limite) nunca chega antes, então antes do "entra" a câmera com certeza não está lá
+    col = tabela.col
+    if quais is not None or not tabela.em_lote():
+        entra, sai = [], []
+        for i in (range(tabela.n) if quais is None else quais):
+            e, s = _janela(col["angulo"][i], col["sentido"][i], col["velocidade"][i], col["varre"][i],
+                           col["min"][i], col["max"][i], col["cobre_lo"][i], col["cobre_hi"][i])
+            entra.append(e)
+            sai.append(s)
+        return entra, sai
+
+    a, s, v, varre, m, M, lo, hi = tabela.vetores(
+        "angulo", "sentido", "velocidade", "varre", "min", "max", "cobre_lo", "cobre_hi")
+    inf = math.inf
+    varre = varre != 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # câmera parada: vê agora ou nunca
+        dentro_agora = (lo <= a) & (a <= hi)
+        entra = np.where(dentro_agora, 0.0, inf)
+        sai = np.full(tabela.n, inf)
+
+        a = np.minimum(np.maximum(a, m), M)
+        L, H = np.maximum(lo, m), np.minimum(hi, M)
+        alcanca = varre & (L <= H)
+        toda = alcanca & (L <= m) & (H >= M)
+        anda = alcanca & ~toda
+        sobe = s > 0
+
+        antes, depois = a < L, a > H
+        e = np.where(antes, L, np.where(depois, H, a))
+        d = np.where(antes, 1.0, np.where(depois, -1.0, np.where(sobe, 1.0, -1.0)))
+        falta = np.where(sobe,
+                         np.where(antes, L - a, np.where(depois, (M - a) + (M - H), 0.0)),
+                         np.where(depois, a - H, np.where(antes, (a - m) + (L - m), 0.0)))
+        dentro = np.where(d > 0,
+                          np.where(H < M, H - e, (M - e) + (M - L)),
+                          np.where(L > m, e - L, (e - m) + (H - m)))
+
+        np.copyto(entra, inf, where=varre)
+        np.copyto(entra, 0.0, where=toda)
+        np.copyto(entra, falta / v, where=anda)
+        np.copyto(sai, (falta + dentro) / v, where=anda)
+    return entra, sai
 
 # ----- HELPERS -----
 def draw_text(surf, txt, x, y, font, color=WHITE):
-    # helper rápido pra desenhar texto
-    surf.blit(font.render(txt, True, color), (x,y))
-
-def build_walls(sw, sh):
-    # cria paredes e deixa uma “porta” na parede direita (gap)
-    door_h = int(sh * 0.16)
-    door_y = sh//2 - door_h//2
-    wall_thick = 16
-
-    return [
-        # bordas
-        pygame.Rect(0,0,sw,16),
-        pygame.Rect(0,0,16,sh),
-        pygame.Rect(0,sh-16,sw,16),
-
-        # parede direita com buraco no meio (porta)
-        pygame.Rect(sw-16, 0, wall_thick, door_y),
-        pygame.Rect(sw-16, door_y + door_h, wall_thick, sh - (door_y + door_h)),
-
-        # colunas internas (tipo corredores)
-        pygame.Rect(int(sw*0.234),int(sh*0.156),16,int(sh*0.688)),
-        pygame.Rect(int(sw*0.488),int(sh*0.156),16,int(sh*0.688)),
-        pygame.Rect(int(sw*0.742),int(sh*0.156),16,int(sh*0.688)),
-    ]
+    # helper rápido pra desenhar texto (o render fica no cache de textos)
+    # devolve a área desenhada (pro modo de retângulos sujos)
+    return surf.blit(recursos.texto(font, txt, color), (x,y))
 
 def _load_camera_sprite(base_dir=None):
     # tenta carregar sprite da câmera (opcional)
@@ -386,12 +489,227 @@ def _load_camera_sprite(base_dir=None):
         else:
             p = os.path.join("assets", "camera.png")
         if os.path.exists(p):
-            return pygame.image.load(p).convert_alpha()
+            return recursos.imagem(p)
     except Exception:
         pass
     return None
 
 
+def alguma_camera_ve(cams, player_rect, walls, posicoes=None, angulos=None):
+    # com muitas câmeras, distância e ângulo são cortados todos de uma vez (visao.candidatos)
+    # e o can_see completo só roda pras que sobraram
+    # posicoes: (xs, ys) das câmeras já prontos (elas não se mexem), senão monta aqui
+    # angulos: os ângulos de agora na mesma ordem (a coluna da tabela), senão monta aqui
+    if len(cams) >= visao.LOTE_MINIMO:
+        xs, ys = posicoes or ([c.pos.x for c in cams], [c.pos.y for c in cams])
+        if angulos is None:
+            angulos = [c.angle for c in cams]
+        sobra = visao.candidatos(xs, ys, angulos, CAM_FOV_ANGLE/2, CAM_FOV_DIST, player_rect.center)
+        cams = [cams[i] for i in sobra]
+    for c in cams:
+        if c.can_see(player_rect, walls):
+            return True
+    return False
+
+
+def cameras_acordadas(state, player_rect):
+    # as câmeras que podem estar vendo a célula do player agora; as outras, pela conta
+    # da varredura (janelas_de_cobertura x mapa de visibilidade), ainda não chegaram lá
+    # e nem precisam do teste. As janelas são refeitas quando o player troca de célula
+    # ou quando alguma câmera sai da célula dele. Sem os mapas, todas
+    cams = state.cams
+    if not state.vigiar or not cams:
+        return cams
+    mapa = cams[0].mapa
+    x, y = player_rect.center
+    col, row = int(x // mapa.cell), int(y // mapa.cell)
+    if not (0 <= col < mapa.cols and 0 <= row < mapa.rows):
+        return cams                                  # fora do mapa: confere todas
+    celula = row * mapa.cols + col
+    agora = state.relogio
+    if celula != state.vigia_celula or agora >= state.vigia_revisar:
+        _vigiar(state, celula)
+    return [cams[i] for i, t in zip(state.vigia_quais, state.vigia_entra) if t <= agora]
+
+
+def _vigiar(state, celula):
+    # só as câmeras cujo mapa diz que alguma hora veem essa célula entram na conta:
+    # a faixa de ângulos delas pra célula e a janela de cada uma a partir de agora
+    if state.vigia_estados is not None:
+        quais = np.flatnonzero(state.vigia_estados[celula]).tolist()
+    else:
+        quais = [i for i, c in enumerate(state.cams) if c.mapa.estados[celula] != visao.NUNCA]
+    lo, hi = state.cameras.col["cobre_lo"], state.cameras.col["cobre_hi"]
+    for i in quais:
+        mapa = state.cams[i].mapa
+        lo[i], hi[i] = mapa.lo[celula], mapa.hi[celula]
+    entra, sai = janelas_de_cobertura(state.cameras, quais)
+    agora = state.relogio
+    state.vigia_celula, state.vigia_quais = celula, quais
+    state.vigia_entra = [agora + t - FOLGA_VIGIA for t in entra]
+    state.vigia_revisar = agora + min(sai, default=math.inf)
+
+
+def _mapas_das_cameras(nivel, cams, walls, size):
+    params = [((c.pos.x, c.pos.y), c.faixa()) for c in cams]
+
+    def montar():
+        return [visao.MapaVisibilidade(pos, faixa, CAM_FOV_ANGLE, CAM_FOV_DIST, walls.caixas, size)
+                for pos, faixa in params]
+    return nivel.em_cache("cameras", (params, CAM_FOV_ANGLE, CAM_FOV_DIST, visao.MAPA_CELULA),
+                          montar, visao.mapas_para_bytes, visao.mapas_de_bytes)
+
+
+# ----- LÓGICA (sem janela, sem som) -----
+class Estado:
+    # tudo que a lógica da fase precisa; o run() só desenha e toca som em cima disso
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        self.size = size
+
+        # o mapa (paredes, porta, câmeras, painel) vem do niveis/fase2.json
+        self.nivel = niveis.carregar("fase2", size)
+
+        # paredes da sala (numa grade, pra colisão e visão só olharem as paredes perto)
+        self.walls = self.nivel.grade()
+
+        # porta de saída (é o buraco da parede direita) e a área em volta que conta como saída
+        self.door_rect = self.nivel.rect("porta")
+        self.exit_area = self.nivel.gatilho("saida")
+
+        self.player = Player(*self.nivel.ponto("jogador"))
+
+        # lista de câmeras (com varredura usando min/max e sweep_speed)
+        # (os números delas todos na mesma tabela, pra varrer todas de uma vez)
+        self.cameras = tabela_cameras()
+        self.cams = [
+            Camera(c["pos"][0], c["pos"][1], c["angulo"], c["min"], c["max"], float(c["velocidade"]),
+                   tabela=self.cameras)
+            for c in self.nivel.dados["cameras"]
+        ]
+
+        # posições das câmeras (não mudam) prontas pro corte em lote da detecção
+        self.cam_posicoes = (visao.vetor(list(self.cameras.col["x"])), visao.vetor(list(self.cameras.col["y"])))
+
+        # mapa de visibilidade de cada câmera (paradas, varredura conhecida):
+        # montado uma vez por nível e guardado no cache do nível
+        if USAR_MAPAS:
+            for c, mapa in zip(self.cams, _mapas_das_cameras(self.nivel, self.cams, self.walls, size)):
+                c.mapa = mapa
+
+        # com os mapas, a detecção só testa as câmeras cuja varredura já chegou na célula
+        # do player (cameras_acordadas); relogio = tempo de varredura das câmeras
+        self.vigiar = USAR_MAPAS and bool(self.cams)
+        self.relogio = 0.0
+        self.vigia_celula, self.vigia_quais, self.vigia_entra, self.vigia_revisar = None, [], [], 0.0
+        # (com numpy: o estado de cada célula pra cada câmera numa tabela célula x câmera,
+        # pra achar de uma vez as câmeras que podem ver a célula do player)
+        self.vigia_estados = None
+        if self.vigiar and np is not None:
+            self.vigia_estados = np.stack([np.frombuffer(bytes(c.mapa.estados), dtype=np.uint8)
+                                           for c in self.cams], axis=1)
+
+        # painel onde o player pode sabotar (fica no meio)
+        self.panel = self.nivel.rect("painel")
+        self.panel_area = self.nivel.gatilho("sabotagem")  # área maior pra facilitar interação
+
+        # variáveis de estado
+        self.timer = TIME_LIMIT
+        self.sabotage_timer = 0.0
+        self.recorded = False
+
+        # pra mostrar mensagem de sucesso da sabotagem por um tempo curto
+        self.sabotage_success = False
+        self.sabotage_success_time = 0.0
+
+        # sons pedidos no último passo ("sabotagem", "alarme", "parar_alarme")
+        self.eventos = []
+
+
+def step(state, inputs, dt):
+    # um passo da fase: devolve "LOSE", "CLEAN", "RECORDED" ou None (continua)
+    state.eventos = []
+    state.timer -= dt
+
+    # se acabou o tempo, perde
+    if state.timer <= 0:
+        return "LOSE"
+
+    # atualiza player (movimento/colisão)
+    player = state.player
+    with perfil.secao("player"):
+        player.update(dt, state.walls, inputs)
+
+    # se não tem mais câmeras (sabotou) e chegou na porta, passa limpo
+    if (not state.cams) and player.hitbox.colliderect(state.exit_area):
+        return "CLEAN"
+
+    # animação do player
+    if player.images_ok:
+        if player.moving:
+            if player.facing != player._prev_facing:
+                player.frame, player.anim_timer = 0, 0.0
+                player._prev_facing = player.facing
+            player.anim_timer += dt
+            if player.anim_timer >= player.anim_speed:
+                player.anim_timer = 0.0
+                frames = player.walk_dir.get(player.facing, player.walk)
+                player.frame = (player.frame+1) % len(frames)
+        else:
+            player.frame = 0
+
+    # -------- SABOTAGEM NO PAINEL --------
+    if not state.sabotage_success and player.hitbox.colliderect(state.panel_area) and inputs.space:
+        # “bip” no começo de segurar (só no passo em que o timer sai do zero: com o
+        # passo fixo de 120 Hz, "timer < 0.06" dava uns 7 bips por aperto)
+        if state.sabotage_timer <= 0.0:
+            state.eventos.append("sabotagem")
+        state.sabotage_timer += dt
+
+        # quando completa o tempo, desliga as câmeras
+        if state.sabotage_timer >= SABOTAGE_TIME:
+            state.cams = []             # remove câmeras
+            state.recorded = False      # limpa status
+            state.eventos.append("parar_alarme")
+            state.sabotage_success = True
+            state.sabotage_success_time = 0.0
+    else:
+        # se soltou antes de completar, volta o timer um pouco (pra não ficar fácil)
+        if not state.sabotage_success:
+            state.sabotage_timer = max(0.0, state.sabotage_timer - dt*1.6)
+
+    # enquanto a mensagem de “sucesso” aparece, o resto fica parado
+    if state.sabotage_success:
+        state.sabotage_success_time += dt
+        if state.sabotage_success_time >= SHOW_SABOTAGE_MSG:
+            state.sabotage_success = False
+            state.sabotage_timer = 0.0
+        else:
+            return None
+
+    # atualiza varredura das câmeras
+    # (depois da sabotagem não tem mais câmera pra varrer)
+    with perfil.secao("camera"):
+        if state.cams:
+            varrer_cameras(state.cameras, dt)
+            state.relogio += dt
+
+    # -------- DETECÇÃO DAS CÂMERAS --------
+    with perfil.secao("visao"):
+        cams = cameras_acordadas(state, player.rect)
+        if cams is state.cams:
+            # todas: posições e ângulos já prontos, direto da tabela
+            viu = alguma_camera_ve(cams, player.rect, state.walls, state.cam_posicoes, state.cameras.col["angulo"])
+        else:
+            viu = alguma_camera_ve(cams, player.rect, state.walls)
+        if viu:
+            # alguma câmera viu: aciona gravação e liga alarme
+            state.recorded = True
+            state.eventos.append("alarme")
+
+    if state.recorded:
+        return "RECORDED"
+    return None
+
 
 # ----- RUN -----
 def run(screen, clock, font, base_dir=None):
@@ -400,7 +718,7 @@ def run(screen, clock, font, base_dir=None):
 
     # carrega assets principais
     cam_sprite = _load_camera_sprite(base_dir)
-    alarm_sound, sabotage_sound = _load_sounds(base_dir)
+    audio.carregar("alarme", "sabotagem")
     sprites_ok, idle_img, walk_imgs, idle_dir, walk_dir, base_w, base_h = _load_player_sprites(base_dir)
 
     # --- PISO + OVERLAY + TIMER BOX + PAINEL (VISUAL) ---
@@ -417,129 +735,122 @@ def run(screen, clock, font, base_dir=None):
             panel_path = os.path.join("assets", "painel.png")
 
         # piso em tile
-        floor_img = pygame.image.load(floor_path).convert()
-        floor_tile = pygame.transform.smoothscale(floor_img, (74, 74))
-        
+        floor_tile = recursos.imagem(floor_path, alpha=False, size=(74, 74))
+
         # imagem da caixa do timer
-        timer_box_img = pygame.image.load(timer_box_path).convert_alpha()
+        timer_box_img = recursos.imagem(timer_box_path)
 
         # imagem do painel (onde sabota)
         if os.path.exists(panel_path):
-            panel_img = pygame.image.load(panel_path).convert_alpha()
-            panel_img = pygame.transform.smoothscale(panel_img, (40, 40))
+            panel_img = recursos.imagem(panel_path, size=(40, 40))
     except Exception:
         # se der erro, usa fallbacks simples
         floor_tile = None
         timer_box_img = None
         panel_img = None
 
-    # overlay escuro por cima do piso
-    floor_overlay = pygame.Surface((SW, SH), pygame.SRCALPHA)
-    floor_overlay.fill((0, 0, 0, 100))
-
-    def draw_floor_and_walls(walls):
-        # desenha fundo + piso tile + paredes
-        screen.fill(BG_COLOR)
-        if floor_tile:
-            tw, th = floor_tile.get_width(), floor_tile.get_height()
-            for yy in range(0, SH, th):
-                for xx in range(0, SW, tw):
-                    screen.blit(floor_tile, (xx, yy))
-            screen.blit(floor_overlay, (0, 0))
-        for w in walls:
-            pygame.draw.rect(screen, WALL_COLOR, w)
+    def draw_background():
+        # fundo + piso tile (com overlay escuro) + paredes + porta: tudo pré-desenhado
+        screen.blit(background, (0, 0))
 
     def draw_timer_box(seconds_left):
         # desenha timer na caixa ou como texto simples
         if timer_box_img:
             box_w, box_h = 120, 110
-            box = pygame.transform.smoothscale(timer_box_img, (box_w, box_h))
+            box = recursos.escalado(timer_box_img, (box_w, box_h))
             x = SW - 16 - box_w - 12
             y = 16
-            screen.blit(box, (x, y))
-            tempo_font = pygame.font.SysFont("consolas", 30, bold=True)
-            tempo_txt = tempo_font.render(f"{int(seconds_left)}", True, (255,255,255))
+            area = screen.blit(box, (x, y))
+            tempo_font = recursos.fonte("consolas", 30, bold=True)
+            tempo_txt = recursos.texto(tempo_font, f"{int(seconds_left)}", (255,255,255))
             screen.blit(tempo_txt, (x + box_w//2 - tempo_txt.get_width()//2, y + box_h//2 - tempo_txt.get_height()//2))
+            return area
         else:
-            draw_text(screen, f"TEMPO: {int(seconds_left)}s", 18, 18, font, ALARM_COLOR)
+            return draw_text(screen, f"TEMPO: {int(seconds_left)}s", 18, 18, font, ALARM_COLOR)
+
+    # camada única pros cones de todas as câmeras (não cria Surface nova por frame)
+    cones = visao.CamadaCones((SW, SH))
+
+    def draw_cameras():
+        # desenha as câmeras e depois todos os cones de uma vez por cima
+        rects = [c.draw(screen) for c in state.cams]
+        for c in state.cams:
+            c.draw_cone(cones, passo.alpha)
+        return rects + cones.draw(screen)
 
     def draw_panel(rect):
         # desenha o painel (imagem ou quadrado)
         if panel_img:
-            screen.blit(panel_img, (rect.x, rect.y))
+            return screen.blit(panel_img, (rect.x, rect.y))
         else:
-            pygame.draw.rect(screen, PANEL_COLOR, rect)
+            return pygame.draw.rect(screen, PANEL_COLOR, rect)
+
+    def draw_frame():
+        # desenha o frame (fundo, câmeras, painel, player, timer)
+        # e devolve as áreas desenhadas por cima do fundo
+        draw_background()
+        perfil.marcar("piso")
+        rects = draw_cameras()
+        perfil.marcar("cones")
+        rects.append(draw_panel(panel))
+        rects.append(player.draw(screen, passo.alpha))
+        perfil.marcar("sprites")
+        rects.append(draw_timer_box(state.timer))
+        perfil.marcar("hud")
+        return rects
+
+    # só manda pro display as áreas que mudaram (se o modo estiver ligado)
+    sujos = tela.RetangulosSujos()
 
     # --- MÚSICA DE FUNDO ---
     # toca um som de fundo só pra fase 2
-    try:
-        if base_dir:
-            fase2_music_path = os.path.join(base_dir, "assets", "som_fase2.mp3")
-        else:
-            fase2_music_path = "assets/som_fase2.mp3"
-        if os.path.exists(fase2_music_path) and pygame.mixer.get_init() is not None:
-            pygame.mixer.music.load(fase2_music_path)
-            pygame.mixer.music.set_volume(0.5)
-            pygame.mixer.music.play(-1)
-    except Exception:
-        pass
+    audio.musica("fase2")
 
     def stop_alarm():
         # para o alarme e para a música (usado quando perde/vence)
-        try:
-            if alarm_sound: alarm_sound.stop()
-            pygame.mixer.music.stop()
-        except Exception:
-            pass
-
-    # paredes da sala
-    walls = build_walls(SW, SH)
-
-    # porta de saída (é o buraco da parede direita)
-    door_h = int(SH * 0.16)
-    door_y = SH//2 - door_h//2
-    door_rect = pygame.Rect(SW-16, door_y, 16, door_h)
-
-    # cria player e injeta sprites carregados
-    player = Player(80, HEIGHT//2)
+        audio.parar("alarme")
+        audio.parar_musica()
+
+    # toda a lógica (player, câmeras, painel, tempos) fica no Estado;
+    # aqui no run só carrega assets, desenha e toca os sons
+    state = Estado((SW, SH))
+    walls = state.walls
+    door_rect = state.door_rect
+    panel = state.panel
+    player = state.player
+
+    # nada disso muda durante a fase, então monta o fundo uma vez só
+    # (e guarda no cache do nível: da próxima vez só lê os pixels prontos)
+    def montar_fundo():
+        bg = recursos.fundo(recursos.piso((SW, SH), floor_tile, BG_COLOR), walls, WALL_COLOR)
+        pygame.draw.rect(bg, PANEL_COLOR, door_rect)
+        return bg
+
+    # (o próprio fase2.py e o recursos.py entram na chave: mudou cor/desenho, refaz o fundo)
+    background = state.nivel.fundo(montar_fundo, arquivos=(floor_path, __file__, recursos.__file__))
+
+    # injeta os sprites carregados no player
     player.images_ok, player.idle, player.walk, player.idle_dir, player.walk_dir, player.base_w, player.base_h = sprites_ok, idle_img, walk_imgs, idle_dir, walk_dir, base_w, base_h
+    if player.images_ok:
+        player.bake_sprites()
 
-    # lista de câmeras (com varredura usando min/max e sweep_speed)
-    cams = [
-        Camera(int(SW*0.35), int(SH*0.25), -35, -60, 0, 30.0),
-        Camera(int(SW*0.60), int(SH*0.45), 215, 180, 250, 22.0),
-
-        Camera(int(SW*0.86), int(SH*0.20), 0, -50, 50, 25.0),
-        Camera(int(SW*0.86), int(SH*0.40), 0, -50, 50, 25.0),
-        Camera(int(SW*0.86), int(SH*0.60), 0, -50, 50, 25.0),
-        Camera(int(SW*0.86), int(SH*0.80), 0, -50, 50, 25.0),
-    ]
     # aplica sprite pra todas as câmeras (se tiver)
-    for c in cams:
+    for c in state.cams:
         c.sprite = cam_sprite
 
-    # painel onde o player pode sabotar (fica no meio)
-    panel = pygame.Rect(int(SW*0.49), int(SH*0.18), 40, 40)
-    panel_area = panel.inflate(120, 120)  # área maior pra facilitar interação
-
-    # variáveis de estado
-    sabotage_timer = 0.0
-    recorded = False
-    timer = TIME_LIMIT
     alarm_playing = False
 
-    # pra mostrar mensagem de sucesso da sabotagem por um tempo curto
-    sabotage_success_time = 0.0
-    SHOW_SABOTAGE_MSG = 0.9
-    sabotage_success = False
+    # a lógica anda em passos fixos (tempo.SIM_HZ por segundo); o desenho continua no FPS
+    passo = tempo.PassoFixo()
 
     # loop principal da fase
     while True:
-        dt = clock.tick(FPS)/1000.0
-        timer -= dt
+        frame_dt = clock.tick(FPS)/1000.0
+        perfil.quadro("fase2")
 
-        # eventos básicos (fechar e ESC)
+        # eventos básicos (fechar e ESC; F3 mostra o perfil)
         for e in pygame.event.get():
+            perfil.tecla(e)
             if e.type == pygame.QUIT:
                 stop_alarm()
                 pygame.quit(); sys.exit()
@@ -547,134 +858,69 @@ def run(screen, clock, font, base_dir=None):
                 stop_alarm()
                 pygame.quit(); sys.exit()
 
-        # se acabou o tempo, perde
-        if timer <= 0:
-            stop_alarm()
-            return "LOSE"
-
-        # atualiza player (movimento/colisão)
-        player.update(dt, walls)
-
-        # se não tem mais câmeras (sabotou) e chegou na porta, passa limpo
-        if (not cams) and player.hitbox.colliderect(door_rect.inflate(40, 40)):
-            stop_alarm()
-            return "CLEAN"
-
-        # animação do player
-        if player.images_ok:
-            if player.moving:
-                if player.facing != player._prev_facing:
-                    player.frame, player.anim_timer = 0, 0.0
-                    player._prev_facing = player.facing
-                player.anim_timer += dt
-                if player.anim_timer >= player.anim_speed:
-                    player.anim_timer = 0.0
-                    frames = player.walk_dir.get(player.facing, player.walk)
-                    player.frame = (player.frame+1) % len(frames)
-            else:
-                player.frame = 0
-
-        # -------- SABOTAGEM NO PAINEL --------
-        keys = pygame.key.get_pressed()
-        if not sabotage_success and player.hitbox.colliderect(panel_area) and keys[pygame.K_SPACE]:
-            sabotage_timer += dt
-
-            # toca um “bip” no começo de segurar
-            if sabotage_sound and sabotage_timer < 0.06:
-                try:
-                    sabotage_sound.play()
-                except Exception:
-                    pass
-
-            # quando completa o tempo, desliga as câmeras
-            if sabotage_timer >= SABOTAGE_TIME:
-                cams = []             # remove câmeras
-                recorded = False      # limpa status
-                stop_alarm()
-                alarm_playing = False
-                sabotage_success = True
-                sabotage_success_time = 0.0
-        else:
-            # se soltou antes de completar, volta o timer um pouco (pra não ficar fácil)
-            if not sabotage_success:
-                sabotage_timer = max(0.0, sabotage_timer - dt*1.6)
-
-        # mostra a mensagem de “sucesso” por um tempinho e continua o loop
-        if sabotage_success:
-            sabotage_success_time += dt
-            draw_floor_and_walls(walls)
-            pygame.draw.rect(screen, PANEL_COLOR, door_rect)
-            for c in cams: 
-                c.draw(screen)
-            draw_panel(panel)
-            player.draw(screen)
-            draw_timer_box(timer)
-            draw_text(screen, "SABOTAGEM: SUCESSO", WIDTH//2 - 120, HEIGHT//2 - 10, font, HINT_COLOR)
-            pygame.display.flip()
-
-            if sabotage_success_time >= SHOW_SABOTAGE_MSG:
-                sabotage_success = False
-                sabotage_timer = 0.0
-            else:
-                continue
-
-        # atualiza varredura das câmeras
-        for c in cams:
-            c.update(dt)
-
-        # -------- DETECÇÃO DAS CÂMERAS --------
-        saw_now = False
-        if cams:
-            for c in cams:
-                if c.can_see(player.rect, walls):
-                    saw_now = True
-                    break
-
-        # se alguma câmera viu, aciona gravação e liga alarme
-        if saw_now:
-            recorded = True
-            if alarm_sound and not alarm_playing:
-                try:
-                    alarm_sound.play(loops=-1)
-                    alarm_playing = True
-                except Exception:
-                    pass
+        # quantos passos fixos cabem no tempo do frame (todos com o teclado de agora)
+        inputs = entrada.Entrada.do_teclado()
+        perfil.marcar("entrada")
+        result = None
+        for _ in range(passo.avancar(frame_dt)):
+            replay.anotar("fase2", inputs)
+            result = step(state, inputs, passo.dt)
+
+            # sons que a lógica pediu neste passo
+            for ev in state.eventos:
+                if ev == "sabotagem":
+                    # “bip” no começo de segurar SPACE no painel
+                    audio.tocar("sabotagem")
+                elif ev == "alarme" and not alarm_playing:
+                    alarm_playing = audio.tocar("alarme", loops=-1) is not None
+                elif ev == "parar_alarme":
+                    stop_alarm()
+                    alarm_playing = False
+
+            if result:
+                replay.fim("fase2", result)
+                break
+        perfil.marcar("logica")
 
         # se gravou, mostra mensagem e encerra a fase como “RECORDED”
-        if recorded:
-            draw_floor_and_walls(walls)
-            pygame.draw.rect(screen, PANEL_COLOR, door_rect)
-            for c in cams: 
-                c.draw(screen)
-            draw_panel(panel)
-            player.draw(screen)
-            draw_timer_box(timer)
-            draw_text(screen, "CÂMERAS GRAVARAM", WIDTH//2 - 120, HEIGHT//2 - 10, font, ALARM_COLOR)
-            pygame.display.flip()
+        if result == "RECORDED":
+            sujos.marcar(*draw_frame())
+            sujos.marcar(draw_text(screen, "CÂMERAS GRAVARAM", WIDTH//2 - 120, HEIGHT//2 - 10, font, ALARM_COLOR))
+            sujos.atualizar()
 
             stop_alarm()
             alarm_playing = False
             return "RECORDED"
 
-        # -------- DESENHO NORMAL (sem derrota/sem mensagem) --------
-        draw_floor_and_walls(walls)
-        pygame.draw.rect(screen, PANEL_COLOR, door_rect)
-
-        for c in cams:
-            c.draw(screen)
+        # acabou o tempo ("LOSE") ou saiu pela porta ("CLEAN")
+        if result:
+            stop_alarm()
+            return result
 
-        draw_panel(panel)
-        player.draw(screen)
+        # mostra a mensagem de “sucesso” da sabotagem por um tempinho
+        if state.sabotage_success:
+            sujos.marcar(*draw_frame())
+            sujos.marcar(draw_text(screen, "SABOTAGEM: SUCESSO", WIDTH//2 - 120, HEIGHT//2 - 10, font, HINT_COLOR))
+            sujos.marcar(perfil.desenhar(screen))
+            sujos.atualizar()
+            perfil.marcar("flip")
+            continue
 
-        draw_timer_box(timer)
+        # -------- DESENHO NORMAL (sem derrota/sem mensagem) --------
+        sujos.marcar(*draw_frame())
 
         # textos de ajuda/objetivo
-        draw_text(screen, "OBJETIVO: atravesse sem ser filmada", 18, 44, font, HINT_COLOR)
-        draw_text(screen, "WASD / Setas: mover", 18, HEIGHT-70, font, WHITE)
-        draw_text(screen, "SPACE: sabotar painel", 18, HEIGHT-44, font, WHITE)
+        sujos.marcar(
+            draw_text(screen, "OBJETIVO: atravesse sem ser filmada", 18, 44, font, HINT_COLOR),
+            draw_text(screen, "WASD / Setas: mover", 18, HEIGHT-70, font, WHITE),
+            draw_text(screen, "SPACE: sabotar painel", 18, HEIGHT-44, font, WHITE),
+        )
 
         # dica perto do painel
         if panel.colliderect(player.rect):
-            draw_text(screen, "Pressione SPACE para sabotar", panel.x-120, panel.y-26, font, HINT_COLOR)
+            sujos.marcar(draw_text(screen, "Pressione SPACE para sabotar", panel.x-120, panel.y-26, font, HINT_COLOR))
+        perfil.marcar("hud")
 
-        pygame.display.flip()
+        sujos.marcar(perfil.desenhar(screen))
+        sujos.atualizar()
+        perfil.marcar("flip")
@@ -7,6 +7,24 @@ import sys
 import math, random
 import os
 
+try:
+    import numpy as np   # só pra andar com muitos guardas de uma vez (opcional)
+except ImportError:
+    np = None
+
+import audio
+import colisao
+import entidades
+import entrada
+import navegacao
+import niveis
+import perfil
+import recursos
+import replay
+import tela
+import tempo
+import visao
+
 # ----- CONFIG -----
 WIDTH, HEIGHT = 1024, 640
 FPS = 60
@@ -30,63 +48,25 @@ GUARD_SPEED = 90
 FOV_ANGLE = 60        # ângulo do cone de visão do guarda
 FOV_DISTANCE = 220    # distância do cone de visão
 STEAL_TIME = 1.0      # tempo segurando SPACE pra roubar
+DOOR_OPEN_TIME = 0.4  # tempo da animação da porta abrindo
+ALERT_DURATION = 12.0 # quanto tempo o alarme fica ligado depois que um guarda vê
 
 # ----- SONS / ASSETS -----
-def _load_sounds(base_dir=None):
-    # carrega sons principais (alarme, game over e vitória)
-    alarm_sound = None
-    game_over_sound = None
-    victory_sound = None
-    try:
-        # se veio base_dir (rodando pelo main), usa ele; senão tenta relativo
-        if base_dir:
-            alarm_path = os.path.join(base_dir, "assets", "alarme.mp3")
-            go_path = os.path.join(base_dir, "assets", "game_over_som.mp3")
-            vi_path = os.path.join(base_dir, "assets", "vitoria_som.mp3")
-        else:
-            alarm_path = "assets/alarme.mp3"
-            go_path = "assets/game_over_som.mp3"
-            vi_path = "assets/vitoria_som.mp3"
-
-        # garante mixer inicializado
-        if pygame.mixer.get_init() is None:
-            try:
-                pygame.mixer.init()
-            except Exception:
-                pass
-
-        # carrega cada som (se existir)
-        if pygame.mixer.get_init() is not None:
-            try:
-                if os.path.exists(alarm_path):
-                    alarm_sound = pygame.mixer.Sound(alarm_path)
-                    alarm_sound.set_volume(0.6)
-            except Exception:
-                alarm_sound = None
-
-            try:
-                if os.path.exists(go_path):
-                    game_over_sound = pygame.mixer.Sound(go_path)
-                    game_over_sound.set_volume(0.75)
-            except Exception:
-                game_over_sound = None
-
-            try:
-                if os.path.exists(vi_path):
-                    victory_sound = pygame.mixer.Sound(vi_path)
-                    victory_sound.set_volume(0.85)
-            except Exception:
-                victory_sound = None
-
-    except Exception:
-        alarm_sound = None
-        game_over_sound = None
-        victory_sound = None
-
-    return alarm_sound, game_over_sound, victory_sound
+# (os sons tocam pelo audio.py, pelo nome: "alarme", "game_over", "vitoria" e a música "fase3")
+
+def preload_assets(base_dir=None):
+    # arquivos que a fase usa (o main manda ler em segundo plano enquanto a fase 2 roda)
+    assets = os.path.join(base_dir or "", "assets")
+    return [
+        ("imagem", os.path.join(assets, "piso_madeira.png")),
+        ("imagem", os.path.join(assets, "game_over.png")),
+        ("imagem", os.path.join(assets, "vitoria.png")),
+        ("imagem", os.path.join(assets, "Presa_video.png")),
+    ] + audio.preload_assets("alarme", "game_over", "vitoria", "fase3") + recursos.pngs(os.path.join(assets, "police")) + recursos.pngs(os.path.join(assets, "player"))
 
 def _load_images(base_dir=None):
     # carrega fundos (se existirem) pra vitória/game over
+    # (o main já carrega os mesmos arquivos, então aqui normalmente é hit no cache)
     GAME_OVER_BG = None
     VICTORY_BG = None
     PRESA_VIDEO_BG = None
@@ -103,24 +83,21 @@ def _load_images(base_dir=None):
         # game over
         try:
             if os.path.exists(go_path):
-                GAME_OVER_BG = pygame.image.load(go_path).convert()
-                GAME_OVER_BG = pygame.transform.scale(GAME_OVER_BG, (WIDTH, HEIGHT))
+                GAME_OVER_BG = recursos.imagem(go_path, alpha=False, size=(WIDTH, HEIGHT), smooth=False)
         except Exception:
             GAME_OVER_BG = None
 
         # vitória
         try:
             if os.path.exists(vi_path):
-                VICTORY_BG = pygame.image.load(vi_path).convert()
-                VICTORY_BG = pygame.transform.scale(VICTORY_BG, (WIDTH, HEIGHT))
+                VICTORY_BG = recursos.imagem(vi_path, alpha=False, size=(WIDTH, HEIGHT), smooth=False)
         except Exception:
             VICTORY_BG = None
 
         # fundo “presa” usado no game over
         try:
             if os.path.exists(pv_path):
-                PRESA_VIDEO_BG = pygame.image.load(pv_path).convert()
-                PRESA_VIDEO_BG = pygame.transform.scale(PRESA_VIDEO_BG, (WIDTH, HEIGHT))
+                PRESA_VIDEO_BG = recursos.imagem(pv_path, alpha=False, size=(WIDTH, HEIGHT), smooth=False)
         except Exception:
             PRESA_VIDEO_BG = None
 
@@ -131,20 +108,6 @@ def _load_images(base_dir=None):
 
     return GAME_OVER_BG, VICTORY_BG, PRESA_VIDEO_BG
 
-def _trim_sprite(surf):
-    # recorta transparência ao redor do sprite (melhora o scale e encaixe)
-    try:
-        mask = pygame.mask.from_surface(surf)
-        rects = mask.get_bounding_rects()
-        if not rects:
-            return surf
-        r = rects[0].copy()
-        for rr in rects[1:]:
-            r.union_ip(rr)
-        return surf.subsurface(r).copy()
-    except Exception:
-        return surf
-    
 def _load_guard_sprites(base_dir=None):
     # carrega sprites do guarda (idle e walk por direção)
     idle_dir = {}
@@ -166,7 +129,7 @@ def _load_guard_sprites(base_dir=None):
         for d, fn in idle_files.items():
             p = os.path.join(gdir, fn)
             if os.path.exists(p):
-                idle_dir[d] = pygame.image.load(p).convert_alpha()
+                idle_dir[d] = recursos.imagem(p)
 
         # walk por direção (3 frames)
         for d in ["down","up","left","right"]:
@@ -174,7 +137,7 @@ def _load_guard_sprites(base_dir=None):
             for i in range(3):
                 p = os.path.join(gdir, f"walk_{i}{d}.png")
                 if os.path.exists(p):
-                    frames.append(pygame.image.load(p).convert_alpha())
+                    frames.append(recursos.imagem(p))
             if frames:
                 walk_dir[d] = frames
 
@@ -195,6 +158,10 @@ class Player:
         self.hitbox = self.rect.inflate(-30, -40)
         self.hitbox.midbottom = self.rect.midbottom
 
+        # posição da hitbox em float (o Rect arredonda, e em passos pequenos isso mudaria a velocidade)
+        self.fx, self.fy = float(self.hitbox.x), float(self.hitbox.y)
+        self.prev_center = None  # centro no passo anterior (pra interpolar o desenho)
+
         self.speed = PLAYER_SPEED
 
         # flags de gameplay
@@ -211,6 +178,7 @@ class Player:
         self.walk_dir = {}
         self.base_w = 1
         self.base_h = 1
+        self.atlas = {}  # sprite -> (escalado, espelhado), montado uma vez por bake_sprites()
 
         # animação / direção
         self.facing = "down"
@@ -222,14 +190,10 @@ class Player:
         self.facing_left = False
         # ----------------------------------------
 
-    def update(self, dt, walls):
-        # movimento do player
-        keys = pygame.key.get_pressed()
-        dx = dy = 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= 1
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += 1
-        if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= 1
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += 1
+    def update(self, dt, walls, inputs):
+        # movimento do player (entrada do frame: teclado ou simulação)
+        self.prev_center = self.rect.center
+        dx, dy = inputs.direcao()
 
         # normaliza pra diagonal não ser mais rápida
         if dx != 0 or dy != 0:
@@ -258,26 +222,46 @@ class Player:
 
         self.moving = (dx != 0 or dy != 0)
 
-        # move no eixo X e Y com colisão contra paredes
-        self.hitbox.x += dx * self.speed * dt
+        # se alguém mexeu na hitbox por fora, a posição float segue ela
+        if self.hitbox.x != round(self.fx): self.fx = float(self.hitbox.x)
+        if self.hitbox.y != round(self.fy): self.fy = float(self.hitbox.y)
+
+        # move no eixo X e Y com colisão contra paredes (se bateu, a float vai pra onde parou)
+        self.fx += dx * self.speed * dt
+        self.hitbox.x = round(self.fx)
         self._collide(walls, dx, 0)
-        self.hitbox.y += dy * self.speed * dt
+        if self.hitbox.x != round(self.fx): self.fx = float(self.hitbox.x)
+        self.fy += dy * self.speed * dt
+        self.hitbox.y = round(self.fy)
         self._collide(walls, 0, dy)
+        if self.hitbox.y != round(self.fy): self.fy = float(self.hitbox.y)
 
         # atualiza o rect visual baseado na hitbox
         self.rect.midbottom = self.hitbox.midbottom
 
+    def bake_sprites(self):
+        # pré-escala todos os frames (e as versões espelhadas) pro tamanho do rect
+        scale = min(self.rect.width / self.base_w, self.rect.height / self.base_h)
+        sprites = [self.idle_image] + list(self.walk_images) + list(self.idle_dir.values())
+        for frames in self.walk_dir.values():
+            sprites += list(frames)
+        self.atlas = recursos.atlas(sprites, scale)
+
     def _collide(self, walls, dx, dy):
         # colisão simples: se bater, empurra pra fora
-        for w in walls:
+        # (só as paredes perto, se walls for uma GradeParedes)
+        for w in colisao.perto(walls, self.hitbox):
             if self.hitbox.colliderect(w):
                 if dx > 0: self.hitbox.right = w.left
                 if dx < 0: self.hitbox.left = w.right
                 if dy > 0: self.hitbox.bottom = w.top
                 if dy < 0: self.hitbox.top = w.bottom
 
-    def draw(self, surf):
+    def draw(self, surf, alpha=1.0):
         # desenha sprite se existir; senão desenha retângulo
+        # (alpha = quanto já andou do próximo passo: desenha entre a posição anterior e a atual)
+        rect = self.rect.copy()
+        rect.center = tempo.interpolar(self.prev_center, self.rect.center, alpha)
         if self.images_ok and (self.idle_image is not None):
             if self.moving:
                 frames = self.walk_dir.get(self.facing)
@@ -290,149 +274,165 @@ class Player:
             else:
                 sprite = self.idle_dir.get(self.facing, self.idle_image)
 
-            # escala mantendo proporção
-            w, h = sprite.get_size()
-            scale = min(self.rect.width / self.base_w, self.rect.height / self.base_h)
-            new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-
-            try:
-                sprite_scaled = pygame.transform.smoothscale(sprite, new_size)
-            except Exception:
-                sprite_scaled = pygame.transform.scale(sprite, new_size)
+            # sprite já vem escalado (proporcional) do atlas
+            if sprite not in self.atlas:
+                self.bake_sprites()
+            sprite_scaled, sprite_flipped = self.atlas[sprite]
 
             # flip se estiver indo pra esquerda e não tiver sprite por direção
             if self.facing_left and (self.facing not in self.walk_dir) and (self.facing not in self.idle_dir):
-                sprite_scaled = pygame.transform.flip(sprite_scaled, True, False)
+                sprite_scaled = sprite_flipped
 
-            x = self.rect.centerx - sprite_scaled.get_width() // 2
-            y = self.rect.centery - sprite_scaled.get_height() // 2
-            surf.blit(sprite_scaled, (x, y))
+            x = rect.centerx - sprite_scaled.get_width() // 2
+            y = rect.centery - sprite_scaled.get_height() // 2
+            return surf.blit(sprite_scaled, (x, y))
         else:
-            pygame.draw.rect(surf, GERLUCE_COLOR, self.rect)
+            pygame.draw.rect(surf, GERLUCE_COLOR, rect)
             # se tiver máscara, desenha um contorno branco
             if self.mask:
-                pygame.draw.rect(surf, (255,255,255), self.rect.inflate(-8,-14), 2)
+                pygame.draw.rect(surf, (255,255,255), rect.inflate(-8,-14), 2)
+            return rect
+
+LADOS = ("down", "up", "left", "right")   # "facing" dos guardas, na ordem das colunas q0..q3
+
+
+def _lado(dx, dy):
+    # índice em LADOS pra onde o guarda está virado andando na direção (dx, dy)
+    if abs(dx) > abs(dy):
+        return 2 if dx < 0 else 3
+    return 1 if dy < 0 else 0
+
+
+def tabela_guardas():
+    # colunas dos guardas (entidades.Tabela): uma linha por guarda
+    # (q0..q3 = quantos frames de andar tem pra cada lado, 0 se não tem sprite)
+    return entidades.Tabela(
+        x=0.0, y=0.0, dx=1.0, dy=0.0, velocidade=GUARD_SPEED, pausa=0.6, t_pausa=0.0,
+        ponto=0.0, ini=0.0, tam=1.0, rx=0.0, ry=0.0, w=70.0, h=70.0,
+        antes_x=entidades.NADA, antes_y=entidades.NADA, alerta=0.0, lado=0.0,
+        quadro=0.0, t_anim=0.0, v_anim=0.12, andando=0.0, imagens=0.0,
+        q0=0.0, q1=0.0, q2=0.0, q3=0.0,
+    )
+
+
+def tabela_caminhos():
+    # pontos dos paths de todos os guardas, um atrás do outro (cada guarda sabe onde o dele começa)
+    return entidades.Tabela(x=0.0, y=0.0)
+
+
+def _centro_anterior(x, y):
+    return None if math.isnan(x) else (int(x), int(y))
+
 
 class Guard:
-    def __init__(self, path_points, speed=GUARD_SPEED, pause=0.6):
-        # path é a rota que o guarda anda em loop
-        self.path = path_points[:]
-        self.i = 0
-        self.pos = pygame.Vector2(self.path[0])
-        self.speed = speed
-        self.pause = pause
-        self.pause_timer = 0
-
-        # direção inicial
-        self.direction = pygame.Vector2(1,0)
-        self.rect = pygame.Rect(self.pos.x-14, self.pos.y-14, 70, 70)
-
-        # alerted = quando viu o player e passa a perseguir
-        self.alerted = False
+    # alça pra uma linha da tabela de guardas (os números moram nas colunas)
+    __slots__ = ("_t", "_c", "_i", "sprite", "idle_dir", "_walk_dir")
+
+    pos = entidades.par("x", "y", pygame.Vector2)
+    direction = entidades.par("dx", "dy", pygame.Vector2)
+    speed = entidades.coluna("velocidade")
+    pause = entidades.coluna("pausa")
+    pause_timer = entidades.coluna("t_pausa")
+    prev_center = entidades.par("antes_x", "antes_y", _centro_anterior)  # centro no passo anterior (pra interpolar o desenho)
+    alerted = entidades.coluna("alerta", bool)     # quando viu o player e passa a perseguir
+    images_ok = entidades.coluna("imagens", bool)
+    facing = entidades.rotulo("lado", LADOS)
+    frame = entidades.coluna("quadro", int)
+    anim_timer = entidades.coluna("t_anim")
+    anim_speed = entidades.coluna("v_anim")
+    moving = entidades.coluna("andando", bool)
+
+    def __init__(self, path_points, speed=GUARD_SPEED, pause=0.6, tabela=None, caminhos=None):
+        # sem tabela, o guarda ganha uma só pra ele
+        self._t = tabela if tabela is not None else tabela_guardas()
+        self._c = caminhos if caminhos is not None else tabela_caminhos()
+
+        # path é a rota que o guarda anda em loop (os pontos ficam na tabela de caminhos)
+        ini = self._c.n
+        for x, y in path_points:
+            self._c.novo(x=x, y=y)
+
+        x, y = path_points[0]
+        rect = pygame.Rect(x-14, y-14, 70, 70)
+        self._i = self._t.novo(x=x, y=y, velocidade=speed, pausa=pause,
+                               ini=ini, tam=len(path_points),
+                               rx=rect.x, ry=rect.y, w=rect.w, h=rect.h)
 
         # sprites
         self.sprite = None
-        self._sprite_cache = {}
-        self.images_ok = False
         self.idle_dir = {}
-        self.walk_dir = {}
-
-        # animação / direção
-        self.facing = "down"
-        self.frame = 0
-        self.anim_timer = 0.0
-        self.anim_speed = 0.12
-        self.moving = False
+        self._walk_dir = {}
+
+    @property
+    def rect(self):
+        # Rect novo a cada vez (mexer nele não move o guarda)
+        col, i = self._t.col, self._i
+        return pygame.Rect(int(col["rx"][i]), int(col["ry"][i]), int(col["w"][i]), int(col["h"][i]))
+
+    @property
+    def walk_dir(self):
+        return self._walk_dir
+
+    @walk_dir.setter
+    def walk_dir(self, frames):
+        # os sprites de andar; quantos frames tem pra cada lado vai pras colunas (pra animar em lote)
+        self._walk_dir = frames
+        for k, lado in enumerate(LADOS):
+            self._t.col[f"q{k}"][self._i] = len(frames.get(lado) or ())
+
+    def _centralizar(self):
+        # rect.center = posição arredondada
+        col, i = self._t.col, self._i
+        col["rx"][i] = round(col["x"][i]) - int(col["w"][i]) // 2
+        col["ry"][i] = round(col["y"][i]) - int(col["h"][i]) // 2
 
     def update(self, dt):
+        # só este guarda (a fase usa patrulhar, todos de uma vez)
         # se já está alertado, não segue o path normal
         if self.alerted:
+            self.prev_center = self.rect.center
             return
+        patrulhar(self._t, self._c, dt, (self._i,))
 
-        # vai para o próximo ponto do caminho
-        target = pygame.Vector2(self.path[(self.i+1)%len(self.path)])
-        vec = target - self.pos
-        dist = vec.length()
-
-        # se chegou no ponto, espera um pouco antes de ir pro próximo
-        if dist < 2:
-            self.moving = False
-            self.pause_timer += dt
-            if self.pause_timer >= self.pause:
-                self.pause_timer = 0
-                self.i = (self.i + 1) % len(self.path)
-        else:
-            # anda em direção ao target
-            self.direction = vec.normalize()
-
-            # atualiza direção “facing” pra escolher sprite correto
-            if abs(self.direction.x) > abs(self.direction.y):
-                self.facing = "left" if self.direction.x < 0 else "right"
-            else:
-                self.facing = "up" if self.direction.y < 0 else "down"
-
-            self.moving = True
-            self.pos += self.direction * self.speed * dt
-            self.rect.center = (round(self.pos.x), round(self.pos.y))
-
-        # animação só quando está andando
-        if self.images_ok and self.moving:
-            self.anim_timer += dt
-            if self.anim_timer >= self.anim_speed:
-                self.anim_timer = 0.0
-                frames = self.walk_dir.get(self.facing)
-                if frames:
-                    self.frame = (self.frame + 1) % len(frames)
-        else:
-            self.frame = 0
-            self.anim_timer = 0.0
-
-    def chase(self, player, dt):
-        # modo perseguição: vai direto no player
+    def chase(self, player, dt, campo=None):
+        # modo perseguição: vai no player; com o campo de navegação, desce o campo
+        # em volta das paredes quando não dá pra ir reto
+        self.prev_center = self.rect.center
         vec = pygame.Vector2(player.rect.center) - self.pos
 
         if vec.length() > 4:
-            self.direction = vec.normalize()
+            if campo is not None:
+                passo = pygame.Vector2(campo.proximo(self.pos, player.rect.center)) - self.pos
+                if passo.length() > 0:
+                    vec = passo
+            direction = vec.normalize()
+            self.direction = direction
 
             # escolhe direção pra sprite
-            if abs(self.direction.x) > abs(self.direction.y):
-                self.facing = "left" if self.direction.x < 0 else "right"
-            else:
-                self.facing = "up" if self.direction.y < 0 else "down"
+            self._t.col["lado"][self._i] = _lado(direction.x, direction.y)
 
             self.moving = True
-            self.pos += self.direction * (self.speed*1.2) * dt
-            self.rect.center = (round(self.pos.x), round(self.pos.y))
+            self.pos += direction * (self.speed*1.2) * dt
+            self._centralizar()
         else:
             self.moving = False
 
         # animação no chase também
-        if self.images_ok and self.moving:
-            self.anim_timer += dt
-            if self.anim_timer >= self.anim_speed:
-                self.anim_timer = 0.0
-                frames = self.walk_dir.get(self.facing)
-                if frames:
-                    self.frame = (self.frame + 1) % len(frames)
-        else:
-            self.frame = 0
-            self.anim_timer = 0.0
-
-    def draw(self, surf):
-        # desenha o cone de “lanterna” (campo de visão)
-        start = pygame.Vector2(self.rect.center)
-        dir_angle = math.degrees(math.atan2(self.direction.y, self.direction.x))
+        _animar(self._t.col, self._i, dt)
 
-        left_angle = math.radians(dir_angle - FOV_ANGLE/2)
-        right_angle = math.radians(dir_angle + FOV_ANGLE/2)
-        p1 = start + pygame.Vector2(math.cos(left_angle), math.sin(left_angle)) * FOV_DISTANCE
-        p2 = start + pygame.Vector2(math.cos(right_angle), math.sin(right_angle)) * FOV_DISTANCE
+    def _centro(self, alpha):
+        # centro pra desenhar, entre a posição do passo anterior e a atual
+        return tempo.interpolar(self.prev_center, self.rect.center, alpha)
 
-        s = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        pygame.draw.polygon(s, (255, 240, 160, 40), [start, p1, p2])
-        surf.blit(s, (0,0))
+    def draw_cone(self, cones, alpha=1.0):
+        # desenha o cone de “lanterna” (campo de visão) na camada compartilhada
+        dir_angle = math.degrees(math.atan2(self.direction.y, self.direction.x))
+        cones.add_cone(self._centro(alpha), dir_angle, FOV_ANGLE, FOV_DISTANCE, (255, 240, 160, 40))
 
+    def draw(self, surf, alpha=1.0):
         # desenha sprite do guarda, ou retângulo se não tiver
+        rect = self.rect.copy()
+        rect.center = self._centro(alpha)
         if self.images_ok and self.idle_dir:
             frames = self.walk_dir.get(self.facing)
             idle = self.idle_dir.get(self.facing, next(iter(self.idle_dir.values())))
@@ -449,14 +449,10 @@ class Guard:
             else:
                 sprite = idle
 
-            try:
-                sprite2 = pygame.transform.smoothscale(sprite, self.rect.size)
-            except Exception:
-                sprite2 = pygame.transform.scale(sprite, self.rect.size)
-
-            surf.blit(sprite2, self.rect.topleft)
+            # escala pro tamanho do rect só na primeira vez (depois sai do cache)
+            return surf.blit(recursos.escalado(sprite, rect.size), rect.topleft)
         else:
-            pygame.draw.rect(surf, GUARD_COLOR, self.rect)
+            return pygame.draw.rect(surf, GUARD_COLOR, rect)
 
     def can_see_player(self, player, walls):
         # checa se o player está dentro do cone + sem parede bloqueando
@@ -478,15 +474,133 @@ class Guard:
         if abs(diff) > FOV_ANGLE/2:
             return False
 
-        # raycast simples: vê se alguma parede bloqueia a visão
-        steps = int(dist//8)
-        for i in range(1, steps+1):
-            p = start + vec*(i/steps)
-            r = pygame.Rect(p.x-2,p.y-2,4,4)
-            for w in walls:
-                if r.colliderect(w):
-                    return False
-        return True
+        # linha de visão exata (segmento x retângulo): vê se alguma parede bloqueia
+        return visao.linha_livre(start, target, walls)
+
+
+def _animar(col, i, dt):
+    # animação só quando está andando (e tem sprite); parado volta pro frame 0
+    if col["imagens"][i] and col["andando"][i]:
+        col["t_anim"][i] += dt
+        if col["t_anim"][i] >= col["v_anim"][i]:
+            col["t_anim"][i] = 0.0
+            n = int(col[f"q{int(col['lado'][i])}"][i])
+            if n:
+                col["quadro"][i] = (int(col["quadro"][i]) + 1) % n
+    else:
+        col["quadro"][i] = 0.0
+        col["t_anim"][i] = 0.0
+
+
+LOTE_GUARDAS = 48   # a partir de quantos guardas a patrulha vai em lote (numpy)
+
+
+def patrulhar(guardas, caminhos, dt, quais=None):
+    # patrulha de todos os guardas não alertados da tabela (ou só os "quais"):
+    # cada um anda pro próximo ponto do path e espera um pouco quando chega
+    if quais is None and guardas.em_lote(LOTE_GUARDAS):
+        _patrulhar_lote(guardas, caminhos, dt)
+        return
+
+    col = guardas.col
+    x, y, dx, dy = col["x"], col["y"], col["dx"], col["dy"]
+    rx, ry, w, h = col["rx"], col["ry"], col["w"], col["h"]
+    ponto, ini, tam = col["ponto"], col["ini"], col["tam"]
+    t_pausa, pausa, vel = col["t_pausa"], col["pausa"], col["velocidade"]
+    alerta, andando, lado = col["alerta"], col["andando"], col["lado"]
+    px, py = caminhos.col["x"], caminhos.col["y"]
+    for i in (range(guardas.n) if quais is None else quais):
+        if alerta[i]:
+            continue   # alertado não segue o path (quem anda com ele é o chase)
+        col["antes_x"][i] = rx[i] + w[i] // 2
+        col["antes_y"][i] = ry[i] + h[i] // 2
+
+        # vai para o próximo ponto do caminho
+        p, n = int(ponto[i]), int(tam[i])
+        j = int(ini[i]) + (p + 1) % n
+        vx, vy = px[j] - x[i], py[j] - y[i]
+        dist = math.sqrt(vx*vx + vy*vy)
+
+        # se chegou no ponto, espera um pouco antes de ir pro próximo
+        if dist < 2:
+            andando[i] = 0.0
+            t_pausa[i] += dt
+            if t_pausa[i] >= pausa[i]:
+                t_pausa[i] = 0.0
+                ponto[i] = (p + 1) % n
+        else:
+            # anda em direção ao ponto (e vira o sprite pra lá)
+            dx[i], dy[i] = vx / dist, vy / dist
+            lado[i] = _lado(dx[i], dy[i])
+            andando[i] = 1.0
+            x[i] += dx[i] * vel[i] * dt
+            y[i] += dy[i] * vel[i] * dt
+            rx[i] = round(x[i]) - int(w[i]) // 2
+            ry[i] = round(y[i]) - int(h[i]) // 2
+
+        _animar(col, i, dt)
+
+
+def _patrulhar_lote(guardas, caminhos, dt):
+    # a mesma conta do patrulhar, na coluna inteira de uma vez (numpy)
+    (x, y, dx, dy, rx, ry, w, h, ponto, ini, tam, t_pausa, pausa, vel, alerta, andando, lado,
+     antes_x, antes_y, quadro, t_anim, v_anim, imagens, q0, q1, q2, q3) = guardas.vetores(
+        "x", "y", "dx", "dy", "rx", "ry", "w", "h", "ponto", "ini", "tam", "t_pausa", "pausa",
+        "velocidade", "alerta", "andando", "lado", "antes_x", "antes_y", "quadro", "t_anim",
+        "v_anim", "imagens", "q0", "q1", "q2", "q3")
+    px, py = caminhos.vetores("x", "y")
+
+    m = alerta == 0
+    np.copyto(antes_x, rx + w // 2, where=m)
+    np.copyto(antes_y, ry + h // 2, where=m)
+
+    k = (ini + (ponto + 1) % tam).astype(np.intp)
+    vx, vy = px[k] - x, py[k] - y
+    dist = np.sqrt(vx*vx + vy*vy)
+    chegou = m & (dist < 2)
+    anda = m & ~chegou
+
+    # chegou no ponto: espera e depois vai pro próximo
+    np.copyto(andando, 0.0, where=chegou)
+    np.add(t_pausa, dt, out=t_pausa, where=chegou)
+    virou = chegou & (t_pausa >= pausa)
+    np.copyto(t_pausa, 0.0, where=virou)
+    np.copyto(ponto, (ponto + 1) % tam, where=virou)
+
+    # anda em direção ao ponto
+    np.divide(vx, dist, out=dx, where=anda)
+    np.divide(vy, dist, out=dy, where=anda)
+    novo_lado = np.where(np.abs(dx) > np.abs(dy), np.where(dx < 0, 2.0, 3.0), np.where(dy < 0, 1.0, 0.0))
+    np.copyto(lado, novo_lado, where=anda)
+    np.copyto(andando, 1.0, where=anda)
+    np.add(x, dx * vel * dt, out=x, where=anda)
+    np.add(y, dy * vel * dt, out=y, where=anda)
+    np.copyto(rx, np.round(x) - w // 2, where=anda)
+    np.copyto(ry, np.round(y) - h // 2, where=anda)
+
+    # animação (só quem anda e tem sprite)
+    anima = m & (imagens != 0) & (andando != 0)
+    np.add(t_anim, dt, out=t_anim, where=anima)
+    troca = anima & (t_anim >= v_anim)
+    np.copyto(t_anim, 0.0, where=troca)
+    n = np.choose(lado.astype(np.intp), (q0, q1, q2, q3))
+    troca &= n > 0
+    np.copyto(quadro, (quadro + 1) % np.where(n > 0, n, 1.0), where=troca)
+    parado = m & ~anima
+    np.copyto(quadro, 0.0, where=parado)
+    np.copyto(t_anim, 0.0, where=parado)
+
+
+def guardas_que_veem(guards, player, walls):
+    # os guardas cujo can_see_player dá True (na ordem); com muitos guardas, distância
+    # e ângulo são cortados todos de uma vez (visao.candidatos) antes do teste completo
+    if len(guards) >= visao.LOTE_MINIMO:
+        centros = [g.rect.center for g in guards]
+        sobra = visao.candidatos([c[0] for c in centros], [c[1] for c in centros],
+                                 [math.degrees(math.atan2(g.direction.y, g.direction.x)) for g in guards],
+                                 FOV_ANGLE/2, FOV_DISTANCE, player.rect.center)
+        guards = [guards[i] for i in sobra]
+    return [g for g in guards if g.can_see_player(player, walls)]
 
 class Statue:
     def __init__(self, x,y):
@@ -498,75 +612,193 @@ class Statue:
         if not self.stolen:
             pygame.draw.rect(surf, STATUE_COLOR, self.rect)
             pygame.draw.rect(surf, (255,255,255), self.rect.inflate(-10,-10), 2)
+            return self.rect.copy()
+        return None
 
-# ----- LEVEL SETUP -----
-def build_walls(door_closed=True, door_rect=None, exit_door_rect=None):
-    # monta lista de paredes do mapa, com portas (buracos) controladas por rects
-    walls = []
-    walls.append(pygame.Rect(0,0,WIDTH,16))
-    walls.append(pygame.Rect(0,0,16,HEIGHT))
-    walls.append(pygame.Rect(0,HEIGHT-16,WIDTH,16))
-
-    # parede direita com “buraco” (porta de saída)
-    if exit_door_rect is None:
-        walls.append(pygame.Rect(WIDTH-16,0,16,HEIGHT))
-    else:
-        top_h = max(0, exit_door_rect.y)
-        bottom_y = exit_door_rect.bottom
-        bottom_h = max(0, HEIGHT - bottom_y)
-        if top_h > 0:
-            walls.append(pygame.Rect(WIDTH-16, 0, 16, top_h))
-        if bottom_h > 0:
-            walls.append(pygame.Rect(WIDTH-16, bottom_y, 16, bottom_h))
-
-    # “mansão” no meio do mapa (retângulo grande)
-    mansion_x, mansion_y, mansion_w, mansion_h = 200, 120, 600, 200
-    top_wall = pygame.Rect(mansion_x, mansion_y, mansion_w, 16)
-    left_wall = pygame.Rect(mansion_x, mansion_y, 16, mansion_h)
-    right_wall = pygame.Rect(mansion_x+mansion_w-16, mansion_y, 16, mansion_h)
-    
-    # parede de baixo: ou completa ou com buraco (porta de entrada)
-    if door_rect is None:
-        bottom_wall = pygame.Rect(mansion_x, mansion_y + mansion_h - 16, mansion_w, 16)
-        walls += [top_wall, left_wall, bottom_wall, right_wall]
+def draw_text(s, txt, x,y, color=WHITE, font=None):
+    # helper simples pra desenhar texto (fonte e render saem do cache)
+    if font is None:
+        font = recursos.fonte("consolas", 20)
+    surf = recursos.texto(font, txt, color)
+    return s.blit(surf, (x,y))
+
+# ----- LÓGICA (sem janela, sem som) -----
+class Estado:
+    # tudo que a lógica da fase precisa; o run() só desenha e toca som em cima disso
+    def __init__(self):
+        # o mapa (paredes, portas, estátua, guardas, áreas) vem do niveis/fase3.json
+        self.nivel = niveis.carregar("fase3", (WIDTH, HEIGHT))
+
+        # --------- Porta de saída estilo fase 2 (buraco na parede direita) ---------
+        self.exit_door_rect = self.nivel.rect("saida")
+        self.exit_area = self.nivel.gatilho("saida")
+
+        # porta da “entrada” da mansão (abre com E)
+        self.door_rect = self.nivel.porta("mansao")
+        self.door_area = self.nivel.gatilho("mansao")
+
+        # controle de abertura (animação)
+        self.door_closed, self.door_open_progress = True, 0.0
+
+        # paredes com a porta fechada no início
+        # (numa grade, pra colisão e visão só olharem as paredes perto; já vem do cache do nível)
+        self.walls = self.nivel.grade()
+        self.paredes_mudaram = False  # avisa o run() pra refazer o fundo
+        self.campo = None             # campo de navegação até o player (montado na primeira perseguição)
+
+        self.player = Player(*self.nivel.ponto("jogador"))
+
+        # estátua no meio (objetivo) e a área em volta onde dá pra roubar
+        self.statue = Statue(*self.nivel.ponto("estatua"))
+        self.statue_area = self.nivel.gatilho("estatua")
+
+        # guardas com paths diferentes
+        # (os números deles todos na mesma tabela, pra andar com todos de uma vez)
+        self.guardas, self.caminhos = tabela_guardas(), tabela_caminhos()
+        self.guards = [
+            Guard([tuple(p) for p in g["caminho"]], speed=g["velocidade"],
+                  tabela=self.guardas, caminhos=self.caminhos)
+            for g in self.nivel.dados["guardas"]
+        ]
+
+        # estado do alarme (quando um guarda vê)
+        self.alarm, self.alarm_timer = False, 0.0
+
+        # child_area é uma área “câmera” (se passar ali, conta como gravado)
+        self.child_caught, self.camera_recorded = False, False
+        self.child_area = self.nivel.gatilho("camera")
+
+        # sons pedidos no último passo ("alarme", "parar_alarme")
+        self.eventos = []
+
+
+def campo_de(state, alvo):
+    # campo de navegação das paredes de agora (refeito depois que a porta muda),
+    # mirando no alvo; um só pra todos os guardas alertados
+    if state.campo is None:
+        state.campo = navegacao.CampoFluxo(navegacao.GradeNavegacao(state.walls, (WIDTH, HEIGHT)))
+    state.campo.mirar(alvo)
+    return state.campo
+
+
+def step(state, inputs, dt):
+    # um passo da fase: devolve "CAUGHT" (pego pelo guarda), "WIN" (saiu com a estátua) ou None
+    state.eventos = []
+    player, statue, guards = state.player, state.statue, state.guards
+    door_rect = state.door_rect
+
+    # E perto da porta da mansão começa a abrir
+    if inputs.e and player.hitbox.colliderect(state.door_area):
+        state.door_closed = False
+
+    # atualiza player com colisão
+    with perfil.secao("player"):
+        player.update(dt, state.walls, inputs)
+
+    # animação do player (só se tiver sprites)
+    if player.images_ok:
+        if player.moving:
+            if player.facing != player._prev_facing:
+                player.frame = 0
+                player.anim_timer = 0.0
+                player._prev_facing = player.facing
+
+            player.anim_timer += dt
+            if player.anim_timer >= player.anim_speed:
+                player.anim_timer = 0.0
+                frames = player.walk_dir.get(player.facing, player.walk_images)
+                player.frame = (player.frame + 1) % len(frames)
+        else:
+            player.frame = 0
+            player.anim_timer = 0.0
+
+    # abertura da porta com animação (vai diminuindo a “altura”)
+    # a grade de paredes só é refeita aqui, enquanto a porta muda
+    if not state.door_closed and state.door_open_progress < 1.0:
+        state.door_open_progress += dt / DOOR_OPEN_TIME
+        if state.door_open_progress >= 1.0:
+            state.door_open_progress = 1.0
+            state.walls = state.nivel.grade(mansao=None)
+        else:
+            current_h = int(door_rect.height * (1.0 - state.door_open_progress))
+            anim_rect = pygame.Rect(door_rect.x, door_rect.y + (door_rect.height - current_h), door_rect.width, current_h)
+            state.walls = state.nivel.grade(mansao=anim_rect if current_h>0 else None)
+        state.paredes_mudaram = True
+        state.campo = None            # o campo de navegação é refeito quando precisar
+
+    # atualiza guardas: se alertados perseguem (descendo o campo até o player), senão seguem o path
+    with perfil.secao("guarda"):
+        campo = None
+        for g in guards:
+            if g.alerted:
+                if campo is None:
+                    campo = campo_de(state, player.rect.center)
+                g.chase(player, dt, campo)
+        patrulhar(state.guardas, state.caminhos, dt)
+
+    # checa visão dos guardas pra disparar alarme
+    if not state.alarm:
+        with perfil.secao("visao"):
+            for g in guardas_que_veem(guards, player, state.walls):
+                g.alerted = state.alarm = True
+                state.alarm_timer = ALERT_DURATION
+                state.eventos.append("alarme")
     else:
-        door_x, door_w = door_rect.x, door_rect.width
-        bottom_y = mansion_y + mansion_h - 16
+        # conta o tempo do alarme e reseta depois
+        state.alarm_timer -= dt
+        if state.alarm_timer <= 0:
+            state.alarm = False
+            for g in guards:
+                g.alerted = False
+            state.eventos.append("parar_alarme")
+
+    # se entrou na área “câmera”, marca lembrando que foi gravado
+    if player.hitbox.colliderect(state.child_area):
+        state.camera_recorded = True
+
+    # -------- ROUBO DA ESTÁTUA (segurar SPACE) --------
+    if not statue.stolen and player.hitbox.colliderect(state.statue_area):
+        if inputs.space:
+            player.stealing = True
+            player.steal_timer += dt
+            if player.steal_timer >= STEAL_TIME:
+                statue.stolen = player.has_statue = True
+                player.stealing = False
 
-        # parte esquerda da parede de baixo
-        if door_x > mansion_x:
-            walls.append(pygame.Rect(mansion_x, bottom_y, door_x - mansion_x, 16))
+                # se algum guarda estava vendo na hora do roubo, liga alarme
+                for g in guardas_que_veem(guards, player, state.walls):
+                    state.alarm = g.alerted = True
 
-        # parte direita da parede de baixo
-        right_start, end_x = door_x + door_w, mansion_x + mansion_w
-        if right_start < end_x:
-            walls.append(pygame.Rect(right_start, bottom_y, end_x - right_start, 16))
+                if state.alarm:
+                    state.eventos.append("alarme")
 
-        walls += [top_wall, left_wall, right_wall]
+                # se estava “gravada” e roubou, marca que deu ruim (usa depois)
+                if state.camera_recorded:
+                    state.child_caught = True
+        else:
+            # se soltou SPACE, vai diminuindo a barra
+            player.stealing = False
+            player.steal_timer = max(0, player.steal_timer - dt*1.6)
+    else:
+        player.stealing = False
+        player.steal_timer = max(0, player.steal_timer - dt*0.8)
 
-        # se porta está “fechada”, adiciona o retângulo da porta como parede
-        if door_closed:
-            walls.append(door_rect)
-    
-    # alguns obstáculos internos
-    walls += [pygame.Rect(340,180,120,20), pygame.Rect(520,220,160,20)]
-    return walls
+    # se o guarda encosta no player enquanto alertado: game over
+    for g in guards:
+        if g.rect.colliderect(player.hitbox) and g.alerted:
+            return "CAUGHT"
 
-def draw_text(s, txt, x,y, color=WHITE, font=None):
-    # helper simples pra desenhar texto
-    if font is None:
-        font = pygame.font.SysFont("consolas", 20)
-    surf = font.render(txt, True, color)
-    s.blit(surf, (x,y))
+    # saída: se tem a estátua e chega na porta da direita, vence
+    if player.has_statue and player.hitbox.colliderect(state.exit_area):
+        return "WIN"
+
+    return None
 
 # ----- TELAS DE FIM (reutilizáveis) -----
-def show_end_screen_local(screen, clock, font, title, msg, color, bg_image=None, game_over_sound=None):
-    # tela de fim local (parecida com a do main)
-    try:
-        if game_over_sound:
-            game_over_sound.play()
-    except Exception:
-        pass
+def show_end_screen_local(screen, clock, font, title, msg, color, bg_image=None, som=None):
+    # tela de fim local (parecida com a do main); "som" é o nome do efeito no audio.py
+    if som:
+        audio.tocar(som)
 
     # fundo (imagem ou cor)
     if bg_image:
@@ -602,32 +834,12 @@ def show_end_screen_local(screen, clock, font, title, msg, color, bg_image=None,
 # ----- RUN API -----
 def run(screen, clock, font, base_dir=None):
     # carrega sons e imagens
-    alarm_sound, game_over_sound, victory_sound = _load_sounds(base_dir)
+    audio.carregar("alarme", "game_over", "vitoria")
     GAME_OVER_BG, VICTORY_BG, PRESA_VIDEO_BG = _load_images(base_dir)
     guards_ok, guards_idle_dir, guards_walk_dir = _load_guard_sprites(base_dir)
 
     # --- MÚSICA DE FUNDO DA FASE 3 ---
-    try:
-        if base_dir:
-            fase3_music_path = os.path.join(base_dir, "assets", "fase3_som.mp3")
-        else:
-            fase3_music_path = "assets/fase3_som.mp3"
-
-        if pygame.mixer.get_init() is None:
-            try:
-                pygame.mixer.init()
-            except Exception:
-                pass
-
-        if os.path.exists(fase3_music_path) and pygame.mixer.get_init() is not None:
-            try:
-                pygame.mixer.music.load(fase3_music_path)
-                pygame.mixer.music.set_volume(0.5)
-                pygame.mixer.music.play(-1)
-            except Exception:
-                pass
-    except Exception:
-        pass
+    audio.musica("fase3")
 
     # --- PISO + OVERLAY ---
     floor_tile = None
@@ -636,19 +848,18 @@ def run(screen, clock, font, base_dir=None):
             floor_path = os.path.join(base_dir, "assets", "piso_madeira.png")
         else:
             floor_path = os.path.join("assets", "piso_madeira.png")
-        floor_img = pygame.image.load(floor_path).convert()
-        floor_tile = pygame.transform.smoothscale(floor_img, (74, 74))
+        floor_tile = recursos.imagem(floor_path, alpha=False, size=(74, 74))
     except Exception:
         floor_tile = None
 
-    # overlay escuro por cima do piso
-    floor_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    floor_overlay.fill((0, 0, 0, 100))
+    # camada única pros cones dos guardas (reaproveitada todo frame)
+    cones = visao.CamadaCones((WIDTH, HEIGHT))
 
     # time box removida (fica None pra não desenhar)
     timer_box_img = None  
 
     # --- CARREGA SPRITES DO JOGADOR ---
+    # (já recortados e vindos do cache global; as fases anteriores normalmente já carregaram)
     player_idle = None
     player_walk = []
     images_ok = False
@@ -665,7 +876,7 @@ def run(screen, clock, font, base_dir=None):
         # idle geral
         idle_path = os.path.join(player_dir, "idle.png")
         if os.path.exists(idle_path):
-            player_idle = pygame.image.load(idle_path).convert_alpha()
+            player_idle = recursos.imagem(idle_path, trim=True)
 
         # idle por direção
         idle_files = {
@@ -677,7 +888,7 @@ def run(screen, clock, font, base_dir=None):
         for d, fn in idle_files.items():
             p = os.path.join(player_dir, fn)
             if os.path.exists(p):
-                player_idle_dir[d] = pygame.image.load(p).convert_alpha()
+                player_idle_dir[d] = recursos.imagem(p, trim=True)
 
         # walk por direção
         for d in ["down","up","left","right"]:
@@ -685,7 +896,7 @@ def run(screen, clock, font, base_dir=None):
             for i in range(3):
                 p = os.path.join(player_dir, f"walk_{i}{d}.png")
                 if os.path.exists(p):
-                    frames.append(pygame.image.load(p).convert_alpha())
+                    frames.append(recursos.imagem(p, trim=True))
             if frames:
                 player_walk_dir[d] = frames
 
@@ -697,7 +908,7 @@ def run(screen, clock, font, base_dir=None):
         for i in range(8):
             p = os.path.join(player_dir, f"walk_{i}.png")
             if os.path.exists(p):
-                player_walk.append(pygame.image.load(p).convert_alpha())
+                player_walk.append(recursos.imagem(p, trim=True))
 
         # valida se tem sprites suficientes pra ativar
         if player_idle is not None:
@@ -707,18 +918,6 @@ def run(screen, clock, font, base_dir=None):
                 player_walk = [player_idle]
                 images_ok = True
 
-        # recorta transparência
-        if player_idle is not None:
-            player_idle = _trim_sprite(player_idle)
-
-        for k in list(player_idle_dir.keys()):
-            player_idle_dir[k] = _trim_sprite(player_idle_dir[k])
-
-        for k in list(player_walk_dir.keys()):
-            player_walk_dir[k] = [_trim_sprite(s) for s in player_walk_dir[k]]
-
-        player_walk = [_trim_sprite(s) for s in player_walk]
-
         # tamanho base pra scale proporcional
         all_sprites = []
         if player_idle is not None:
@@ -735,25 +934,40 @@ def run(screen, clock, font, base_dir=None):
     except Exception:
         images_ok = False
 
-    # --------- Porta de saída estilo fase 2 (buraco na parede direita) ---------
-    exit_door_h = int(HEIGHT * 0.16)
-    exit_door_y = HEIGHT//2 - exit_door_h//2
-    exit_door_rect = pygame.Rect(WIDTH-16, exit_door_y, 16, exit_door_h)
-
-    # porta da “entrada” da mansão (abre com E)
-    door_w, door_h = 120, 16
-    door_x, door_y = 200 + (600 - door_w) // 2, 120 + 200 - 16
-    door_rect = pygame.Rect(door_x, door_y, door_w, door_h)
-
-    # controle de abertura (animação)
-    door_closed, door_open_progress = True, 0.0
-    DOOR_OPEN_TIME = 0.4
-
-    # cria paredes com a porta fechada no início
-    walls = build_walls(door_closed=True, door_rect=door_rect, exit_door_rect=exit_door_rect)
-
-    # cria player e injeta sprites carregados
-    player = Player(100, HEIGHT//2)
+    # toda a lógica (player, guardas, porta, alarme) fica no Estado;
+    # aqui no run só carrega assets, desenha e toca os sons
+    state = Estado()
+    player = state.player
+    statue = state.statue
+    guards = state.guards
+    exit_door_rect = state.exit_door_rect
+    door_rect = state.door_rect
+    door_x, door_y, door_w, door_h = door_rect
+
+    # tapete na entrada da mansão (só visual)
+    mat_rect = pygame.Rect(door_x - 14, door_y + door_h, door_w + 28, 22)
+
+    def montar_fundo(walls):
+        # tudo que é estático (piso, paredes, porta de saída, tapete) numa Surface só
+        # só é refeito quando as paredes mudam (animação da porta)
+        # (piso ladrilhado + overlay escuro: o recursos monta uma vez e guarda)
+        floor_base = recursos.piso((WIDTH, HEIGHT), floor_tile, BG_COLOR)
+        bg = recursos.fundo(floor_base, walls, WALL_COLOR)
+        pygame.draw.rect(bg, DOOR_COLOR, exit_door_rect)
+        pygame.draw.rect(bg, MAT_COLOR, mat_rect)
+        draw_text(bg, "ENTRADA", door_x + door_w//2 - 28, mat_rect.y + 2, WHITE, font)
+        return bg
+
+    # o fundo do começo (porta fechada) sai pronto do cache do nível
+    # (o próprio fase3.py e o recursos.py entram na chave: mudou cor/desenho, refaz o fundo)
+    background = state.nivel.fundo(lambda: montar_fundo(state.walls),
+                                   arquivos=(floor_path, __file__, recursos.__file__),
+                                   extra=f"ENTRADA {font.get_height()}")
+
+    # só manda pro display as áreas que mudaram (se o modo estiver ligado)
+    sujos = tela.RetangulosSujos()
+
+    # injeta sprites carregados no player
     player.images_ok = images_ok
     player.idle_image = player_idle
     player.walk_images = player_walk
@@ -765,181 +979,92 @@ def run(screen, clock, font, base_dir=None):
     player.anim_timer = 0.0
     player.anim_speed = 0.12
     player._prev_facing = player.facing
+    if player.images_ok:
+        player.bake_sprites()
 
-    # estátua no meio (objetivo)
-    statue = Statue(600, 250)
-
-    # guardas com paths diferentes
-    guards = [
-        Guard([(500,60),(780,60),(780,300),(500,300)]),
-        Guard([(260,200),(420,200),(420,320),(260,320)], speed=75),
-    ]
+    # sprites dos guardas
     for g in guards:
         g.images_ok = guards_ok
         g.idle_dir = guards_idle_dir
         g.walk_dir = guards_walk_dir
 
-    # estado do alarme (quando um guarda vê)
-    alarm, alarm_timer = False, 0.0
-    ALERT_DURATION = 12.0
+    def parar_sons():
+        # para o alarme e a música (quando a fase acaba)
+        audio.parar("alarme")
+        audio.parar_musica()
 
-    # child_area é uma área “câmera” (se passar ali, conta como gravado)
-    child_caught, camera_recorded = False, False
-    child_area = pygame.Rect(120, HEIGHT-140, 160, 120)
+    # a lógica anda em passos fixos (tempo.SIM_HZ por segundo); o desenho continua no FPS
+    passo = tempo.PassoFixo()
 
     # loop principal da fase
     while True:
-        dt = clock.tick(FPS) / 1000.0
+        frame_dt = clock.tick(FPS) / 1000.0
+        perfil.quadro("fase3")
 
-        # eventos básicos e interação (E pra abrir porta / ESC sai)
+        # eventos básicos (ESC sai; F3 mostra o perfil); o E da porta vem junto com o teclado
+        apertou_e = False
         for event in pygame.event.get():
+            perfil.tecla(event)
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_e and player.hitbox.colliderect(door_rect.inflate(40,40)):
-                    door_closed = False
+                if event.key == pygame.K_e:
+                    apertou_e = True
                 if event.key == pygame.K_ESCAPE:
                     pygame.quit(); sys.exit()
 
-        # atualiza player com colisão
-        player.update(dt, walls)
-
-        # animação do player (só se tiver sprites)
-        if player.images_ok:
-            if player.moving:
-                if player.facing != player._prev_facing:
-                    player.frame = 0
-                    player.anim_timer = 0.0
-                    player._prev_facing = player.facing
-
-                player.anim_timer += dt
-                if player.anim_timer >= player.anim_speed:
-                    player.anim_timer = 0.0
-                    frames = player.walk_dir.get(player.facing, player.walk_images)
-                    player.frame = (player.frame + 1) % len(frames)
-            else:
-                player.frame = 0
-                player.anim_timer = 0.0
-
-        # abertura da porta com animação (vai diminuindo a “altura”)
-        if not door_closed and door_open_progress < 1.0:
-            door_open_progress += dt / DOOR_OPEN_TIME
-            if door_open_progress >= 1.0:
-                door_open_progress = 1.0
-                walls = build_walls(door_closed=False, door_rect=door_rect, exit_door_rect=exit_door_rect)
-            else:
-                current_h = int(door_h * (1.0 - door_open_progress))
-                anim_rect = pygame.Rect(door_x, door_y + (door_h - current_h), door_w, current_h)
-                walls = build_walls(door_closed=True, door_rect=anim_rect if current_h>0 else None, exit_door_rect=exit_door_rect)
-
-        # atualiza guardas: se alertados perseguem, senão seguem o path
-        for g in guards:
-            if g.alerted:
-                g.chase(player, dt)
-            else:
-                g.update(dt)
-
-        # checa visão dos guardas pra disparar alarme
-        if not alarm:
-            for g in guards:
-                if g.can_see_player(player, walls):
-                    g.alerted = alarm = True
-                    alarm_timer = ALERT_DURATION
-                    if alarm_sound:
-                        try:
-                            alarm_sound.play(loops=-1)
-                        except Exception:
-                            pass
-        else:
-            # conta o tempo do alarme e reseta depois
-            alarm_timer -= dt
-            if alarm_timer <= 0:
-                alarm = False
-                for g in guards:
-                    g.alerted = False
-                if alarm_sound:
-                    try:
-                        alarm_sound.stop()
-                    except Exception:
-                        pass
-
-        # se entrou na área “câmera”, marca lembrando que foi gravado
-        if player.hitbox.colliderect(child_area):
-            camera_recorded = True
-
-        # -------- ROUBO DA ESTÁTUA (segurar SPACE) --------
-        keys = pygame.key.get_pressed()
-        if not statue.stolen and player.hitbox.colliderect(statue.rect.inflate(24,24)):
-            if keys[pygame.K_SPACE]:
-                player.stealing = True
-                player.steal_timer += dt
-                if player.steal_timer >= STEAL_TIME:
-                    statue.stolen = player.has_statue = True
-                    player.stealing = False
-
-                    # se algum guarda estava vendo na hora do roubo, liga alarme
-                    for g in guards:
-                        if g.can_see_player(player, walls):
-                            alarm = g.alerted = True
-
-                    if alarm and alarm_sound:
-                        try:
-                            alarm_sound.play(loops=-1)
-                        except Exception:
-                            pass
-
-                    # se estava “gravada” e roubou, marca que deu ruim (usa depois)
-                    if camera_recorded:
-                        child_caught = True
-            else:
-                # se soltou SPACE, vai diminuindo a barra
-                player.stealing = False
-                player.steal_timer = max(0, player.steal_timer - dt*1.6)
-        else:
-            player.stealing = False
-            player.steal_timer = max(0, player.steal_timer - dt*0.8)
+        # quantos passos fixos cabem no tempo do frame (todos com o teclado de agora)
+        # (um toque rápido no E entre dois frames também conta)
+        inputs = entrada.Entrada.do_teclado()
+        inputs.e = inputs.e or apertou_e
+        perfil.marcar("entrada")
+        result = None
+        for _ in range(passo.avancar(frame_dt)):
+            replay.anotar("fase3", inputs)
+            result = step(state, inputs, passo.dt)
+
+            # sons que a lógica pediu neste passo
+            for ev in state.eventos:
+                if ev == "alarme":
+                    audio.tocar("alarme", loops=-1)
+                elif ev == "parar_alarme":
+                    audio.parar("alarme")
+
+            if result:
+                replay.fim("fase3", result)
+                break
+        perfil.marcar("logica")
+
+        # a porta mudou: refaz o fundo (só durante a animação)
+        if state.paredes_mudaram:
+            background = montar_fundo(state.walls)
+            sujos.marcar_tudo()
+            state.paredes_mudaram = False
+
+        # o guarda encostou no player enquanto alertado: game over
+        if result == "CAUGHT":
+            parar_sons()
+            return show_end_screen_local(
+                screen, clock, font,
+                "",
+                "",
+                ALARM_COLOR,
+                PRESA_VIDEO_BG,
+                "game_over"
+            )
 
-        # se o guarda encosta no player enquanto alertado: game over
-        for g in guards:
-            if g.rect.colliderect(player.hitbox) and g.alerted:
-                if alarm_sound:
-                    try:
-                        alarm_sound.stop()
-                    except Exception:
-                        pass
-                try:
-                    pygame.mixer.music.stop()
-                except Exception:
-                    pass
-                return show_end_screen_local(
-                    screen, clock, font,
-                    "",
-                    "",
-                    ALARM_COLOR,
-                    PRESA_VIDEO_BG,
-                    game_over_sound
-                )
-
-        # saída: se tem a estátua e chega na porta da direita, vence
-        if player.has_statue and player.hitbox.colliderect(exit_door_rect.inflate(40,40)):
-            if alarm_sound:
-                try:
-                    alarm_sound.stop()
-                except Exception:
-                    pass
-            try:
-                pygame.mixer.music.stop()
-            except Exception:
-                pass
+        # saiu pela porta da direita com a estátua: vence
+        if result == "WIN":
+            parar_sons()
 
             # aqui sempre dá vitória (o texto ending fica igual de qualquer jeito)
-            if alarm:
+            if state.alarm:
                 ending = "MISSÃO CONCLUÍDA"
             else:
                 ending = "MISSÃO CONCLUÍDA"
 
             bg = VICTORY_BG
-            end_sound = victory_sound
+            end_sound = "vitoria"
 
             return show_end_screen_local(
                 screen, clock, font,
@@ -951,57 +1076,49 @@ def run(screen, clock, font, base_dir=None):
             )
 
         # ---------------- DESENHO DA TELA ----------------
-        # fundo com piso tile e overlay, ou cor sólida se não tiver imagem
-        if floor_tile:
-            tw, th = floor_tile.get_width(), floor_tile.get_height()
-            for yy in range(0, HEIGHT, th):
-                for xx in range(0, WIDTH, tw):
-                    screen.blit(floor_tile, (xx, yy))
-            screen.blit(floor_overlay, (0, 0))
-        else:
-            screen.fill(BG_COLOR)
-
-        # desenha paredes
-        for w in walls:
-            pygame.draw.rect(screen, WALL_COLOR, w)
-
-        # porta de saída (o buraco na parede direita)
-        pygame.draw.rect(screen, DOOR_COLOR, exit_door_rect)
-
-        # tapete na entrada da mansão (só visual)
-        mat_rect = pygame.Rect(door_x - 14, door_y + door_h, door_w + 28, 22)
-        pygame.draw.rect(screen, MAT_COLOR, mat_rect)
-        draw_text(screen, "ENTRADA", door_x + door_w//2 - 28, mat_rect.y + 2, WHITE, font)
+        # fundo pré-desenhado: piso (ou cor sólida), paredes, porta de saída e tapete
+        screen.blit(background, (0, 0))
+        perfil.marcar("piso")
 
         # desenha a porta da mansão enquanto está abrindo (altura diminuindo)
-        if door_open_progress < 1.0:
-            current_h = int(door_h * (1.0 - door_open_progress))
+        if state.door_open_progress < 1.0:
+            current_h = int(door_h * (1.0 - state.door_open_progress))
             if current_h > 0:
-                pygame.draw.rect(screen, DOOR_COLOR, (door_x, door_y + (door_h - current_h), door_w, current_h))
+                sujos.marcar(pygame.draw.rect(screen, DOOR_COLOR, (door_x, door_y + (door_h - current_h), door_w, current_h)))
 
-        # desenha os objetos e personagens
-        statue.draw(screen)
+        # desenha os objetos e personagens (guardando as áreas que mudaram)
+        sujos.marcar(statue.draw(screen))
+        perfil.marcar("sprites")
         for g in guards:
-            g.draw(screen)
-        player.draw(screen)
+            g.draw_cone(cones, passo.alpha)
+        sujos.marcar(*cones.draw(screen))
+        perfil.marcar("cones")
+        for g in guards:
+            sujos.marcar(g.draw(screen, passo.alpha))
+        sujos.marcar(player.draw(screen, passo.alpha))
+        perfil.marcar("sprites")
 
         # dica pra abrir a porta quando estiver perto
-        if door_closed and player.hitbox.colliderect(door_rect.inflate(40,40)):
-            draw_text(screen, "Pressione E para abrir a porta", 18, HEIGHT-54, HINT_COLOR, font)
+        if state.door_closed and player.hitbox.colliderect(state.door_area):
+            sujos.marcar(draw_text(screen, "Pressione E para abrir a porta", 18, HEIGHT-54, HINT_COLOR, font))
 
         # HUD de baixo: mostra se tem estatueta e estado do alarme
         hud_y = HEIGHT - 26
         status = "Estatueta: OK" if player.has_statue else "Estatueta: —"
-        status2 = "Alarme: ATIVO" if alarm else "Alarme: off"
-        draw_text(screen, status + "   " + status2, 18, hud_y, WHITE, font)
+        status2 = "Alarme: ATIVO" if state.alarm else "Alarme: off"
+        sujos.marcar(draw_text(screen, status + "   " + status2, 18, hud_y, WHITE, font))
 
         # barra de “roubando” quando segura SPACE perto da estátua
         if player.stealing:
             w = int((player.steal_timer/STEAL_TIME)*180)
-            pygame.draw.rect(screen, (200,200,200), (WIDTH-220, hud_y, 180, 14), 2)
+            sujos.marcar(pygame.draw.rect(screen, (200,200,200), (WIDTH-220, hud_y, 180, 14), 2))
             pygame.draw.rect(screen, (200,120,40), (WIDTH-220, hud_y, w, 14))
-            draw_text(screen, "Roubando...", WIDTH-220, hud_y-22, WHITE, font)
+            sujos.marcar(draw_text(screen, "Roubando...", WIDTH-220, hud_y-22, WHITE, font))
 
         # instruções rápidas no topo
-        draw_text(screen, "WASD: Mover | SPACE: Roubar | E: Porta", 18, 6, WHITE, font)
-        pygame.display.flip()
+        sujos.marcar(draw_text(screen, "WASD: Mover | SPACE: Roubar | E: Porta", 18, 6, WHITE, font))
+        perfil.marcar("hud")
+
+        sujos.marcar(perfil.desenhar(screen))
+        sujos.atualizar()
+        perfil.marcar("flip")
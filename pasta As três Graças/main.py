@@ -1,12 +1,19 @@
 # main.py
 # Aqui fica o “roteador” do jogo: menu -> tutorial -> fase1 -> fase2 -> fase3
+import arranque  # primeiro de tudo: começa a contar o tempo de abertura
+
 import os
 import pygame
 import sys
 
-from fase1 import Fase1
-import fase2
-import fase3 
+import audio
+import perfil
+import recursos
+import replay
+import tela
+
+# as fases só são importadas quando precisam (depois que o menu já apareceu)
+arranque.marcar("imports")
 
 # ---------------- PATHS ----------------
 # BASE_DIR é a pasta onde o main.py está (ajuda a achar assets independente de onde roda)
@@ -20,8 +27,35 @@ def asset_path(*parts):
 WIDTH, HEIGHT = 1024, 640
 FPS = 60
 
-# som global pra usar na tela de game over
-GAME_OVER_SOUND = None
+# ---------------- CARREGAMENTO ADIADO ----------------
+def _precarregar_jogo():
+    # roda depois do primeiro frame do menu: lê em segundo plano o que vem depois
+    # (tutorial, telas de fim e a fase 1) enquanto o jogador ainda está no menu
+    import fase1
+    itens = [("imagem", asset_path("assets", f"tuto{i}.png")) for i in range(1, 5)]
+    itens += [
+        ("imagem", asset_path("assets", "Presa_video.png")),
+        ("imagem", asset_path("assets", "vitoria.png")),
+    ] + audio.preload_assets("game_over")
+    recursos.precarregar(itens + fase1.preload_assets(BASE_DIR))
+
+def _carregar_telas_de_fim():
+    # som de game over e fundos de game over/vitória, só na hora de jogar
+    # (normalmente já vêm do pré-carregamento, e depois ficam no cache)
+    audio.carregar("game_over")
+
+    # (ficam no cache global, então a fase 3 reaproveita as mesmas)
+    try:
+        presa = recursos.imagem(asset_path("assets","Presa_video.png"), alpha=False, size=(WIDTH,HEIGHT), smooth=False)
+    except Exception:
+        presa = None
+
+    try:
+        vitoria = recursos.imagem(asset_path("assets","vitoria.png"), alpha=False, size=(WIDTH,HEIGHT), smooth=False)
+    except Exception:
+        vitoria = None
+
+    return presa, vitoria
 
 # ---------------- TUTORIAL ----------------
 def mostrar_tutorial(screen, clock):
@@ -29,15 +63,16 @@ def mostrar_tutorial(screen, clock):
     pages = []
     try:
         for i in range(1, 5):
-            img = pygame.image.load(asset_path("assets", f"tuto{i}.png")).convert_alpha()
-            img = pygame.transform.scale(img, (WIDTH, HEIGHT))
+            img = recursos.imagem(asset_path("assets", f"tuto{i}.png"), size=(WIDTH, HEIGHT), smooth=False)
             pages.append(img)
     except Exception:
         # se der erro carregando, só volta pro menu
         return
 
-    # página atual do tutorial
+    # página atual do tutorial (a tela só é redesenhada quando troca de página)
     idx = 0
+    sujos = tela.RetangulosSujos()
+    mudou = True
 
     # loop do tutorial (fica aqui até acabar as páginas ou apertar ESC)
     while True:
@@ -56,25 +91,28 @@ def mostrar_tutorial(screen, clock):
             # clique esquerdo -> próxima página (tela inteira clicável)
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 idx += 1
+                mudou = True
                 if idx >= len(pages):
                     # terminou o tutorial
                     return
 
         # desenha a página atual
-        screen.blit(pages[idx], (0, 0))
-        pygame.display.flip()
+        if sujos.quer_desenhar(mudou):
+            screen.blit(pages[idx], (0, 0))
+        mudou = False
+        sujos.atualizar()
 
 
 # ---------------- GAME OVER DISPLAY ----------------
 def mostrar_game_over(screen, clock, bg):
-    font = pygame.font.SysFont("consolas", 28)
+    font = recursos.fonte("consolas", 28)
 
     # toca o som uma vez quando entra na tela de game over (se existir)
-    try:
-        if GAME_OVER_SOUND:
-            GAME_OVER_SOUND.play()
-    except Exception:
-        pass
+    audio.tocar("game_over")
+
+    # a tela é parada: só desenha no primeiro frame (com o modo de retângulos sujos)
+    sujos = tela.RetangulosSujos()
+    mudou = True
 
     # loop da tela de game over
     while True:
@@ -91,22 +129,28 @@ def mostrar_game_over(screen, clock, bg):
                 if e.key == pygame.K_ESCAPE:
                     pygame.quit(); sys.exit()
 
-        # se tiver imagem de fundo, usa ela, senão pinta com cor e escreve texto
-        if bg:
-            screen.blit(bg, (0,0))
-        else:
-            screen.fill((35,8,8))
-            t = font.render("GAME OVER", True, (220,60,60))
-            screen.blit(t, (WIDTH//2 - t.get_width()//2, HEIGHT//2 - 60))
+        if sujos.quer_desenhar(mudou):
+            # se tiver imagem de fundo, usa ela, senão pinta com cor e escreve texto
+            if bg:
+                screen.blit(bg, (0,0))
+            else:
+                screen.fill((35,8,8))
+                t = recursos.texto(font, "GAME OVER", (220,60,60))
+                screen.blit(t, (WIDTH//2 - t.get_width()//2, HEIGHT//2 - 60))
 
-        instr = font.render("APERTE R PARA VOLTAR AO INÍCIO", True, (235,235,220))
-        screen.blit(instr, (WIDTH//2 - instr.get_width()//2, HEIGHT - 80))
-        pygame.display.flip()
+            instr = recursos.texto(font, "APERTE R PARA VOLTAR AO INÍCIO", (235,235,220))
+            screen.blit(instr, (WIDTH//2 - instr.get_width()//2, HEIGHT - 80))
+        mudou = False
+        sujos.atualizar()
 
 
 # ---------------- VICTORY DISPLAY ----------------
 def mostrar_victory(screen, clock, bg, title, msg):
-    font = pygame.font.SysFont("consolas", 28)
+    font = recursos.fonte("consolas", 28)
+
+    # a tela é parada: só desenha no primeiro frame (com o modo de retângulos sujos)
+    sujos = tela.RetangulosSujos()
+    mudou = True
 
     # loop da tela de vitória
     while True:
@@ -124,57 +168,40 @@ def mostrar_victory(screen, clock, bg, title, msg):
                     pygame.quit(); sys.exit()
 
         # desenha fundo e textos
-        if bg:
-            screen.blit(bg, (0,0))
-        else:
-            screen.fill((18,80,30))
-            t = font.render(title or "MISSÃO CONCLUÍDA", True, (235,235,220))
-            screen.blit(t, (WIDTH//2 - t.get_width()//2, HEIGHT//2 - 60))
-            m = font.render(msg or "", True, (200,240,200))
-            screen.blit(m, (WIDTH//2 - m.get_width()//2, HEIGHT//2 - 10))
-
-        instr = font.render("APERTE R PARA VOLTAR AO INÍCIO", True, (235,235,220))
-        screen.blit(instr, (WIDTH//2 - instr.get_width()//2, HEIGHT - 80))
-        pygame.display.flip()
+        if sujos.quer_desenhar(mudou):
+            if bg:
+                screen.blit(bg, (0,0))
+            else:
+                screen.fill((18,80,30))
+                t = recursos.texto(font, title or "MISSÃO CONCLUÍDA", (235,235,220))
+                screen.blit(t, (WIDTH//2 - t.get_width()//2, HEIGHT//2 - 60))
+                m = recursos.texto(font, msg or "", (200,240,200))
+                screen.blit(m, (WIDTH//2 - m.get_width()//2, HEIGHT//2 - 10))
+
+            instr = recursos.texto(font, "APERTE R PARA VOLTAR AO INÍCIO", (235,235,220))
+            screen.blit(instr, (WIDTH//2 - instr.get_width()//2, HEIGHT - 80))
+        mudou = False
+        sujos.atualizar()
 
 
 # ---------------- MENU INICIAL (COM SOM) ----------------
 def tela_inicial(screen, clock):
     # tenta carregar imagem do menu
     try:
-        bg = pygame.image.load(asset_path("assets", "menu_inicial.png")).convert()
-        bg = pygame.transform.scale(bg, (WIDTH, HEIGHT))
+        bg = recursos.imagem(asset_path("assets", "menu_inicial.png"), alpha=False, size=(WIDTH, HEIGHT), smooth=False)
     except Exception:
         bg = None
+    arranque.marcar("menu: imagem")
 
-    # toca a música do menu em loop
-    try:
-        if pygame.mixer.get_init() is None:
-            try:
-                pygame.mixer.init()
-            except Exception:
-                pass
-
-        inicio_music_path = asset_path("assets", "tela_inicio_som.mp3")
-        if os.path.exists(inicio_music_path) and pygame.mixer.get_init() is not None:
-            try:
-                pygame.mixer.music.load(inicio_music_path)
-                pygame.mixer.music.set_volume(0.45)
-                pygame.mixer.music.play(-1)  # loop infinito enquanto estiver no menu
-            except Exception:
-                pass
-    except Exception:
-        pass
+    # toca a música do menu em loop (enquanto estiver no menu)
+    audio.musica("menu")
+    arranque.marcar("menu: música")
 
-    # sons de hover/click (se não achar, só fica sem som mesmo)
-    try:
-        hover_sound = pygame.mixer.Sound(asset_path("assets", "clicar.mp3"))
-        click_sound = pygame.mixer.Sound(asset_path("assets", "clicar.mp3"))
-    except Exception:
-        hover_sound = None
-        click_sound = None
+    # som de hover/click (se não achar, só fica sem som mesmo)
+    audio.carregar("clicar")
+    arranque.marcar("menu: sons")
 
-    font = pygame.font.SysFont("consolas", 28)
+    font = recursos.fonte("consolas", 28)
 
     # cores do botão
     BTN_BG = (18,20,28)
@@ -195,11 +222,15 @@ def tela_inicial(screen, clock):
 
     hovered_last = None
 
+    # o menu só é redesenhado quando o hover dos botões muda
+    sujos = tela.RetangulosSujos()
+    hover_estado = None
+
     # função pra desenhar um botão (normal ou hover)
     def draw(rect, text, hover):
         pygame.draw.rect(screen, BTN_BG_HOVER if hover else BTN_BG, rect, border_radius=6)
         pygame.draw.rect(screen, BTN_HOVER if hover else BTN_BORDER, rect, 2, border_radius=6)
-        t = font.render(text, True, TXT)
+        t = recursos.texto(font, text, TXT)
         screen.blit(t, (rect.centerx - t.get_width()//2,
                         rect.centery - t.get_height()//2))
 
@@ -211,118 +242,89 @@ def tela_inicial(screen, clock):
         for event in pygame.event.get():
             # fechar janela encerra
             if event.type == pygame.QUIT:
-                try:
-                    pygame.mixer.music.stop()
-                except Exception:
-                    pass
+                audio.parar_musica()
                 pygame.quit(); sys.exit()
 
             # clique nos botões
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if start.collidepoint(event.pos):
-                    if click_sound: click_sound.play()
-                    try:
-                        pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                    audio.tocar("clicar")
+                    audio.parar_musica()
                     return "START"
 
                 if tuto.collidepoint(event.pos):
-                    if click_sound: click_sound.play()
-                    try:
-                        pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                    audio.tocar("clicar")
+                    audio.parar_musica()
                     return "TUTORIAL"
 
                 if sair.collidepoint(event.pos):
-                    if click_sound: click_sound.play()
-                    try:
-                        pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                    audio.tocar("clicar")
+                    audio.parar_musica()
                     pygame.quit(); sys.exit()
 
             # atalhos do teclado no menu
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
-                    if click_sound: click_sound.play()
-                    try:
-                        pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                    audio.tocar("clicar")
+                    audio.parar_musica()
                     return "START"
 
                 if event.key == pygame.K_ESCAPE:
-                    try:
-                        pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                    audio.parar_musica()
                     pygame.quit(); sys.exit()
 
+        hover_agora = (start.collidepoint(mouse), tuto.collidepoint(mouse), sair.collidepoint(mouse))
+        mudou = hover_agora != hover_estado
+        hover_estado = hover_agora
+        desenhar = sujos.quer_desenhar(mudou)
+
         # desenha o fundo do menu
-        if bg:
-            screen.blit(bg,(0,0))
-        else:
-            screen.fill((10,10,16))
+        if desenhar:
+            if bg:
+                screen.blit(bg,(0,0))
+            else:
+                screen.fill((10,10,16))
 
         # detecta hover e toca som quando muda de botão
         for rect, name in [(start,"START"), (tuto,"TUTO"), (sair,"SAIR")]:
             if rect.collidepoint(mouse):
-                if hovered_last != name and hover_sound:
-                    hover_sound.play()
+                if hovered_last != name:
+                    audio.tocar("clicar")
                 hovered_last = name
                 break
         else:
             hovered_last = None
 
         # desenha os botões
-        draw(start,"INICIAR", start.collidepoint(mouse))
-        draw(tuto,"TUTORIAL", tuto.collidepoint(mouse))
-        draw(sair,"SAIR", sair.collidepoint(mouse))
+        if desenhar:
+            draw(start,"INICIAR", hover_agora[0])
+            draw(tuto,"TUTORIAL", hover_agora[1])
+            draw(sair,"SAIR", hover_agora[2])
 
-        pygame.display.flip()
+        sujos.atualizar()
+
+        # o menu já está na tela: fecha o relatório de abertura e começa o resto
+        arranque.primeiro_frame()
 
 
 # ---------------- MAIN ----------------
 def main():
-    global GAME_OVER_SOUND
     global WIDTH, HEIGHT
 
     pygame.init()
+    arranque.marcar("pygame.init")
 
     # cria a janela (scaled + fullscreen)
     screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED | pygame.FULLSCREEN)
     pygame.display.set_caption("As Três Graças")
+    arranque.marcar("janela")
 
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont("consolas", 20)
+    font = recursos.fonte("consolas", 20)
+    arranque.marcar("fonte")
 
-    # tenta carregar o som de game over (pra usar depois na tela)
-    try:
-        if pygame.mixer.get_init() is None:
-            try:
-                pygame.mixer.init()
-            except Exception:
-                pass
-        if pygame.mixer.get_init() is not None:
-            GAME_OVER_SOUND = pygame.mixer.Sound(asset_path("assets", "game_over_som.mp3"))
-            GAME_OVER_SOUND.set_volume(0.75)
-    except Exception:
-        GAME_OVER_SOUND = None
-
-    # carrega imagens de fundo (game over e vitória) pra usar mais tarde
-    try:
-        PRESA_VIDEO_BG = pygame.image.load(asset_path("assets","Presa_video.png")).convert()
-        PRESA_VIDEO_BG = pygame.transform.scale(PRESA_VIDEO_BG,(WIDTH,HEIGHT))
-    except Exception:
-        PRESA_VIDEO_BG = None
-
-    try:
-        VICTORY_BG = pygame.image.load(asset_path("assets","vitoria.png")).convert()
-        VICTORY_BG = pygame.transform.scale(VICTORY_BG,(WIDTH,HEIGHT))
-    except Exception:
-        VICTORY_BG = None
+    # antes do menu só carrega o que o menu usa; o resto começa depois do primeiro frame
+    arranque.ao_primeiro_frame(_precarregar_jogo)
 
     # loop geral do jogo (quando volta pro menu, ele recomeça daqui)
     while True:
@@ -336,16 +338,30 @@ def main():
                 pygame.event.clear()
                 mostrar_tutorial(screen, clock)
 
+        # fases e telas de fim só carregam agora (normalmente já pré-carregadas no menu)
+        from fase1 import Fase1
+        import fase2
+        import fase3
+        PRESA_VIDEO_BG, VICTORY_BG = _carregar_telas_de_fim()
+
         # ---------------- FASE 1 ----------------
-        fase1 = Fase1(screen, font)
+        # (com TRES_GRACAS_REPLAY=arquivo, a partida é gravada pra reproduzir depois)
+        seed = replay.comecar(screen.get_size())
+        fase1 = Fase1(screen, font, seed=seed)
+
+        # enquanto joga a fase 1, a fase 2 já vai lendo os arquivos dela em segundo plano
+        recursos.precarregar(fase2.preload_assets(BASE_DIR))
         result = None
+        sujos = tela.RetangulosSujos()
 
         # loop da fase 1
         while True:
             dt = clock.tick(FPS)/1000
+            perfil.quadro("fase1")
 
-            # eventos globais (fechar / ESC)
+            # eventos globais (fechar / ESC; F3 mostra o perfil)
             for e in pygame.event.get():
+                perfil.tecla(e)
                 if e.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
@@ -353,9 +369,10 @@ def main():
 
             # atualiza e desenha fase 1
             result = fase1.update(dt)
-            screen.fill((20,20,25))
-            fase1.draw()
-            pygame.display.flip()
+            sujos.marcar(*fase1.draw())
+            sujos.marcar(perfil.desenhar(screen))
+            sujos.atualizar()
+            perfil.marcar("flip")
 
             # condições de saída da fase 1
             if result in ("NEXT","LOSE_TIME"):
@@ -367,6 +384,9 @@ def main():
             continue
 
         # ---------------- FASE 2 ----------------
+        # idem pra fase 3 enquanto joga a fase 2
+        recursos.precarregar(fase3.preload_assets(BASE_DIR))
+
         # chama fase2.run e pega o resultado
         try:
             resultado_fase2 = fase2.run(screen, clock, font, BASE_DIR)
@@ -0,0 +1,209 @@
+# navegacao.py
+# Grade de navegação dos guardas (fase 3): a tela dividida em células de 16 px, cada
+# uma "andável" ou não (perto demais de uma parede pro corpo do guarda), e um campo
+# de distâncias até o player dividido por todos os guardas alertados (com dezenas de
+# guardas, uma busca de caminho por guarda a cada passo não dava).
+# Sem isso o guarda alertado ia reto no player, atravessando as paredes da mansão.
+# Com a linha reta livre ele continua indo reto, igual antes.
+
+import math
+import heapq
+from array import array
+
+import visao
+
+CELULA = 16
+FOLGA = 18      # distância que a rota mantém entre o centro do guarda e as paredes (px)
+MARGEM_RETA = 6 # pra ir reto, a linha até o alvo não pode passar a menos disso de uma parede
+PROCURA = 4     # até quantas células em volta procura uma andável (alvo colado na parede)
+ADIANTE = 16    # quantas células campo abaixo o guarda olha pra cortar caminho
+
+_DIAGONAL = math.sqrt(2)
+
+
+class GradeNavegacao:
+    def __init__(self, walls, tamanho, cell=CELULA, folga=FOLGA):
+        # monta a grade a partir das paredes (uma vez por lista de paredes)
+        self.walls = walls
+        self.cell = cell
+        self.cols = (tamanho[0] + cell - 1) // cell
+        self.rows = (tamanho[1] + cell - 1) // cell
+        self.livre = bytearray(b"\x01") * (self.cols * self.rows)
+
+        # cada parede engordada pela folga: as células com o centro dentro dela ficam bloqueadas
+        # (o centro da célula c fica em c*cell + cell/2)
+        meio = cell / 2
+        for w in walls:
+            left, top = w.left - folga, w.top - folga
+            right, bottom = w.right + folga, w.bottom + folga
+            c0 = max(0, math.ceil((left - meio) / cell))
+            c1 = min(self.cols - 1, math.ceil((right - meio) / cell) - 1)
+            r0 = max(0, math.ceil((top - meio) / cell))
+            r1 = min(self.rows - 1, math.ceil((bottom - meio) / cell) - 1)
+            for row in range(r0, r1 + 1):
+                base = row * self.cols
+                for col in range(c0, c1 + 1):
+                    self.livre[base + col] = 0
+
+    # --- células ---
+    def celula(self, x, y):
+        # índice da célula do ponto (-1 fora da tela)
+        col, row = int(x // self.cell), int(y // self.cell)
+        if col < 0 or row < 0 or col >= self.cols or row >= self.rows:
+            return -1
+        return row * self.cols + col
+
+    def centro(self, i):
+        row, col = divmod(i, self.cols)
+        return (col * self.cell + self.cell // 2, row * self.cell + self.cell // 2)
+
+    def andavel_perto(self, i):
+        # a própria célula se for andável, senão a andável mais perto (anéis em volta); -1 se nada
+        if i >= 0 and self.livre[i]:
+            return i
+        if i < 0:
+            return -1
+        row0, col0 = divmod(i, self.cols)
+        for r in range(1, PROCURA + 1):
+            melhor, melhor_d = -1, None
+            for row in range(row0 - r, row0 + r + 1):
+                if row < 0 or row >= self.rows:
+                    continue
+                for col in range(col0 - r, col0 + r + 1):
+                    if col < 0 or col >= self.cols:
+                        continue
+                    if max(abs(row - row0), abs(col - col0)) != r:
+                        continue
+                    j = row * self.cols + col
+                    if self.livre[j]:
+                        d = (row - row0) ** 2 + (col - col0) ** 2
+                        if melhor_d is None or d < melhor_d:
+                            melhor, melhor_d = j, d
+            if melhor >= 0:
+                return melhor
+        return -1
+
+    def vizinhos(self, i):
+        # (célula, custo) andáveis em volta; diagonal só se não "corta" o canto de uma parede
+        cols, livre = self.cols, self.livre
+        row, col = divmod(i, cols)
+        esq = col > 0 and livre[i - 1]
+        dir_ = col < cols - 1 and livre[i + 1]
+        cima = row > 0 and livre[i - cols]
+        baixo = row < self.rows - 1 and livre[i + cols]
+        if esq:
+            yield i - 1, 1.0
+        if dir_:
+            yield i + 1, 1.0
+        if cima:
+            yield i - cols, 1.0
+        if baixo:
+            yield i + cols, 1.0
+        if cima and esq and livre[i - cols - 1]:
+            yield i - cols - 1, _DIAGONAL
+        if cima and dir_ and livre[i - cols + 1]:
+            yield i - cols + 1, _DIAGONAL
+        if baixo and esq and livre[i + cols - 1]:
+            yield i + cols - 1, _DIAGONAL
+        if baixo and dir_ and livre[i + cols + 1]:
+            yield i + cols + 1, _DIAGONAL
+
+    def linha_livre(self, a, b):
+        # dá pra ir reto de a até b? (nenhuma parede no meio, com uma margem pequena)
+        return visao.linha_livre(a, b, self.walls, margin=MARGEM_RETA)
+
+
+class CampoFluxo:
+    # distância (Dijkstra) de cada célula até a célula do player, uma só pra todos os
+    # guardas: cada um só desce pro vizinho mais perto do player, sem busca própria.
+    # O campo só é zerado quando o player troca de célula, e cresce sob demanda: a
+    # busca para quando chega na célula do guarda que perguntou e continua de onde
+    # parou se um guarda mais longe perguntar depois. Pra onde ir de cada célula também
+    # fica guardado até o campo mudar (guardas na mesma célula dividem a conta, desde
+    # que de onde cada um está também dê pra ver o ponto guardado)
+    def __init__(self, grade):
+        self.grade = grade
+        n = grade.cols * grade.rows
+        self._vazio = array("d", [math.inf]) * n
+        self.origem = -1
+        self.dist = array("d", self._vazio)
+        self.fechada = bytearray(n)
+        self.aberta = []
+        self.adiante = {}   # célula do guarda -> ponto pra onde ir (None = o próprio alvo)
+
+    def mirar(self, alvo):
+        # alvo (ponto) do campo; só recomeça se ele foi pra outra célula
+        grade = self.grade
+        origem = grade.andavel_perto(grade.celula(*alvo))
+        if origem == self.origem:
+            return
+        self.origem = origem
+        self.dist = array("d", self._vazio)
+        self.fechada = bytearray(len(self.fechada))
+        self.aberta = []
+        self.adiante = {}
+        if origem >= 0:
+            self.dist[origem] = 0.0
+            self.aberta.append((0.0, origem))
+
+    def distancia(self, i):
+        # distância da célula até o alvo (em células); expande a busca até fechar "i"
+        dist, fechada, aberta = self.dist, self.fechada, self.aberta
+        vizinhos = self.grade.vizinhos
+        while not fechada[i] and aberta:
+            d, j = heapq.heappop(aberta)
+            if fechada[j]:
+                continue
+            fechada[j] = 1
+            for k, passo in vizinhos(j):
+                nd = d + passo
+                if nd < dist[k]:
+                    dist[k] = nd
+                    heapq.heappush(aberta, (nd, k))
+        return dist[i] if fechada[i] else math.inf
+
+    def descer(self, i):
+        # vizinho de "i" mais perto do alvo (-1 se "i" já é o alvo)
+        # (os vizinhos mais perto que "i" já estão fechados: Dijkstra fecha em ordem)
+        melhor, melhor_d = -1, self.dist[i]
+        for j, _ in self.grade.vizinhos(i):
+            if self.fechada[j] and self.dist[j] < melhor_d:
+                melhor, melhor_d = j, self.dist[j]
+        return melhor
+
+    def proximo(self, pos, alvo):
+        # ponto pra onde andar agora: o próprio alvo se der pra ir reto, senão a célula
+        # mais adiante campo abaixo que dá pra ver direto (corta caminho em vez de zigue-zague)
+        grade = self.grade
+        if grade.linha_livre(pos, alvo):
+            return alvo
+        aqui = grade.celula(*pos)
+        if aqui not in self.adiante:
+            self.adiante[aqui] = self._adiante(pos, aqui)
+            ponto = self.adiante[aqui]
+        else:
+            # o ponto guardado foi escolhido de outro lugar da célula: se daqui tem parede
+            # no meio, conta de novo só pra este guarda (sem trocar o guardado)
+            ponto = self.adiante[aqui]
+            ver = grade.centro(self.origem) if ponto is None and self.origem >= 0 else ponto
+            if ver is not None and not grade.linha_livre(pos, ver):
+                ponto = self._adiante(pos, aqui)
+        return alvo if ponto is None else ponto
+
+    def _adiante(self, pos, aqui):
+        grade = self.grade
+        i = grade.andavel_perto(aqui)   # colado numa parede: a andável mais perto
+        if i < 0 or self.distancia(i) == math.inf:
+            return None
+        j = self.descer(i)
+        if j < 0:
+            return None
+        ponto = grade.centro(j)
+        for _ in range(ADIANTE - 1):
+            if j == self.origem:
+                return None      # dá pra ver até a célula do alvo: o resto é colado nele
+            j = self.descer(j)
+            if j < 0 or not grade.linha_livre(pos, grade.centro(j)):
+                break
+            ponto = grade.centro(j)
+        return ponto
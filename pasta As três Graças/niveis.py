@@ -0,0 +1,264 @@
+# niveis.py
+# O mapa de cada fase (paredes, esconderijos, cofre, câmeras, guardas, portas e as
+# áreas de gatilho) fica em niveis/<fase>.json, em vez de escrito dentro da fase.
+# Na primeira vez o JSON é "compilado" pro tamanho da tela: retângulos prontos, a grade
+# de paredes (colisão) e as caixas da linha de visão, pra porta fechada e aberta.
+# Isso vai pra niveis/cache/ e nas próximas vezes sai direto de lá, enquanto o hash
+# do JSON for o mesmo (mudou o JSON, compila de novo sozinho).
+# O fundo pré-desenhado de cada fase também fica no cache (pixels crus), e é refeito
+# se o nível ou algum arquivo usado nele (piso, cofre, e o código que desenha) mudar.
+# TRES_GRACAS_NIVEIS_CACHE=0 ignora o cache (sempre compila, não grava nada).
+
+import os
+import json
+import struct
+import hashlib
+import pygame
+
+import colisao
+
+_PASTA = os.path.dirname(os.path.abspath(__file__))
+PASTA = os.path.join(_PASTA, "niveis")
+CACHE = os.path.join(PASTA, "cache")
+VERSAO = 1
+
+# cache: mágico + versão + sha1 (do JSON ou do fundo) + tamanho do resto
+_CABECALHO = struct.Struct("<4sI20sI")
+_MAGICO_NIVEL = b"TGNV"
+_MAGICO_FUNDO = b"TGFD"
+_MAGICO_EXTRA = b"TGEX"
+
+_USAR_CACHE = os.environ.get("TRES_GRACAS_NIVEIS_CACHE", "1") != "0"
+
+_carregados = {}   # (nome, tamanho) -> Nivel
+
+
+# ----- ESCALA -----
+# os JSON são escritos pra "tamanho" (1024x640); em outra tela tudo escala proporcional
+def _escalar_rect(r, fx, fy):
+    x, y, w, h = r
+    return [int(x * fx), int(y * fy), int(w * fx), int(h * fy)]
+
+
+def _escalar_ponto(p, fx, fy):
+    return [int(p[0] * fx), int(p[1] * fy)]
+
+
+def _escalar(dados, fx, fy):
+    # percorre o JSON: listas de 4 números são retângulos, de 2 são pontos
+    if isinstance(dados, dict):
+        return {k: _escalar(v, fx, fy) for k, v in dados.items()}
+    if isinstance(dados, list):
+        if len(dados) == 4 and all(isinstance(v, (int, float)) for v in dados):
+            return _escalar_rect(dados, fx, fy)
+        if len(dados) == 2 and all(isinstance(v, (int, float)) for v in dados):
+            return _escalar_ponto(dados, fx, fy)
+        return [_escalar(v, fx, fy) for v in dados]
+    return dados
+
+
+# ----- COMPILAR -----
+def _grade(paredes):
+    # grade montada uma vez e guardada em forma de lista (JSON não aceita tupla de chave)
+    g = colisao.GradeParedes([pygame.Rect(p) for p in paredes])
+    return {
+        "cells": [[cx, cy, ids] for (cx, cy), ids in g.cells.items()],
+        "caixas": [list(c) for c in g.caixas],
+    }
+
+
+def _compilar(fonte, tamanho):
+    # JSON do nível -> tudo pronto pro tamanho da tela
+    dados = json.loads(fonte.decode("utf-8"))
+    w0, h0 = dados.pop("tamanho", tamanho)
+    dados = _escalar(dados, tamanho[0] / w0, tamanho[1] / h0)
+    paredes = dados.pop("paredes")
+    portas = dados.get("portas", {})
+    fechada = [portas[p] if isinstance(p, str) else p for p in paredes]
+    aberta = [p for p in paredes if not isinstance(p, str)]
+    return {
+        "paredes": paredes,
+        "dados": dados,
+        "grades": {"fechada": _grade(fechada), "aberta": _grade(aberta)},
+    }
+
+
+def _caminho_cache(nome, tamanho, tipo):
+    return os.path.join(CACHE, f"{nome}-{tamanho[0]}x{tamanho[1]}.{tipo}")
+
+
+def _ler_cache(path, magico, chave):
+    # o resto do arquivo, se for deste jogo/versão e da mesma chave; senão None
+    try:
+        with open(path, "rb") as f:
+            cab = f.read(_CABECALHO.size)
+            m, versao, ch, n = _CABECALHO.unpack(cab)
+            if m != magico or versao != VERSAO or ch != chave:
+                return None
+            resto = f.read(n)
+            return resto if len(resto) == n else None
+    except (OSError, struct.error):
+        return None
+
+
+def _gravar_cache(path, magico, chave, dados):
+    # grava num temporário e troca no fim; se a pasta não der pra escrever, só não guarda
+    # (um temporário por processo: várias simulações em paralelo podem gravar ao mesmo tempo)
+    try:
+        os.makedirs(CACHE, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_CABECALHO.pack(magico, VERSAO, chave, len(dados)))
+            f.write(dados)
+        os.replace(tmp, path)
+    except OSError as e:
+        print("niveis: não deu pra salvar o cache:", e)
+
+
+def carregar(nome, tamanho=(1024, 640)):
+    # Nivel pronto (do cache se o JSON não mudou); o mesmo objeto se pedir de novo
+    tamanho = tuple(tamanho)
+    nivel = _carregados.get((nome, tamanho))
+    if nivel is not None:
+        return nivel
+
+    with open(os.path.join(PASTA, nome + ".json"), "rb") as f:
+        fonte = f.read()
+    chave = hashlib.sha1(fonte + repr((tamanho, colisao.CELL_SIZE, colisao.CELL_PAD,
+                                       colisao.LOS_MARGIN)).encode("utf-8")).digest()
+
+    path = _caminho_cache(nome, tamanho, "bin")
+    compilado = None
+    if _USAR_CACHE:
+        bruto = _ler_cache(path, _MAGICO_NIVEL, chave)
+        if bruto is not None:
+            try:
+                compilado = json.loads(bruto.decode("utf-8"))
+            except ValueError:
+                compilado = None
+    if compilado is None:
+        compilado = _compilar(fonte, tamanho)
+        if _USAR_CACHE:
+            _gravar_cache(path, _MAGICO_NIVEL, chave,
+                          json.dumps(compilado, separators=(",", ":")).encode("utf-8"))
+
+    nivel = Nivel(nome, tamanho, chave, compilado)
+    _carregados[(nome, tamanho)] = nivel
+    return nivel
+
+
+# ----- NÍVEL -----
+class Nivel:
+    def __init__(self, nome, tamanho, chave, compilado):
+        self.nome = nome
+        self.tamanho = tamanho
+        self.chave = chave
+        self.dados = compilado["dados"]
+        self._paredes = compilado["paredes"]
+        self._grades = compilado["grades"]
+        self._portas = self.dados.get("portas", {})
+        self._extras = {}   # (tipo, chave) -> o que o em_cache já montou/leu
+
+    # --- dados (cada chamada devolve Rect novo: a fase pode mexer à vontade) ---
+    def rect(self, chave):
+        return pygame.Rect(self.dados[chave])
+
+    def rects(self, chave):
+        return [pygame.Rect(r) for r in self.dados[chave]]
+
+    def ponto(self, chave):
+        return tuple(self.dados[chave])
+
+    def gatilho(self, nome):
+        # área de gatilho (perto do cofre, da porta, da saída, a "câmera"...)
+        return pygame.Rect(self.dados["gatilhos"][nome])
+
+    def porta(self, nome):
+        return pygame.Rect(self._portas[nome])
+
+    # --- paredes ---
+    def paredes(self, **portas):
+        # lista de paredes; cada porta entra no lugar dela na lista (fechada por padrão)
+        # porta=Rect troca o retângulo dela (animação), porta=None tira (aberta)
+        out = []
+        for p in self._paredes:
+            if isinstance(p, str):
+                r = portas.get(p, self._portas[p])
+                if r is not None:
+                    out.append(pygame.Rect(r))
+            else:
+                out.append(pygame.Rect(p))
+        return out
+
+    def grade(self, **portas):
+        # GradeParedes das paredes; com todas as portas fechadas (padrão) ou todas
+        # abertas sai pronta do cache, no meio da animação é montada na hora
+        if all(v is None for v in portas.values()) and len(portas) == len(self._portas) and portas:
+            pronta = self._grades["aberta"]
+        elif not portas:
+            pronta = self._grades["fechada"]
+        else:
+            return colisao.GradeParedes(self.paredes(**portas))
+        cells = {(cx, cy): ids for cx, cy, ids in pronta["cells"]}
+        return colisao.GradeParedes(self.paredes(**portas), cells=cells,
+                                    caixas=[tuple(c) for c in pronta["caixas"]])
+
+    # --- outras coisas caras montadas a partir do nível ---
+    def em_cache(self, tipo, params, montar, para_bytes, de_bytes):
+        # ex: os mapas de visibilidade das câmeras; fica no cache junto com o nível e é
+        # refeito se o nível ou os "params" (o que mais a montagem usa) mudarem
+        chave = hashlib.sha1(self.chave + repr(params).encode("utf-8")).digest()
+        obj = self._extras.get((tipo, chave))
+        if obj is not None:
+            return obj
+        path = _caminho_cache(self.nome, self.tamanho, tipo)
+        if _USAR_CACHE:
+            bruto = _ler_cache(path, _MAGICO_EXTRA, chave)
+            if bruto is not None:
+                try:
+                    obj = de_bytes(bruto)
+                except (ValueError, struct.error):
+                    obj = None
+        if obj is None:
+            obj = montar()
+            if _USAR_CACHE:
+                _gravar_cache(path, _MAGICO_EXTRA, chave, para_bytes(obj))
+        self._extras[(tipo, chave)] = obj
+        return obj
+
+    # --- fundo pré-desenhado ---
+    def fundo(self, montar, arquivos=(), extra=""):
+        # Surface do fundo estático: do cache se o nível, os arquivos usados (tamanho +
+        # data de modificação) e o "extra" (ex: texto/fonte desenhados nele) forem os mesmos;
+        # senão chama montar() e guarda os pixels pra próxima vez
+        # (ponha em "arquivos" também o .py que desenha: cores e desenho ficam no código)
+        soma = hashlib.sha1(self.chave + extra.encode("utf-8"))
+        for path in arquivos:
+            try:
+                st = os.stat(path)
+                soma.update(f"{os.path.relpath(path, _PASTA)}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+            except OSError:
+                soma.update(f"{path}|-".encode("utf-8"))
+        chave = soma.digest()
+
+        path = _caminho_cache(self.nome, self.tamanho, "fundo")
+        w, h = self.tamanho
+        if _USAR_CACHE:
+            bruto = _ler_cache(path, _MAGICO_FUNDO, chave)
+            if bruto is not None and len(bruto) == w * h * 3:
+                try:
+                    surf = pygame.image.frombuffer(bruto, (w, h), "RGB")
+                    return surf.convert() if pygame.display.get_surface() else surf.copy()
+                except pygame.error:
+                    pass
+
+        surf = montar()
+        if _USAR_CACHE and surf.get_size() == (w, h):
+            tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+            _gravar_cache(path, _MAGICO_FUNDO, chave, tobytes(surf, "RGB"))
+        return surf
+
+
+def limpar():
+    # esquece os níveis já carregados (o cache em disco continua)
+    _carregados.clear()
@@ -0,0 +1,190 @@
+# perfil.py
+# Quanto tempo cada parte do frame leva, medido dentro do próprio jogo
+# (sem cProfile, que deixa tudo mais lento e não separa frame por frame).
+# F3 mostra/esconde um painel com FPS, tempo do frame e o tempo de cada parte.
+# TRES_GRACAS_PERFIL=1 já começa com o painel ligado; com um caminho
+# (ex: perfil.csv ou perfil.json) também grava cada frame nele.
+#
+# Nos loops das fases:
+#   perfil.quadro("fase2")     começo de cada frame (fecha o anterior)
+#   perfil.marcar("piso")      o tempo desde a marca anterior vai pra "piso" (igual ao arranque)
+#   with perfil.secao("visao") pedaço dentro da lógica (player, câmeras, guardas, visão)
+
+import os
+import csv
+import json
+import time
+import atexit
+from collections import deque
+import pygame
+
+import recursos
+
+SAIDA = os.environ.get("TRES_GRACAS_PERFIL", "")
+TECLA = pygame.K_F3
+
+# ordem no painel e nas colunas do CSV
+# (player/camera/guarda/visao são pedaços de dentro da "logica")
+SECOES = ("entrada", "logica", "player", "camera", "guarda", "visao",
+          "piso", "cones", "sprites", "hud", "flip")
+_DENTRO_DA_LOGICA = ("player", "camera", "guarda", "visao")
+
+JANELA = 60            # frames na média do painel
+ATUALIZA_PAINEL = 15   # redesenha o texto do painel a cada tantos frames
+
+visivel = SAIDA != ""
+_gravar = SAIDA not in ("", "1")
+
+_inicio = None         # começo do frame atual
+_ultimo = None         # última marca (pro marcar)
+_atual = {}            # seção -> segundos no frame atual
+_fase = ""
+_historico = deque(maxlen=JANELA)   # (frame_ms, {seção: ms})
+_frames = 0
+
+_painel = None         # Surface do painel (refeita de vez em quando)
+_painel_rect = None    # onde o painel foi desenhado por último
+
+_csv = None            # (arquivo, writer) quando grava em CSV
+_linhas = []           # quando grava em JSON (salvo no fim)
+
+
+def ligado():
+    return visivel or _gravar
+
+
+class _Secao:
+    __slots__ = ("nome", "t0")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _atual[self.nome] = _atual.get(self.nome, 0.0) + time.perf_counter() - self.t0
+
+
+class _Nada:
+    # desligado: "with perfil.secao(...)" não mede nada
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NADA = _Nada()
+
+
+def secao(nome):
+    # (chamado em todo passo da lógica, então o caminho desligado é o mais curto possível)
+    return _Secao(nome) if (visivel or _gravar) else _NADA
+
+
+def marcar(nome):
+    # fecha o pedaço atual: o tempo desde a marca anterior vai pra "nome"
+    global _ultimo
+    if _ultimo is None or not ligado():
+        return
+    agora = time.perf_counter()
+    _atual[nome] = _atual.get(nome, 0.0) + agora - _ultimo
+    _ultimo = agora
+
+
+def quadro(fase=""):
+    # começo de um frame novo: guarda o anterior (no histórico e no arquivo)
+    global _inicio, _ultimo, _atual, _fase, _frames
+    agora = time.perf_counter()
+    if _inicio is not None and ligado():
+        ms = {nome: s * 1000.0 for nome, s in _atual.items()}
+        frame_ms = (agora - _inicio) * 1000.0
+        _historico.append((frame_ms, ms))
+        _frames += 1
+        if _gravar:
+            _salvar_linha(_fase, frame_ms, ms)
+    _inicio = _ultimo = agora
+    _atual = {}
+    _fase = fase
+
+
+def tecla(event):
+    # F3 liga/desliga o painel; True se a tecla era essa
+    global visivel
+    if event.type == pygame.KEYDOWN and event.key == TECLA:
+        visivel = not visivel
+        _historico.clear()
+        return True
+    return False
+
+
+# ----- PAINEL -----
+def _montar_painel():
+    font = recursos.fonte("consolas", 14)
+    n = len(_historico)
+    frame_ms = sum(f for f, _ in _historico) / n
+    linhas = [f"{1000.0 / frame_ms if frame_ms else 0:5.0f} fps  {frame_ms:6.2f} ms"]
+    for nome in SECOES:
+        media = sum(ms.get(nome, 0.0) for _, ms in _historico) / n
+        if media <= 0.0:
+            continue
+        recuo = "  " if nome in _DENTRO_DA_LOGICA else ""
+        linhas.append(f"{recuo}{nome:{10 - len(recuo)}s}{media:7.3f} ms")
+    textos = [font.render(t, True, (235, 235, 220)) for t in linhas]
+    w = max(t.get_width() for t in textos) + 12
+    h = sum(t.get_height() for t in textos) + 10
+    surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    surf.fill((0, 0, 0, 170))
+    y = 5
+    for t in textos:
+        surf.blit(t, (6, y))
+        y += t.get_height()
+    return surf
+
+
+def desenhar(screen):
+    # desenha o painel (canto direito, embaixo da caixa do timer)
+    # devolve a área pra marcar como suja; depois de esconder, devolve a última área
+    # uma vez (pra o que estava embaixo voltar pro display)
+    global _painel, _painel_rect
+    if not visivel or not _historico:
+        rect, _painel_rect = _painel_rect, None
+        _painel = None
+        return rect
+    if _painel is None or _frames % ATUALIZA_PAINEL == 0:
+        _painel = _montar_painel()
+    x = screen.get_width() - _painel.get_width() - 8
+    rect = screen.blit(_painel, (x, 140))
+    area = rect.union(_painel_rect) if _painel_rect else rect
+    _painel_rect = rect
+    return area
+
+
+# ----- ARQUIVO -----
+def _salvar_linha(fase, frame_ms, ms):
+    global _csv
+    linha = [_frames, fase, round(frame_ms, 4)] + [round(ms.get(nome, 0.0), 4) for nome in SECOES]
+    if SAIDA.lower().endswith(".csv"):
+        if _csv is None:
+            f = open(SAIDA, "w", newline="", encoding="utf-8")
+            _csv = (f, csv.writer(f))
+            _csv[1].writerow(["frame", "fase", "frame_ms"] + list(SECOES))
+        _csv[1].writerow(linha)
+    else:
+        _linhas.append(dict(zip(["frame", "fase", "frame_ms"] + list(SECOES), linha)))
+
+
+def _fechar():
+    if _csv is not None:
+        _csv[0].close()
+    if _linhas:
+        try:
+            with open(SAIDA, "w", encoding="utf-8") as f:
+                json.dump(_linhas, f)
+        except OSError as e:
+            print("perfil: não deu pra salvar:", e)
+
+
+if _gravar:
+    atexit.register(_fechar)
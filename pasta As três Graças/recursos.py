@@ -0,0 +1,505 @@
+# recursos.py
+# Cache global de imagens: cada PNG é lido, recortado e convertido uma vez só
+# por processo, e as três fases (e o main) pedem tudo por aqui.
+# Também guarda as fontes (SysFont) e os textos renderizados que quase não mudam,
+# os sons, e pode ir lendo os arquivos da próxima fase em segundo plano (precarregar).
+# Se existir o pacote assado (assets/pacote.bin, feito pelo bake.py), as imagens
+# saem dele já recortadas/escaladas, direto dos pixels crus, sem decodificar PNG.
+
+import io
+import os
+import json
+import mmap
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+# chave -> Surface pronta (a chave é o caminho + as transformações pedidas)
+_cache = {}
+
+# contadores pra conferir se o cache está funcionando
+_stats = {"hits": 0, "misses": 0}
+
+# (nome, tamanho, bold) -> Font
+_fontes = {}
+
+# (font, texto, cor, antialias) -> Surface renderizada (LRU, pra não crescer pra sempre)
+_textos = OrderedDict()
+TEXT_CACHE_MAX = 256
+
+# caminho -> Sound / bytes da música (lida inteira, o mixer.music toca da memória)
+_sons = {}
+_musicas = {}
+
+# (tipo, caminho) -> Future do pré-carregamento (lendo/decodificando numa thread)
+_pendentes = {}
+_pool = None
+PRELOAD_WORKERS = 2
+
+# id(surf) -> chave de onde a Surface saiu (imagem), pra chave do escalado/piso
+# não depender de id() e dar pra guardar no pacote
+_origens = {}
+
+# ----- PACOTE -----
+# arquivo: "TGPK" + versão + tamanho do índice, o índice em JSON e depois os pixels
+# crus de cada imagem (RGB/RGBA), cada bloco alinhado em 16 bytes
+_PASTA = os.path.dirname(os.path.abspath(__file__))
+PACOTE = os.path.join(_PASTA, "assets", "pacote.bin")
+PACOTE_MAGICO = b"TGPK"
+PACOTE_VERSAO = 1
+_CABECALHO = struct.Struct("<4sII")
+
+_pacote = None        # {"buf", "base", "entradas", "arquivos"} / False se não tem (None = ainda não abriu)
+_arquivos_ok = {}     # caminho relativo -> o PNG ainda é o mesmo que foi assado?
+_pedidos = None       # durante o bake: chaves que o jogo pediu de fato (não as intermediárias)
+
+
+def trim_sprite(surf):
+    # recorta a área transparente em volta do sprite (ajuda no scale/encaixe)
+    try:
+        mask = pygame.mask.from_surface(surf)
+        rects = mask.get_bounding_rects()
+        if not rects:
+            return surf
+        r = rects[0].copy()
+        for rr in rects[1:]:
+            r.union_ip(rr)
+        return surf.subsurface(r).copy()
+    except Exception:
+        return surf
+
+
+def _chave(path, alpha, trim, size, smooth):
+    # normaliza o caminho pra "assets/x.png" e "/abs/assets/x.png" darem a mesma chave
+    return (os.path.abspath(path), bool(alpha), bool(trim), tuple(size) if size else None, bool(smooth))
+
+
+def imagem(path, alpha=True, trim=False, size=None, smooth=True):
+    # devolve a imagem já carregada/convertida (e recortada/escalada se pedir)
+    # se o arquivo não existir ou der erro, a exceção sobe (quem chama já trata)
+    if _pedidos is not None:
+        _pedidos.add(_chave(path, alpha, trim, size, smooth))
+    return _imagem(path, alpha, trim, size, smooth)
+
+
+def _imagem(path, alpha, trim, size, smooth):
+    key = _chave(path, alpha, trim, size, smooth)
+    surf = _cache.get(key)
+    if surf is not None:
+        _stats["hits"] += 1
+        return surf
+    _stats["misses"] += 1
+
+    surf = _do_pacote(key)
+    if surf is not None:
+        pass
+    elif size:
+        # escala a partir da versão sem escala (que também fica no cache)
+        base = _imagem(path, alpha, trim, None, True)
+        if smooth:
+            try:
+                surf = pygame.transform.smoothscale(base, tuple(size))
+            except Exception:
+                surf = pygame.transform.scale(base, tuple(size))
+        else:
+            surf = pygame.transform.scale(base, tuple(size))
+    elif trim:
+        surf = trim_sprite(_imagem(path, alpha, False, None, True))
+    else:
+        # se a próxima fase já mandou pré-carregar, o arquivo já está decodificado
+        img = _pendente("imagem", path)
+        if img is None:
+            img = pygame.image.load(path)
+        surf = img.convert_alpha() if alpha else img.convert()
+
+    _cache[key] = surf
+    _origens[id(surf)] = key
+    return surf
+
+
+def escalado(surf, size, flip=False):
+    # versão escalada (e espelhada, se pedir) de uma Surface, feita uma vez só
+    # a chave usa a chave da imagem original (ou id(surf), se ela não veio do cache),
+    # e a original fica guardada junto pra o id não ser reaproveitado
+    size = (max(1, int(size[0])), max(1, int(size[1])))
+    key = ("escala", _origens.get(id(surf), id(surf)), size, bool(flip))
+    item = _cache.get(key)
+    if item is not None:
+        _stats["hits"] += 1
+        return item[1]
+    _stats["misses"] += 1
+
+    out = _do_pacote(key)
+    if out is not None:
+        pass
+    elif flip:
+        out = pygame.transform.flip(escalado(surf, size), True, False)
+    else:
+        try:
+            out = pygame.transform.smoothscale(surf, size)
+        except Exception:
+            out = pygame.transform.scale(surf, size)
+
+    _cache[key] = (surf, out)
+    return out
+
+
+def atlas(sprites, scale):
+    # pré-escala um conjunto de sprites com a mesma escala proporcional
+    # devolve {sprite_original: (escalado, escalado_espelhado)}, aí o draw só faz blit
+    tabela = {}
+    for s in sprites:
+        if s is None or s in tabela:
+            continue
+        w, h = s.get_size()
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        tabela[s] = (escalado(s, size), escalado(s, size, flip=True))
+    return tabela
+
+
+def piso(size, tile, bg_color, overlay_alpha=100):
+    # piso ladrilhado + overlay escuro já juntos numa Surface opaca (feito uma vez só)
+    # sem tile, vira só a cor de fundo
+    size = tuple(size)
+    origem = _origens.get(id(tile), id(tile)) if tile else None
+    key = ("piso", size, origem, tuple(bg_color), overlay_alpha)
+    item = _cache.get(key)
+    if item is not None:
+        _stats["hits"] += 1
+        return item[1]
+    _stats["misses"] += 1
+
+    surf = _do_pacote(key)
+    if surf is not None:
+        pass
+    elif tile:
+        surf = pygame.Surface(size).convert()
+        surf.fill(bg_color)
+        tw, th = tile.get_width(), tile.get_height()
+        for y in range(0, size[1], th):
+            for x in range(0, size[0], tw):
+                surf.blit(tile, (x, y))
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, overlay_alpha))
+        surf.blit(overlay, (0, 0))
+    else:
+        surf = pygame.Surface(size).convert()
+        surf.fill(bg_color)
+
+    _cache[key] = (tile, surf)
+    return surf
+
+
+def fundo(base, walls, wall_color):
+    # cópia do piso com as paredes (estáticas) já desenhadas: vira um blit só por frame
+    surf = base.copy()
+    for w in walls:
+        pygame.draw.rect(surf, wall_color, w)
+    return surf
+
+
+def fonte(name, size, bold=False):
+    # SysFont é caro (procura a fonte no sistema), então cria só uma vez por combinação
+    key = (name, size, bool(bold))
+    f = _fontes.get(key)
+    if f is None:
+        f = pygame.font.SysFont(name, size, bold=bold)
+        _fontes[key] = f
+    return f
+
+
+def texto(font, txt, color, antialias=True):
+    # texto renderizado (HUD, dicas, "COFRE"...) só é desenhado de novo se mudar
+    key = (font, txt, tuple(color), antialias)
+    surf = _textos.get(key)
+    if surf is not None:
+        _textos.move_to_end(key)
+        return surf
+    surf = font.render(txt, antialias, color)
+    _textos[key] = surf
+    if len(_textos) > TEXT_CACHE_MAX:
+        _textos.popitem(last=False)
+    return surf
+
+
+# ----- SONS -----
+def som(path):
+    # Sound carregado uma vez só (as fases que usam o mesmo arquivo dividem o objeto)
+    # se o arquivo não existir ou o mixer estiver desligado, a exceção sobe
+    key = os.path.abspath(path)
+    s = _sons.get(key)
+    if s is None:
+        s = _pendente("som", path)
+        if s is None:
+            s = pygame.mixer.Sound(path)
+        _sons[key] = s
+    return s
+
+
+def musica(path):
+    # o que passar pro pygame.mixer.music.load: os bytes em memória (se já foram lidos
+    # em segundo plano) ou o próprio caminho
+    key = os.path.abspath(path)
+    dados = _musicas.get(key)
+    if dados is None:
+        dados = _pendente("musica", path)
+        if dados is None:
+            return path
+        _musicas[key] = dados
+    return io.BytesIO(dados)
+
+
+# ----- PRÉ-CARREGAMENTO EM SEGUNDO PLANO -----
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=PRELOAD_WORKERS, thread_name_prefix="recursos")
+    return _pool
+
+
+def _ler(tipo, path):
+    # roda numa thread: só lê e decodifica (não mexe no cache nem no display;
+    # o convert() fica pra thread principal, quando a fase pedir a imagem)
+    if tipo == "imagem":
+        return pygame.image.load(path)
+    if tipo == "som":
+        return pygame.mixer.Sound(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _ja_tem(tipo, path):
+    if tipo == "imagem":
+        # o que está no pacote não precisa ser lido do PNG
+        return (any(_chave(path, a, False, None, True) in _cache for a in (True, False))
+                or _no_pacote(path))
+    if tipo == "som":
+        return path in _sons
+    return path in _musicas
+
+
+def precarregar(itens):
+    # começa a ler os arquivos da próxima fase enquanto a atual está rodando
+    # itens: [(tipo, caminho)] com tipo "imagem", "som" ou "musica"
+    # quem pedir depois (imagem/som/musica) pega o resultado pronto
+    for tipo, path in itens:
+        path = os.path.abspath(path)
+        key = (tipo, path)
+        if key in _pendentes or _ja_tem(tipo, path) or not os.path.exists(path):
+            continue
+        if tipo == "som" and not pygame.mixer.get_init():
+            continue
+        _pendentes[key] = _executor().submit(_ler, tipo, path)
+
+
+def _pendente(tipo, path):
+    # resultado do pré-carregamento (espera terminar se ainda estiver lendo)
+    # None se não foi pré-carregado ou se deu erro (aí quem chamou carrega do jeito normal)
+    fut = _pendentes.pop((tipo, os.path.abspath(path)), None)
+    if fut is None:
+        return None
+    try:
+        return fut.result()
+    except Exception:
+        return None
+
+
+def pngs(pasta):
+    # todas as imagens de uma pasta (pra montar as listas de pré-carregamento)
+    try:
+        return [("imagem", os.path.join(pasta, n)) for n in sorted(os.listdir(pasta)) if n.lower().endswith(".png")]
+    except OSError:
+        return []
+
+
+def precarregando():
+    # quantos arquivos ainda estão sendo lidos em segundo plano
+    return sum(1 for f in _pendentes.values() if not f.done())
+
+
+# ----- PACOTE ASSADO -----
+def _relativo(path):
+    return os.path.relpath(path, _PASTA).replace(os.sep, "/")
+
+
+def _arquivo_da_chave(key):
+    # PNG de onde a imagem saiu (None = não veio de arquivo nenhum)
+    while isinstance(key, tuple) and key[0] in ("escala", "piso"):
+        key = key[1] if key[0] == "escala" else key[2]
+    return key[0] if isinstance(key, tuple) else None
+
+
+def _nome(key):
+    # chave em texto, igual entre execuções e máquinas (caminho relativo à pasta do jogo)
+    # None se depender de id() (Surface que não saiu do cache)
+    if key[0] == "escala":
+        base = _nome(key[1]) if isinstance(key[1], tuple) else None
+        if base is None:
+            return None
+        return f"escala|{key[2][0]}x{key[2][1]}|{int(key[3])}|{base}"
+    if key[0] == "piso":
+        base = "-" if key[2] is None else (_nome(key[2]) if isinstance(key[2], tuple) else None)
+        if base is None:
+            return None
+        cor = ",".join(str(c) for c in key[3])
+        return f"piso|{key[1][0]}x{key[1][1]}|{cor}|{key[4]}|{base}"
+    path, alpha, trim, size, smooth = key
+    tam = f"{size[0]}x{size[1]}" if size else "-"
+    return f"imagem|{int(alpha)}|{int(trim)}|{tam}|{int(smooth)}|{_relativo(path)}"
+
+
+def _alinhar(n):
+    return (n + 15) & ~15
+
+
+def _abrir_pacote():
+    # abre o pacote uma vez só (memory-map: o SO só lê do disco as páginas que forem usadas)
+    global _pacote
+    if _pacote is not None:
+        return _pacote
+    _pacote = False
+    if os.environ.get("TRES_GRACAS_PACOTE", "1") == "0" or not os.path.exists(PACOTE):
+        return _pacote
+    try:
+        with open(PACOTE, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, versao, n = _CABECALHO.unpack_from(mm, 0)
+        if magico != PACOTE_MAGICO or versao != PACOTE_VERSAO:
+            raise ValueError("versão diferente, rode o bake.py de novo")
+        indice = json.loads(mm[_CABECALHO.size:_CABECALHO.size + n].decode("utf-8"))
+        _pacote = {
+            "buf": memoryview(mm),
+            "base": _alinhar(_CABECALHO.size + n),
+            "entradas": indice["entradas"],
+            "arquivos": indice["arquivos"],
+        }
+    except Exception as e:
+        print("recursos: pacote ignorado:", e)
+        _pacote = False
+    return _pacote
+
+
+def _arquivo_ok(rel):
+    # o PNG não mudou desde o bake? (tamanho + data de modificação, conferido uma vez por arquivo)
+    ok = _arquivos_ok.get(rel)
+    if ok is None:
+        try:
+            st = os.stat(os.path.join(_PASTA, rel))
+            ok = [st.st_size, st.st_mtime_ns] == _pacote["arquivos"].get(rel)
+        except OSError:
+            ok = False
+        _arquivos_ok[rel] = ok
+    return ok
+
+
+def _no_pacote(path):
+    pac = _abrir_pacote()
+    if not pac:
+        return False
+    rel = _relativo(os.path.abspath(path))
+    return rel in pac["arquivos"] and _arquivo_ok(rel)
+
+
+def _do_pacote(key):
+    # monta a Surface direto dos pixels do pacote (frombuffer não copia nada)
+    # None se não tem pacote, se essa versão não foi assada ou se o PNG mudou depois
+    pac = _abrir_pacote()
+    if not pac:
+        return None
+    nome = _nome(key)
+    ent = pac["entradas"].get(nome) if nome else None
+    if ent is None or (ent["arquivo"] and not _arquivo_ok(ent["arquivo"])):
+        return None
+    w, h, fmt = ent["w"], ent["h"], ent["fmt"]
+    inicio = pac["base"] + ent["off"]
+    try:
+        surf = pygame.image.frombuffer(pac["buf"][inicio:inicio + w * h * len(fmt)], (w, h), fmt)
+        # as que só servem de origem pro escalado ficam no pacote mesmo (nem são lidas do disco);
+        # o resto é convertido pro formato da tela, igual ao que vem do PNG
+        if ent["fonte"] or pygame.display.get_surface() is None:
+            return surf
+        return surf.convert_alpha() if fmt == "RGBA" else surf.convert()
+    except Exception:
+        return None
+
+
+def preparar_pacote():
+    # usado pelo bake.py: começa do zero, sem ler o pacote antigo, e anota o que o jogo pede
+    global _pacote, _pedidos
+    limpar()
+    _pacote = False
+    _pedidos = set()
+
+
+def gravar_pacote(destino=PACOTE):
+    # escreve no pacote as versões finais que estão no cache (recortadas/escaladas do jeito
+    # que o jogo pediu); as intermediárias (PNG inteiro antes de recortar/escalar) ficam de fora
+    fontes = set()
+    for key in _cache:
+        if key[0] == "escala" and isinstance(key[1], tuple):
+            fontes.add(key[1])
+        elif key[0] == "piso" and isinstance(key[2], tuple):
+            fontes.add(key[2])
+
+    itens = []
+    arquivos = {}
+    for key, item in _cache.items():
+        if key[0] in ("escala", "piso"):
+            surf = item[1]
+        elif _pedidos is None or key in _pedidos:
+            surf = item
+        else:
+            continue
+        nome = _nome(key)
+        if nome is None:
+            continue
+        path = _arquivo_da_chave(key)
+        rel = _relativo(path) if path else None
+        if rel and rel not in arquivos:
+            st = os.stat(path)
+            arquivos[rel] = [st.st_size, st.st_mtime_ns]
+        fmt = "RGBA" if surf.get_flags() & pygame.SRCALPHA else "RGB"
+        itens.append((nome, surf, fmt, rel, key in fontes))
+
+    entradas = {}
+    off = 0
+    for nome, surf, fmt, rel, fonte in itens:
+        w, h = surf.get_size()
+        entradas[nome] = {"off": off, "w": w, "h": h, "fmt": fmt, "arquivo": rel, "fonte": fonte}
+        off += _alinhar(w * h * len(fmt))
+    indice = json.dumps({"entradas": entradas, "arquivos": arquivos}, separators=(",", ":")).encode("utf-8")
+
+    # grava num temporário e troca no fim (um bake interrompido não estraga o pacote que já existe)
+    tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    tmp = destino + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECALHO.pack(PACOTE_MAGICO, PACOTE_VERSAO, len(indice)))
+        f.write(indice)
+        f.write(b"\0" * (_alinhar(f.tell()) - f.tell()))
+        for nome, surf, fmt, rel, fonte in itens:
+            dados = tobytes(surf, fmt)
+            f.write(dados)
+            f.write(b"\0" * (_alinhar(len(dados)) - len(dados)))
+    os.replace(tmp, destino)
+    return {"imagens": len(entradas), "bytes": os.path.getsize(destino)}
+
+
+def stats():
+    # cópia dos contadores + quantas imagens estão guardadas
+    return {"hits": _stats["hits"], "misses": _stats["misses"], "entries": len(_cache)}
+
+
+def limpar():
+    # esvazia o cache (ex: se trocar o modo de vídeo e precisar reconverter)
+    _cache.clear()
+    _origens.clear()
+    _arquivos_ok.clear()
+    _textos.clear()
+    _sons.clear()
+    _musicas.clear()
+    for fut in _pendentes.values():
+        fut.cancel()
+    _pendentes.clear()
+    _stats["hits"] = 0
+    _stats["misses"] = 0
@@ -0,0 +1,179 @@
+# replay.py
+# Grava uma partida inteira (fase1 -> fase3) pra reproduzir depois exatamente igual:
+# a seed da Fase1 (esconderijo do papel e senha) + a Entrada de cada passo fixo,
+# guardada como máscara de bits e comprimida em sequências ([máscara, quantos passos]).
+# A reprodução roda o mesmo step das fases, sem janela e sem esperar o relógio,
+# e mede cada passo (serve pra achar de novo um pico de lentidão ou um bug relatado,
+# e como carga de benchmark).
+#
+# gravar:     TRES_GRACAS_REPLAY=partida.json python main.py
+# reproduzir: python replay.py partida.json [--vezes 3] [--saida tempos.json]
+
+import os
+import sys
+import json
+import time
+import atexit
+import random
+import argparse
+
+import entrada
+import tempo
+
+ARQUIVO = os.environ.get("TRES_GRACAS_REPLAY", "")
+VERSAO = 1
+
+_partida = None      # partida sendo gravada agora (None = não está gravando)
+_salvar_no_fim = False
+
+
+# ----- GRAVAÇÃO -----
+def comecar(tela=(1024, 640)):
+    # nova partida (o main chama no START); devolve a seed pra Fase1
+    # (None se não está gravando: aí a Fase1 sorteia do jeito de sempre)
+    global _partida, _salvar_no_fim
+    if not ARQUIVO:
+        return None
+    seed = random.randrange(2 ** 31)
+    _partida = {"versao": VERSAO, "seed": seed, "hz": tempo.SIM_HZ, "tela": list(tela), "fases": []}
+    if not _salvar_no_fim:
+        # ESC/fechar a janela sai com sys.exit() de dentro das fases: salva mesmo assim
+        atexit.register(salvar)
+        _salvar_no_fim = True
+    return seed
+
+
+def anotar(fase, inputs):
+    # chamado antes de cada passo fixo com a Entrada que vai pro step
+    if _partida is None:
+        return
+    fases = _partida["fases"]
+    if not fases or fases[-1]["fase"] != fase or fases[-1]["resultado"] is not None:
+        fases.append({"fase": fase, "resultado": None, "passos": []})
+    passos = fases[-1]["passos"]
+    m = inputs.mascara()
+    if passos and passos[-1][0] == m:
+        passos[-1][1] += 1
+    else:
+        passos.append([m, 1])
+
+
+def fim(fase, resultado):
+    # a fase acabou: guarda o resultado (pra conferir na reprodução) e salva o arquivo
+    if _partida is None or not _partida["fases"] or _partida["fases"][-1]["fase"] != fase:
+        return
+    _partida["fases"][-1]["resultado"] = resultado
+    salvar()
+
+
+def salvar(path=None):
+    path = path or ARQUIVO
+    if _partida is None or not path:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(_partida, f, separators=(",", ":"))
+    except OSError as e:
+        print("replay: não deu pra salvar:", e)
+
+
+# ----- REPRODUÇÃO -----
+def carregar(path):
+    with open(path, encoding="utf-8") as f:
+        partida = json.load(f)
+    if partida.get("versao") != VERSAO:
+        raise ValueError(f"replay de outra versão ({partida.get('versao')})")
+    return partida
+
+
+def _novo_estado(fase, partida):
+    # o mesmo estado inicial que a fase tinha na partida gravada
+    if fase == "fase1":
+        import fase1
+        return fase1.novo_estado(tuple(partida["tela"]), seed=partida["seed"])
+    if fase == "fase2":
+        import fase2
+        return fase2.Estado(tuple(partida["tela"]))
+    import fase3
+    return fase3.Estado()
+
+
+def reproduzir(partida):
+    # roda cada fase gravada com as mesmas entradas, passo a passo, o mais rápido possível
+    # devolve [{"fase", "esperado", "obtido", "passos", "gravados", "step_ms"}]
+    import simulacao
+    dt = 1.0 / partida["hz"]
+    saida = []
+    for gravada in partida["fases"]:
+        nome = gravada["fase"]
+        step = simulacao.FASES[nome][1]
+        state = _novo_estado(nome, partida)
+        step_ms = []
+        result = None
+        for m, vezes in gravada["passos"]:
+            ent = entrada.Entrada.da_mascara(m)
+            for _ in range(vezes):
+                t0 = time.perf_counter()
+                result = step(state, ent, dt)
+                step_ms.append((time.perf_counter() - t0) * 1000.0)
+                if result:
+                    break
+            if result:
+                break
+        saida.append({"fase": nome, "esperado": gravada["resultado"], "obtido": result,
+                      "passos": len(step_ms), "gravados": sum(v for _, v in gravada["passos"]),
+                      "step_ms": step_ms})
+    return saida
+
+
+def _igual(r):
+    # mesmo resultado no mesmo passo em que a partida gravada acabou
+    return r["obtido"] == r["esperado"] and r["passos"] == r["gravados"]
+
+
+def main(argv=None):
+    # sem janela e sem som (precisa vir antes de abrir o display/mixer)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import bench
+
+    parser = argparse.ArgumentParser(description="reproduz uma partida gravada, sem janela")
+    parser.add_argument("arquivo")
+    parser.add_argument("--vezes", type=int, default=1, help="repete pra medir melhor")
+    parser.add_argument("--saida", default=None, help="salva os tempos por passo em JSON")
+    args = parser.parse_args(argv)
+
+    partida = carregar(args.arquivo)
+    print(f"{args.arquivo}: seed {partida['seed']}, {len(partida['fases'])} fase(s), {partida['hz']} passos/s")
+
+    ok = True
+    medidas = {}
+    for _ in range(max(1, args.vezes)):
+        inicio = time.perf_counter()
+        rodada = reproduzir(partida)
+        gasto = time.perf_counter() - inicio
+        for r in rodada:
+            medidas.setdefault(r["fase"], []).extend(r["step_ms"])
+            if not _igual(r):
+                ok = False
+        print(f"  rodada em {gasto * 1000:.0f} ms: " +
+              ", ".join(f"{r['fase']} {r['obtido']} ({r['passos']} passos)" for r in rodada))
+
+    for r in rodada:
+        marca = "ok" if _igual(r) else f"DIFERENTE (gravado: {r['esperado']} em {r['gravados']} passos)"
+        p = bench.percentis(medidas[r["fase"]])
+        pior = max(range(len(r["step_ms"])), key=r["step_ms"].__getitem__) if r["step_ms"] else 0
+        print(f"{r['fase']}: {r['obtido']} {marca}")
+        if p:
+            print(f"  step_ms p50 {p['p50']:.4f}  p99 {p['p99']:.4f}  max {p['max']:.4f}"
+                  f"  (passo mais lento: {pior}, t={pior / partida['hz']:.2f}s)")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({nome: bench.percentis(v) for nome, v in medidas.items()}, f, indent=2)
+        print("salvo em", args.saida)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
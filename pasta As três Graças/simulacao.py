@@ -0,0 +1,123 @@
+# simulacao.py
+# Roda a lógica das fases sem janela e sem som (só o step de cada fase),
+# com entradas programadas em vez do teclado. Serve pra simular muitas partidas
+# (balanceamento) e pra conferir os tempos (TIME_LIMIT, SABOTAGE_TIME, STEAL_TIME...)
+# numa máquina sem monitor, tipo CI.
+#
+# uso: python simulacao.py [fase1|fase2|fase3] [partidas] [parado|aleatoria]
+
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+# sem janela e sem mixer (precisa vir antes de importar o pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import entrada
+import fase1
+import fase2
+import fase3
+import tempo
+
+# nome -> (cria o estado inicial, step)
+FASES = {
+    "fase1": (fase1.novo_estado, fase1.step),
+    "fase2": (fase2.Estado, fase2.step),
+    "fase3": (fase3.Estado, fase3.step),
+}
+
+DT = tempo.SIM_DT  # mesmo passo fixo que o jogo usa
+MAX_TEMPO = 120.0  # corta a partida se ninguém ganhar/perder até aqui (s)
+
+
+# ----- POLÍTICAS (quem "aperta as teclas") -----
+# uma política é uma função (state, t) -> Entrada
+
+def parado(state, t):
+    # não aperta nada (bom pra conferir o tempo limite de cada fase)
+    return entrada.NADA
+
+
+def segurando(**botoes):
+    # segura sempre os mesmos botões, ex: segurando(right=True, space=True)
+    ent = entrada.Entrada(**botoes)
+    return lambda state, t: ent
+
+
+def roteiro(passos):
+    # lista de (até_quando, Entrada): segura cada entrada até o tempo dela
+    def politica(state, t):
+        for ate, ent in passos:
+            if t < ate:
+                return ent
+        return entrada.NADA
+    return politica
+
+
+def aleatoria(seed=None, troca=0.5):
+    # troca de direção (e de SPACE/E) a cada "troca" segundos, tipo um jogador perdido
+    rng = random.Random(seed)
+    atual = {"ate": -1.0, "ent": entrada.NADA}
+
+    def politica(state, t):
+        if t >= atual["ate"]:
+            atual["ate"] = t + troca
+            atual["ent"] = entrada.Entrada(
+                left=rng.random() < 0.3, right=rng.random() < 0.4,
+                up=rng.random() < 0.3, down=rng.random() < 0.3,
+                space=rng.random() < 0.5, e=rng.random() < 0.3,
+            )
+        return atual["ent"]
+    return politica
+
+
+# ----- RODAR -----
+def rodar(fase, politica, dt=DT, max_tempo=MAX_TEMPO):
+    # uma partida inteira; devolve (resultado, passos, tempo simulado)
+    # resultado None = chegou no max_tempo sem acabar
+    novo_estado, step = FASES[fase]
+    state = novo_estado()
+    passos = 0
+    t = 0.0
+    while t < max_tempo:
+        result = step(state, politica(state, t), dt)
+        passos += 1
+        t += dt
+        if result:
+            return result, passos, t
+    return None, passos, t
+
+
+def main(argv):
+    fase = argv[1] if len(argv) > 1 else "fase2"
+    partidas = int(argv[2]) if len(argv) > 2 else 100
+    nome_politica = argv[3] if len(argv) > 3 else "aleatoria"
+    if fase not in FASES:
+        print("fase desconhecida:", fase, "(use", ", ".join(FASES) + ")")
+        return 2
+
+    resultados = Counter()
+    tempos = []
+    total_passos = 0
+    inicio = time.perf_counter()
+    for i in range(partidas):
+        politica = parado if nome_politica == "parado" else aleatoria(seed=i)
+        result, passos, t = rodar(fase, politica)
+        resultados[result] += 1
+        tempos.append(t)
+        total_passos += passos
+    gasto = time.perf_counter() - inicio
+
+    print(f"{fase}: {partidas} partidas ({nome_politica}) em {gasto:.2f}s "
+          f"({partidas/gasto:.1f} partidas/s, {total_passos/gasto:.0f} passos/s)")
+    for result, n in resultados.most_common():
+        print(f"  {str(result):10s} {n:6d}  ({100.0*n/partidas:.1f}%)")
+    print(f"  tempo médio de partida: {sum(tempos)/len(tempos):.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,46 @@
+# tela.py
+# Modo opcional de "retângulos sujos": em vez de mandar a tela inteira (flip) todo
+# frame, manda pro display só as áreas que mudaram (pygame.display.update(rects)).
+# Liga com a variável de ambiente TRES_GRACAS_DIRTY=1; desligado, tudo continua com flip().
+
+import os
+import pygame
+
+DIRTY_RECTS = os.environ.get("TRES_GRACAS_DIRTY", "0") == "1"
+
+
+class RetangulosSujos:
+    def __init__(self, ativo=None):
+        self.ativo = DIRTY_RECTS if ativo is None else ativo
+        self.rects = []          # áreas desenhadas neste frame
+        self._anteriores = []    # áreas do frame anterior (onde as coisas estavam antes)
+        self._tudo = True        # primeiro frame sempre manda a tela inteira
+
+    def marcar(self, *rects):
+        # guarda as áreas que mudaram (aceita None, pra poder passar o retorno de qualquer draw)
+        for r in rects:
+            if r:
+                self.rects.append(pygame.Rect(r))
+
+    def marcar_tudo(self):
+        # a tela inteira mudou (troca de página, mensagem por cima, etc.)
+        self._tudo = True
+
+    def quer_desenhar(self, mudou):
+        # telas paradas (tutorial, game over...) só precisam redesenhar quando algo muda;
+        # sem o modo ligado continua desenhando todo frame, igual antes
+        if mudou:
+            self._tudo = True
+        return mudou or not self.ativo
+
+    def atualizar(self):
+        # manda pro display: tudo (flip) ou só as áreas sujas deste frame + do anterior
+        if not self.ativo or self._tudo:
+            pygame.display.flip()
+        else:
+            areas = self.rects + self._anteriores
+            if areas:
+                pygame.display.update(areas)
+        self._anteriores = self.rects
+        self.rects = []
+        self._tudo = False
@@ -0,0 +1,39 @@
+# tempo.py
+# Passo fixo da simulação: a lógica das fases sempre anda em passos iguais
+# (120 por segundo), não importa quanto tempo o frame levou pra desenhar.
+# Um frame lento (tipo carregando um mp3) vira vários passos pequenos,
+# então ninguém atravessa parede nem "pula" por cima do player.
+# O desenho usa o que sobrou no acumulador pra interpolar entre dois passos.
+
+SIM_HZ = 120
+SIM_DT = 1.0 / SIM_HZ
+
+# frame maior que isso é cortado (senão uma travada longa vira uma avalanche de passos)
+MAX_FRAME = 0.25
+
+
+class PassoFixo:
+    def __init__(self, hz=SIM_HZ, max_frame=MAX_FRAME):
+        self.dt = 1.0 / hz
+        self.max_frame = max_frame
+        self.acumulado = 0.0
+
+    def avancar(self, frame_dt):
+        # junta o tempo do frame e devolve quantos passos fixos rodar agora
+        self.acumulado += min(max(frame_dt, 0.0), self.max_frame)
+        passos = int(self.acumulado / self.dt)
+        self.acumulado -= passos * self.dt
+        return passos
+
+    @property
+    def alpha(self):
+        # quanto já andou do próximo passo (0..1), pra interpolar o desenho
+        return min(1.0, self.acumulado / self.dt)
+
+
+def interpolar(anterior, atual, alpha):
+    # ponto (x, y) entre o passo anterior e o atual, arredondado pra desenhar
+    if anterior is None or alpha >= 1.0:
+        return (round(atual[0]), round(atual[1]))
+    return (round(anterior[0] + (atual[0] - anterior[0]) * alpha),
+            round(anterior[1] + (atual[1] - anterior[1]) * alpha))
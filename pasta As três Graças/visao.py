@@ -0,0 +1,352 @@
+# visao.py
+# Coisas de "visão" compartilhadas pela fase 2 (câmeras) e fase 3 (guardas):
+# linha de visão exata (segmento x retângulo), o corte em lote de muitos observadores
+# (numpy, se tiver) e a camada única dos cones.
+
+import math
+import struct
+from array import array
+import pygame
+
+import colisao
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ----- LINHA DE VISÃO -----
+# a "margem" engorda as paredes: equivale ao raio de 4x4 px que o raycast antigo usava
+# (as paredes da GradeParedes já vêm com a caixa engordada por essa margem)
+LOS_MARGIN = colisao.LOS_MARGIN
+
+# folga (px/graus) dos cortes aproximados (lote e mapa): conta com float nunca descarta errado
+_FOLGA = 1e-3
+
+
+def _entrada(x0, y0, dx, dy, left, top, right, bottom):
+    # slab test: devolve o t (0..1) onde o segmento entra no retângulo, ou None
+    # (retângulo aberto, igual ao colliderect: só encostar na borda não conta)
+    t_min, t_max = 0.0, 1.0
+
+    if dx == 0:
+        if not (left < x0 < right):
+            return None
+    else:
+        t1 = (left - x0) / dx
+        t2 = (right - x0) / dx
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_min: t_min = t1
+        if t2 < t_max: t_max = t2
+        if t_min >= t_max:
+            return None
+
+    if dy == 0:
+        if not (top < y0 < bottom):
+            return None
+    else:
+        t1 = (top - y0) / dy
+        t2 = (bottom - y0) / dy
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_min: t_min = t1
+        if t2 < t_max: t_max = t2
+        if t_min >= t_max:
+            return None
+
+    return t_min
+
+
+def primeira_parede(start, end, walls, margin=LOS_MARGIN):
+    # primeira parede que o segmento start->end atravessa (a mais perto do start)
+    # empate no mesmo t fica com a que vem antes na lista (resultado sempre igual)
+    # se walls for uma GradeParedes, só testa as paredes das células do caminho
+    x0, y0 = start
+    dx = end[0] - x0
+    dy = end[1] - y0
+    best, best_t = None, 2.0
+    for w, (left, top, right, bottom) in colisao.caixas_no_segmento(walls, start, end, margin):
+        t = _entrada(x0, y0, dx, dy, left, top, right, bottom)
+        if t is not None and t < best_t:
+            best, best_t = w, t
+    return best
+
+
+def linha_livre(start, end, walls, margin=LOS_MARGIN):
+    # True se nenhuma parede bloqueia o segmento (não precisa achar a mais perto)
+    x0, y0 = start
+    dx = end[0] - x0
+    dy = end[1] - y0
+    for _, (left, top, right, bottom) in colisao.caixas_no_segmento(walls, start, end, margin):
+        if _entrada(x0, y0, dx, dy, left, top, right, bottom) is not None:
+            return False
+    return True
+
+
+# ----- VÁRIOS OBSERVADORES DE UMA VEZ -----
+# Com muita câmera/guarda, o custo é o Python chamando can_see um por um. O corte por
+# distância e ângulo (que descarta quase todos) é feito numa passada só com numpy;
+# o teste exato de cada observador (com as paredes) só roda pros que sobram.
+# O corte tem uma folga: nunca descarta quem o teste exato diria que vê.
+LOTE_MINIMO = 20    # com menos que isso, montar os arrays custa mais que o loop
+
+
+def vetor(valores):
+    # valores que não mudam (ex: posição das câmeras) já no formato que o candidatos usa
+    return np.asarray(valores, dtype=np.float64) if np is not None else list(valores)
+
+
+def candidatos(xs, ys, angulos, meio_fov, alcance, alvo):
+    # índices dos observadores que podem estar vendo o alvo (em ordem)
+    # xs/ys/angulos (graus): um valor por observador (lista ou array);
+    # meio_fov (graus, < 90) e alcance: um número pra todos
+    n = len(xs)
+    if np is None or n < LOTE_MINIMO:
+        return range(n)
+    dx = alvo[0] - np.asarray(xs, dtype=np.float64)
+    dy = alvo[1] - np.asarray(ys, dtype=np.float64)
+    a = np.radians(np.asarray(angulos, dtype=np.float64))
+    d = np.hypot(dx, dy)
+    # dentro do cone <=> projeção na direção que ele olha >= distância * cos(meio_fov)
+    # (sem atan2 nem %, que são o que mais pesa aqui)
+    proj = dx * np.cos(a) + dy * np.sin(a)
+    cos_h = math.cos(math.radians(meio_fov + _FOLGA))
+    ok = (d <= alcance + _FOLGA) & (proj >= d * cos_h - _FOLGA)
+    return ok.nonzero()[0].tolist()
+
+
+# ----- MAPA DE VISIBILIDADE (observador parado) -----
+# Pra uma câmera (posição fixa, varre entre dois ângulos) dá pra saber de antemão,
+# célula por célula da tela, se alguma parte dela pode aparecer na câmera e se as
+# paredes atrapalham. O can_see vira uma consulta na tabela + a conta do ângulo,
+# e o raio contra as paredes só é feito nas células onde a resposta depende do ponto.
+MAPA_CELULA = 16
+NUNCA = 0       # fora do alcance, fora da varredura ou inteira atrás de uma parede
+LIVRE = 1       # nenhuma parede atrapalha: só falta conferir distância e ângulo
+CONFERIR = 2    # depende do ponto (borda de parede/sombra): faz o teste completo
+
+_MAPA_CAB = struct.Struct("<III")   # célula, colunas, linhas
+
+
+def _casco(pontos):
+    # casco convexo (monotone chain), sentido anti-horário
+    pts = sorted(set(pontos))
+    if len(pts) <= 2:
+        return pts
+
+    def cruz(o, a, b):
+        return (a[0]-o[0]) * (b[1]-o[1]) - (a[1]-o[1]) * (b[0]-o[0])
+    baixo, cima = [], []
+    for p in pts:
+        while len(baixo) >= 2 and cruz(baixo[-2], baixo[-1], p) <= 0:
+            baixo.pop()
+        baixo.append(p)
+    for p in reversed(pts):
+        while len(cima) >= 2 and cruz(cima[-2], cima[-1], p) <= 0:
+            cima.pop()
+        cima.append(p)
+    return baixo[:-1] + cima[:-1]
+
+
+def _separados(casco, caixa):
+    # teste de eixos separadores: o polígono convexo fica fora da caixa aberta?
+    # (só diz que sim com sobra, na dúvida diz que não)
+    left, top, right, bottom = caixa
+    xs = [p[0] for p in casco]
+    ys = [p[1] for p in casco]
+    if max(xs) < left - _FOLGA or min(xs) > right + _FOLGA:
+        return True
+    if max(ys) < top - _FOLGA or min(ys) > bottom + _FOLGA:
+        return True
+    cantos = ((left, top), (right, top), (right, bottom), (left, bottom))
+    n = len(casco)
+    for i in range(n):
+        ax, ay = casco[i]
+        bx, by = casco[(i + 1) % n]
+        nx, ny = by - ay, ax - bx           # normal pra fora (casco anti-horário)
+        lim = nx * ax + ny * ay
+        norma = math.hypot(nx, ny)
+        if norma and min(nx * x + ny * y for x, y in cantos) > lim + _FOLGA * norma:
+            return True
+    return False
+
+
+def _arco(pos, x0, y0, x1, y1):
+    # faixa de direções (graus) em que a célula aparece vista de pos; None = em volta toda
+    px, py = pos
+    if x0 - 1 <= px <= x1 + 1 and y0 - 1 <= py <= y1 + 1:
+        return None
+    ref = math.degrees(math.atan2((y0 + y1) / 2 - py, (x0 + x1) / 2 - px))
+    difs = [(math.degrees(math.atan2(cy - py, cx - px)) - ref + 180) % 360 - 180
+            for cx, cy in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+    return ref + min(difs), ref + max(difs)
+
+
+class MapaVisibilidade:
+    def __init__(self, pos, angulos, fov, dist, caixas, tamanho, cell=MAPA_CELULA):
+        # pos: onde o observador fica; angulos: (menor, maior) pra onde ele pode olhar
+        # caixas: as paredes já engordadas pela margem da visão (GradeParedes.caixas)
+        self.cell = cell
+        self.cols = (tamanho[0] + cell - 1) // cell
+        self.rows = (tamanho[1] + cell - 1) // cell
+        n = self.cols * self.rows
+        self.estados = bytearray(n)                    # NUNCA por padrão
+        self.lo = array("d", [-math.inf]) * n          # ângulo da câmera em que a célula
+        self.hi = array("d", [math.inf]) * n           # começa/para de caber no cone
+
+        px, py = pos
+        amin, amax = angulos
+        meio_fov = fov / 2
+        largura_varredura = amax - amin
+
+        # só as células que cabem no alcance
+        c0 = max(0, int((px - dist) // cell))
+        c1 = min(self.cols - 1, int((px + dist) // cell))
+        r0 = max(0, int((py - dist) // cell))
+        r1 = min(self.rows - 1, int((py + dist) // cell))
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                x0, y0 = col * cell - _FOLGA, row * cell - _FOLGA
+                x1, y1 = (col + 1) * cell + _FOLGA, (row + 1) * cell + _FOLGA
+
+                # ponto mais perto da célula ainda fora do alcance: nunca vê
+                qx, qy = min(max(px, x0), x1), min(max(py, y0), y1)
+                if math.hypot(qx - px, qy - py) > dist + _FOLGA:
+                    continue
+
+                # faixa de ângulos da câmera em que alguma parte da célula fica no cone
+                i = row * self.cols + col
+                arco = _arco(pos, x0, y0, x1, y1)
+                if arco is not None and (arco[1] - arco[0]) + fov + largura_varredura < 360 - 1:
+                    lo, hi = arco[0] - meio_fov - _FOLGA, arco[1] + meio_fov + _FOLGA
+                    desloca = round(((amin + amax) / 2 - (lo + hi) / 2) / 360.0) * 360
+                    lo, hi = lo + desloca, hi + desloca
+                    if hi < amin or lo > amax:
+                        continue
+                    self.lo[i], self.hi[i] = lo, hi
+
+                cantos = ((x0, y0), (x1, y0), (x1, y1), (x0, y1))
+                if arco is not None and self._na_sombra(pos, cantos, caixas):
+                    continue
+                casco = _casco([(px, py)] + list(cantos))
+                livre = all(_separados(casco, c) for c in caixas)
+                self.estados[i] = LIVRE if livre else CONFERIR
+
+    @staticmethod
+    def _na_sombra(pos, cantos, caixas):
+        # os 4 cantos atrás da mesma parede: a célula inteira está atrás dela
+        # (a "sombra" de uma caixa vista de um ponto é convexa)
+        x0, y0 = pos
+        for left, top, right, bottom in caixas:
+            for cx, cy in cantos:
+                if _entrada(x0, y0, cx - x0, cy - y0, left, top, right, bottom) is None:
+                    break
+            else:
+                return True
+        return False
+
+    # --- pro cache do nível ---
+    def para_bytes(self):
+        return (_MAPA_CAB.pack(self.cell, self.cols, self.rows) + bytes(self.estados)
+                + self.lo.tobytes() + self.hi.tobytes())
+
+    @classmethod
+    def de_bytes(cls, dados, inicio=0):
+        # (mapa, onde acabou) a partir do que o para_bytes gravou
+        cell, cols, rows = _MAPA_CAB.unpack_from(dados, inicio)
+        n = cols * rows
+        p = inicio + _MAPA_CAB.size
+        mapa = cls.__new__(cls)
+        mapa.cell, mapa.cols, mapa.rows = cell, cols, rows
+        mapa.estados = bytearray(dados[p:p + n])
+        p += n
+        mapa.lo, mapa.hi = array("d"), array("d")
+        mapa.lo.frombytes(dados[p:p + 8 * n])
+        mapa.hi.frombytes(dados[p + 8 * n:p + 16 * n])
+        if len(mapa.estados) != n or len(mapa.hi) != n:
+            raise ValueError("mapa de visibilidade cortado")
+        return mapa, p + 16 * n
+
+    def consultar(self, x, y, angulo):
+        # NUNCA / LIVRE / CONFERIR pro ponto (x, y) com a câmera olhando pra "angulo"
+        col = int(x // self.cell)
+        row = int(y // self.cell)
+        if col < 0 or row < 0 or col >= self.cols or row >= self.rows:
+            return CONFERIR
+        i = row * self.cols + col
+        estado = self.estados[i]
+        if estado and not (self.lo[i] <= angulo <= self.hi[i]):
+            return NUNCA
+        return estado
+
+
+def mapas_para_bytes(mapas):
+    return struct.pack("<I", len(mapas)) + b"".join(m.para_bytes() for m in mapas)
+
+
+def mapas_de_bytes(dados):
+    (n,) = struct.unpack_from("<I", dados, 0)
+    mapas, p = [], 4
+    for _ in range(n):
+        mapa, p = MapaVisibilidade.de_bytes(dados, p)
+        mapas.append(mapa)
+    return mapas
+
+
+# ----- CONES -----
+def cone_pontos(pos, angle, fov, dist):
+    # triângulo do cone: posição + as duas pontas (ângulos em graus)
+    a1 = math.radians(angle - fov/2)
+    a2 = math.radians(angle + fov/2)
+    x, y = pos
+    p1 = (x + math.cos(a1) * dist, y + math.sin(a1) * dist)
+    p2 = (x + math.cos(a2) * dist, y + math.sin(a2) * dist)
+    return [(x, y), p1, p2]
+
+
+def _juntar_rects(rects):
+    # junta retângulos que se encostam, pra nenhum pixel ser "blitado" duas vezes
+    rects = [r.copy() for r in rects if r.width > 0 and r.height > 0]
+    mudou = True
+    while mudou:
+        mudou = False
+        out = []
+        for r in rects:
+            for o in out:
+                if o.colliderect(r):
+                    o.union_ip(r)
+                    mudou = True
+                    break
+            else:
+                out.append(r)
+        rects = out
+    return rects
+
+
+class CamadaCones:
+    # uma Surface transparente do tamanho da tela, criada uma vez só e reaproveitada:
+    # os cones são desenhados nela e depois só as áreas usadas vão pra tela
+    def __init__(self, size):
+        self.surf = pygame.Surface(size, pygame.SRCALPHA)
+        self.surf.fill((0, 0, 0, 0))
+        self.bounds = self.surf.get_rect()
+        self.rects = []  # áreas desenhadas desde o último draw()
+
+    def add_cone(self, pos, angle, fov, dist, color):
+        # desenha o triângulo na camada e guarda o retângulo que ele ocupa
+        r = pygame.draw.polygon(self.surf, color, cone_pontos(pos, angle, fov, dist))
+        r = r.clip(self.bounds)
+        if r.width and r.height:
+            self.rects.append(r)
+
+    def draw(self, surf):
+        # blita só os pedaços usados e já limpa a camada pro próximo frame
+        areas = _juntar_rects(self.rects)
+        for r in areas:
+            surf.blit(self.surf, r.topleft, r)
+        for r in areas:
+            self.surf.fill((0, 0, 0, 0), r)
+        self.rects = []
+        return areas